@@ -0,0 +1,247 @@
+"""
+Micro-benchmarks of the per-action overhead
+
+Usage (from the root of the repository):
+
+    python -m benchmarks.actions
+"""
+import collections
+import io
+import timeit
+
+import toml
+
+from shortcuts import Shortcut
+from shortcuts.actions import (
+    KEYWORD_TO_ACTION_MAP,
+    AskAction,
+    DelayAction,
+    DictionaryAction,
+    IfAction,
+    SetVariableAction,
+    SpeakTextAction,
+    TextAction,
+)
+from shortcuts.actions.base import DictionaryField, VariablesField
+from shortcuts.loader import PListLoader, TomlLoader, deserialize
+
+
+NUMBER = 20000
+
+
+def bench_fields():
+    """Creates an instance of every action class and reads its fields"""
+    classes = list(KEYWORD_TO_ACTION_MAP.values())
+
+    def run():
+        for action_class in classes:
+            action_class().fields
+
+    return run, len(classes)
+
+
+def bench_action_from_dict():
+    """Converts plist dictionaries to action objects"""
+    dicts = [
+        TextAction(data={'text': 'Hello, {{name}}!'}).dump(),
+        IfAction(data={'condition': 'equals', 'compare_with': 'test', 'group_id': 'id'}).dump(),
+    ]
+
+    def run():
+        for action_dict in dicts:
+            PListLoader._action_from_dict(action_dict)
+
+    return run, len(dicts)
+
+
+def bench_dump():
+    """Dumps actions to plist dictionaries"""
+    actions = [
+        AskAction(data={'question': 'What is your name?'}),
+        DelayAction(data={'time': 1}),
+        IfAction(data={'condition': 'equals', 'compare_with': 'test', 'group_id': 'id'}),
+        SetVariableAction(data={'name': 'name'}),
+        SpeakTextAction(data={'language': 'English (United States)'}),
+    ]
+
+    def run():
+        for action in actions:
+            action.dump()
+
+    return run, len(actions)
+
+
+def bench_variables_field():
+    """Converts text with and without variables"""
+    field = VariablesField('WFTextActionText')
+    values = [
+        'Simple text without variables',
+        'Hello, {{name}}! Shields are at {{battery}}% and falling',
+        '{{ask_when_run}}',
+    ]
+
+    def run():
+        for value in values:
+            field.process_value(value)
+
+    return run, len(values)
+
+
+def bench_dictionary_field():
+    """Converts a dictionary with 20 items"""
+    field = DictionaryField('WFItems')
+    value = [{'key': f'key{i}', 'value': 'value {{variable}}' if i % 2 else f'value{i}'} for i in range(20)]
+
+    def run():
+        field.process_value(value)
+
+    return run, 1
+
+
+def bench_dictionary_from_dict():
+    """Converts a plist dictionary of a dictionary action with 100 items to an action object"""
+    items = [{'key': f'key{i}', 'value': 'value {{variable}}' if i % 2 else f'value{i}'} for i in range(100)]
+    action_dict = DictionaryAction(data={'items': items}).dump()
+
+    def run():
+        PListLoader._action_from_dict(action_dict)
+
+    return run, len(items)
+
+
+def _get_shortcut_plist(actions_count):
+    sc = Shortcut(name='benchmark')
+    items = [{'key': f'key{i}', 'value': f'value {{{{v{i}}}}}'} for i in range(10)]
+    for i in range(actions_count // 2):
+        sc.actions.append(TextAction(data={'text': f'Hello, {{{{name}}}} {i}!'}))
+        sc.actions.append(DictionaryAction(data={'items': items}))
+    return sc.dumps(file_format='plist'), len(sc.actions)
+
+
+def bench_loads_plist():
+    """Loads a shortcut with 100 actions from a plist"""
+    plist, actions_count = _get_shortcut_plist(100)
+
+    def run():
+        Shortcut.loads(plist, file_format='plist')
+
+    return run, actions_count
+
+
+def bench_loads_plist_lazy():
+    """Loads a shortcut with 100 actions from a plist lazily and counts actions by itype"""
+    plist, actions_count = _get_shortcut_plist(100)
+
+    def run():
+        collections.Counter(a.itype for a in Shortcut.loads(plist, file_format='plist', lazy=True).actions)
+
+    return run, actions_count
+
+
+def bench_iter_actions_plist():
+    """Reads actions one by one from a plist file with 100 actions"""
+    plist, actions_count = _get_shortcut_plist(100)
+    plist = plist.encode('utf-8')
+
+    def run():
+        for _ in Shortcut.iter_actions(io.BytesIO(plist), file_format='plist'):
+            pass
+
+    return run, actions_count
+
+
+def bench_round_trip_plist_lazy():
+    """Loads a shortcut with 100 actions from a plist lazily and dumps it back"""
+    plist, actions_count = _get_shortcut_plist(100)
+
+    def run():
+        Shortcut.loads(plist, file_format='plist', lazy=True).dumps(file_format='plist')
+
+    return run, actions_count
+
+
+def _get_toml(actions_count):
+    lines = []
+    for i in range(actions_count // 2):
+        lines.append(f'[[action]]\ntype = "text"\ntext = "Hello, {{{{name}}}} {i}!"\n')
+        lines.append('[[action]]\ntype = "dictionary"\n')
+        for j in range(10):
+            lines.append(f'[[action.items]]\nkey = "key{j}"\nvalue = "value {{{{v{j}}}}}"\n')
+    return '\n'.join(lines)
+
+
+def bench_loads_toml():
+    """Loads a shortcut with 100 actions (half of them are dictionaries with 10 items) from toml"""
+    string = _get_toml(100)
+
+    def run():
+        Shortcut.loads(string, file_format='toml')
+
+    return run, 100
+
+
+def bench_action_from_toml_table():
+    """Creates actions from parsed toml tables (half of them are dictionaries with 10 items)"""
+    tables = toml.loads(_get_toml(100))['action']
+
+    def run():
+        for table in tables:
+            TomlLoader._action_from_dict(table)
+
+    return run, len(tables)
+
+
+def _bench_variable_string_field(attachments_count):
+    def benchmark():
+        """Converts a text with variables from a plist to a string with {{variables}}"""
+        attachments = {
+            f'{{{i * 7 + 6}, 1}}': {'Type': 'Variable', 'VariableName': f'v{i}'} for i in range(attachments_count)
+        }
+        data = {
+            'Value': {
+                'attachmentsByRange': attachments,
+                'string': 'Hello, ￼' * attachments_count,
+            },
+            'WFSerializationType': 'WFTextTokenString',
+        }
+
+        def run():
+            deserialize(data)
+
+        return run, attachments_count
+
+    benchmark.__name__ = f'bench_variable_string_field_{attachments_count}'
+    return benchmark
+
+
+BENCHMARKS = (
+    bench_fields,
+    bench_action_from_dict,
+    bench_dump,
+    bench_variables_field,
+    bench_dictionary_field,
+    bench_dictionary_from_dict,
+    bench_loads_plist,
+    bench_loads_toml,
+    bench_action_from_toml_table,
+    bench_loads_plist_lazy,
+    bench_iter_actions_plist,
+    bench_round_trip_plist_lazy,
+    _bench_variable_string_field(10),
+    _bench_variable_string_field(1000),
+    _bench_variable_string_field(100000),
+)
+
+
+def main():
+    # every benchmark returns a function and the number of operations (actions, values) it does
+    for benchmark in BENCHMARKS:
+        run, operations_count = benchmark()
+        number = max(1, NUMBER // operations_count)
+        seconds = min(timeit.repeat(run, number=number, repeat=5))
+        per_operation = seconds / number / operations_count * 1e6
+        print(f'{benchmark.__name__:<36} {per_operation:8.2f} µs/op')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Cold start of the library and the command line tool: every command runs in a new interpreter
+
+Usage (from the root of the repository):
+
+    python -m benchmarks.import_time
+"""
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+REPEAT = 20
+
+COMMANDS = {
+    'python': ['-c', 'pass'],  # start of the interpreter, it's included in all other commands
+    'import shortcuts': ['-c', 'import shortcuts'],
+    'shortcuts --version': ['-c', 'from shortcuts.cli import main; main()', '--version'],
+    'shortcuts file.toml file.shortcut': [
+        '-c', 'from shortcuts.cli import main; main()',
+        'examples/shields.toml', '{tmpdir}/shields.shortcut', '--no-cache',
+    ],
+}
+
+
+def measure(args):
+    """Returns times of REPEAT runs of the command in seconds"""
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    tmpdir = tempfile.mkdtemp(prefix='shortcuts-benchmark-')
+    try:
+        for name, args in COMMANDS.items():
+            times = measure([arg.format(tmpdir=tmpdir) for arg in args])
+            print(f'{name:<36} min: {min(times) * 1000:8.1f} ms  median: {statistics.median(times) * 1000:8.1f} ms')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
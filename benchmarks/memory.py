@@ -0,0 +1,47 @@
+"""
+Memory of loaded actions: bytes per action instance for every class from `KEYWORD_TO_ACTION_MAP`
+
+Every action gets its own `data` dictionary (as actions loaded from files), values of fields are shared,
+so the result is the size of the action object, its `data` and everything else the instance holds.
+
+Usage (from the root of the repository):
+
+    python -m benchmarks.memory
+"""
+import gc
+import tracemalloc
+
+from shortcuts.actions import KEYWORD_TO_ACTION_MAP
+from shortcuts.generator import ShortcutGenerator
+
+
+NUMBER = 1000  # instances of every class
+
+
+def measure(action_class, data):
+    """Returns bytes allocated by one instance of the action class"""
+    actions = [None] * NUMBER
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    for i in range(NUMBER):
+        actions[i] = action_class(data=dict(data))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (size - start) / NUMBER
+
+
+def main():
+    total = 0.0
+    generator = ShortcutGenerator(seed=0)
+    for keyword, action_class in sorted(KEYWORD_TO_ACTION_MAP.items()):
+        data = generator.get_sample_data(action_class)
+        size = measure(action_class, data)
+        total += size
+        print(f'{keyword:<36} {size:8.0f} bytes/action')
+
+    print(f'{"average":<36} {total / len(KEYWORD_TO_ACTION_MAP):8.0f} bytes/action')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+Benchmark suite of load, dump and convert hot paths on synthetic shortcuts (see `benchmarks/synthetic.py`)
+
+Usage (from the root of the repository):
+
+    python -m benchmarks.suite                   # run and compare with the baseline
+    python -m benchmarks.suite --save-baseline   # run and save results as the new baseline
+    python -m benchmarks.suite --sizes 10,1000 --only toml
+
+Results are compared with `benchmarks/baseline.json`, the command fails (exit code 1)
+if any benchmark is slower than its baseline by more than the threshold (`--threshold`, 0.25 = 25%).
+Timings depend on the machine, so the baseline should be saved on the machine where the suite is checked.
+"""
+import argparse
+import atexit
+import json
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.synthetic import get_shortcut
+from shortcuts import cli
+from shortcuts.actions.base import VariablesField
+from shortcuts.dump import PListDumper, TomlDumper
+from shortcuts.loader import PListLoader, TomlLoader, deserialize
+
+
+DEFAULT_SIZES = (10, 1000, 100000)
+DEFAULT_THRESHOLD = 0.25
+BASELINE_FILEPATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def bench_toml_loads(size: int) -> Callable:
+    string = TomlDumper(get_shortcut(size)).dumps()
+    return lambda: TomlLoader.loads(string)
+
+
+def bench_plist_loads(size: int) -> Callable:
+    string = PListDumper(get_shortcut(size)).dumps()
+    return lambda: PListLoader.loads(string)
+
+
+def bench_plist_dumps(size: int) -> Callable:
+    dumper = PListDumper(get_shortcut(size))
+    return dumper.dumps
+
+
+def bench_toml_dumps(size: int) -> Callable:
+    dumper = TomlDumper(get_shortcut(size))
+    return dumper.dumps
+
+
+def bench_variables_field(size: int) -> Callable:
+    field = VariablesField('WFTextActionText')
+    values = [f'Hello, {{{{name}}}}! Message {i} of {{{{count}}}}' for i in range(size)]
+
+    def run():
+        for value in values:
+            field.process_value(value)
+
+    return run
+
+
+def bench_wf_variable_string_field(size: int) -> Callable:
+    field = VariablesField('WFTextActionText')
+    values = [field.process_value(f'Hello, {{{{name}}}}! Message {i} of {{{{count}}}}') for i in range(size)]
+
+    def run():
+        for value in values:
+            deserialize(value)
+
+    return run
+
+
+def bench_convert_shortcut(size: int) -> Callable:
+    """Converts toml to shortcut and back with the command line tool (without the compile cache)"""
+    dirpath = tempfile.mkdtemp(prefix='shortcuts-benchmark-')
+    atexit.register(shutil.rmtree, dirpath, ignore_errors=True)
+    toml_filepath = os.path.join(dirpath, 'shortcut.toml')
+    shortcut_filepath = os.path.join(dirpath, 'shortcut.shortcut')
+    with open(toml_filepath, 'w') as f:
+        f.write(TomlDumper(get_shortcut(size)).dumps())
+
+    def run():
+        cli.convert_shortcut(toml_filepath, shortcut_filepath)
+        cli.convert_shortcut(shortcut_filepath, toml_filepath)
+
+    return run
+
+
+BENCHMARKS: Dict[str, Callable[[int], Callable]] = {
+    'toml_loads': bench_toml_loads,
+    'plist_loads': bench_plist_loads,
+    'plist_dumps': bench_plist_dumps,
+    'toml_dumps': bench_toml_dumps,
+    'variables_field': bench_variables_field,
+    'wf_variable_string_field': bench_wf_variable_string_field,
+    'convert_shortcut': bench_convert_shortcut,
+}
+
+
+def measure(run: Callable) -> float:
+    """Returns the best time of one run in seconds"""
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()  # number of runs which take at least 0.2 seconds
+    return min(timer.repeat(number=number, repeat=3)) / number
+
+
+def run_benchmarks(sizes: List[int], only: Optional[str] = None) -> Dict[str, float]:
+    """Returns {"benchmark[size]": seconds per run}"""
+    results = {}
+    for name, benchmark in BENCHMARKS.items():
+        if only and only not in name:
+            continue
+        for size in sizes:
+            key = f'{name}[{size}]'
+            results[key] = seconds = measure(benchmark(size))
+            print(f'{key:<40} {seconds * 1000:12.3f} ms {seconds / size * 1e6:10.2f} µs/action', flush=True)
+    return results
+
+
+def find_regressions(
+    results: Dict[str, float],
+    baseline: Dict[str, float],
+    threshold: float,
+) -> List[Tuple[str, float, float]]:
+    """Returns (benchmark, baseline seconds, seconds) of benchmarks which are slower than the baseline"""
+    return [
+        (key, baseline[key], seconds)
+        for key, seconds in results.items()
+        if key in baseline and seconds > baseline[key] * (1 + threshold)
+    ]
+
+
+def load_baseline(filepath: str) -> Dict[str, float]:
+    try:
+        with open(filepath) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(filepath: str, results: Dict[str, float]) -> None:
+    # results of other benchmarks and sizes are kept
+    baseline = {**load_baseline(filepath), **results}
+    with open(filepath, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks of python-shortcuts')
+    parser.add_argument(
+        '--sizes',
+        default=','.join(map(str, DEFAULT_SIZES)),
+        help='Comma separated numbers of actions in synthetic shortcuts (default: %(default)s)',
+    )
+    parser.add_argument('--only', help='Run only benchmarks which names contain this string')
+    parser.add_argument('--baseline', default=BASELINE_FILEPATH, help='Baseline file (default: %(default)s)')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help='Allowed slowdown relative to the baseline (default: %(default)s)',
+    )
+    parser.add_argument('--save-baseline', action='store_true', help='Save results to the baseline file')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = run_benchmarks(sizes, only=args.only)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f'Baseline saved: {args.baseline}')
+        return
+
+    baseline = load_baseline(args.baseline)
+    regressions = find_regressions(results, baseline, args.threshold)
+    for key, baseline_seconds, seconds in regressions:
+        print(
+            f'Regression: {key}: {seconds * 1000:.3f} ms, baseline: {baseline_seconds * 1000:.3f} ms '
+            f'(+{(seconds / baseline_seconds - 1) * 100:.0f}%)',
+            file=sys.stderr,
+        )
+    if regressions:
+        sys.exit(1)
+
+    compared = len([key for key in results if key in baseline])
+    print(f'No regressions (compared with baseline: {compared} of {len(results)})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Synthetic shortcuts for benchmarks: they contain actions of every class from `KEYWORD_TO_ACTION_MAP`
+"""
+import itertools
+from typing import Dict, Iterator, List, Type
+
+from shortcuts import Shortcut
+from shortcuts.actions import KEYWORD_TO_ACTION_MAP
+from shortcuts.actions.base import BaseAction, GroupIDField
+from shortcuts.generator import ShortcutGenerator
+
+
+def _is_control_flow(action_class: Type[BaseAction]) -> bool:
+    return isinstance(action_class._fields_by_attr.get('group_id'), GroupIDField)
+
+
+def _get_chunks() -> List[List[Type[BaseAction]]]:
+    """
+    Returns lists of action classes: every class which is not a part of a control flow block is a separate chunk,
+    control flow actions are grouped into complete blocks (start, middle actions, end)
+    """
+    chunks = []
+    blocks: Dict[str, List[Type[BaseAction]]] = {}
+    for action_class in KEYWORD_TO_ACTION_MAP.values():
+        if _is_control_flow(action_class):
+            blocks.setdefault(action_class.itype, []).append(action_class)  # type: ignore
+        else:
+            chunks.append([action_class])
+
+    for block in blocks.values():
+        chunks.append(sorted(block, key=lambda c: c.default_fields['WFControlFlowMode']))
+
+    return chunks
+
+
+def iter_actions(count: int) -> Iterator[BaseAction]:
+    """Yields `count` actions of all classes, control flow blocks are always complete"""
+    # values of fields are generated by the same code as `shortcuts generate`, the seed makes them reproducible
+    generator = ShortcutGenerator(seed=count)
+    chunks = _get_chunks()
+    single_actions = [chunk for chunk in chunks if len(chunk) == 1]
+
+    produced = 0
+    for chunk in itertools.cycle(chunks):
+        if produced + len(chunk) > count:
+            # a block doesn't fit, the rest is filled with single actions
+            chunk = single_actions[(count - produced) % len(single_actions)]
+        if produced >= count:
+            return
+
+        for action_class in chunk:
+            yield action_class(data=generator.get_sample_data(action_class))
+        produced += len(chunk)
+
+
+def get_shortcut(count: int) -> Shortcut:
+    return Shortcut(name=f'synthetic-{count}', actions=list(iter_actions(count)), deterministic_group_ids=True)
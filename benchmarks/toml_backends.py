@@ -0,0 +1,55 @@
+"""
+Comparison of toml backends on the corpus of examples scaled up 1000 times
+
+Usage (from the root of the repository):
+
+    python -m benchmarks.toml_backends
+"""
+import glob
+import time
+
+from shortcuts import toml_backend
+
+
+SCALE = 1000
+
+
+def get_corpus():
+    """Returns a toml document with actions of all examples repeated SCALE times"""
+    actions = []
+    for filepath in sorted(glob.glob('examples/*.toml')):
+        with open(filepath) as f:
+            actions.extend(toml_backend.get_loads('toml')(f.read())['action'])
+    return {'action': actions * SCALE}
+
+
+def measure(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    data = get_corpus()
+    string = toml_backend.get_dumps('toml')(data)
+    print(f'corpus: {len(data["action"])} actions, {len(string) // 1024} KB')
+
+    for backend in toml_backend.LOADS_BACKENDS:
+        try:
+            loads = toml_backend.get_loads(backend)
+        except ImportError:
+            print(f'loads {backend:<10} not installed')
+            continue
+        print(f'loads {backend:<10} {measure(loads, string):8.3f} s')
+
+    for backend in toml_backend.DUMPS_BACKENDS:
+        try:
+            dumps = toml_backend.get_dumps(backend)
+        except ImportError:
+            print(f'dumps {backend:<10} not installed')
+            continue
+        print(f'dumps {backend:<10} {measure(dumps, data):8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
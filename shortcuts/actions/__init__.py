@@ -1,62 +1,209 @@
+"""
+Registry of actions.
+
+Action classes are listed in the static manifest `ACTIONS`, their modules are imported
+only when an action is used for the first time: by a lookup in `KEYWORD_TO_ACTION_MAP`
+or `ITYPE_TO_ACTION_MAP`, or by an import from this package (`from shortcuts.actions import TextAction`).
+So `import shortcuts` doesn't import all action modules.
+
+A new action must be added to `ACTIONS` (tests check that the manifest matches action classes).
+"""
+import importlib
+import sys
 import types
-from typing import Dict, Type
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Mapping, Optional, Tuple, Type
 
-from shortcuts.actions.b64 import Base64DecodeAction, Base64EncodeAction
 from shortcuts.actions.base import BaseAction
-from shortcuts.actions.calculation import CountAction
-from shortcuts.actions.conditions import ElseAction, EndIfAction, IfAction
-from shortcuts.actions.date import DateAction, FormatDateAction
-from shortcuts.actions.device import (
-    GetBatteryLevelAction,
-    GetDeviceDetailsAction,
-    GetIPAddressAction,
-    SetAirplaneModeAction,
-    SetBluetoothAction,
-    SetBrightnessAction,
-    SetDoNotDisturbAction,
-    SetLowPowerModeAction,
-    SetMobileDataAction,
-    SetTorchAction,
-    SetVolumeAction,
-    SetWiFiAction,
-)
-from shortcuts.actions.dictionary import DictionaryAction, GetDictionaryValueAction
-from shortcuts.actions.files import CreateFolderAction, PreviewDocumentAction, ReadFileAction, SaveFileAction
-from shortcuts.actions.input import AskAction
-from shortcuts.actions.menu import MenuEndAction, MenuItemAction, MenuStartAction
-from shortcuts.actions.messages import SendMessageAction
-from shortcuts.actions.out import ExitAction, ShowAlertAction, ShowResultAction, SpeakTextAction, VibrateAction
-from shortcuts.actions.photo import CameraAction, GetLastPhotoAction, ImageConvertAction, SelectPhotoAction
-from shortcuts.actions.scripting import (
-    ContinueInShortcutAppAction,
-    DelayAction,
-    NothingAction,
-    RepeatEndAction,
-    RepeatStartAction,
-    SetItemNameAction,
-    ViewContentGraphAction,
-    WaitToReturnAction,
+from shortcuts.symbols import add_symbols
+
+
+# (module in `shortcuts.actions`, class name, keyword, itype)
+# if several actions have the same itype, the last one is in `ITYPE_TO_ACTION_MAP`,
+# the right class is found by `resolve_action_class`
+ACTIONS: Tuple[Tuple[str, str, str, str], ...] = (
+    ('b64', 'Base64DecodeAction', 'base64_decode', 'is.workflow.actions.base64encode'),
+    ('b64', 'Base64EncodeAction', 'base64_encode', 'is.workflow.actions.base64encode'),
+    ('calculation', 'CountAction', 'count', 'is.workflow.actions.count'),
+    ('conditions', 'ElseAction', 'else', 'is.workflow.actions.conditional'),
+    ('conditions', 'EndIfAction', 'endif', 'is.workflow.actions.conditional'),
+    ('conditions', 'IfAction', 'if', 'is.workflow.actions.conditional'),
+    ('date', 'DateAction', 'date', 'is.workflow.actions.date'),
+    ('date', 'FormatDateAction', 'format_date', 'is.workflow.actions.format.date'),
+    ('device', 'GetBatteryLevelAction', 'get_battery_level', 'is.workflow.actions.getbatterylevel'),
+    ('device', 'GetDeviceDetailsAction', 'get_device_details', 'is.workflow.actions.getdevicedetails'),
+    ('device', 'GetIPAddressAction', 'get_ip_address', 'is.workflow.actions.getipaddress'),
+    ('device', 'SetAirplaneModeAction', 'set_airplane_mode', 'is.workflow.actions.airplanemode.set'),
+    ('device', 'SetBluetoothAction', 'set_bluetooth', 'is.workflow.actions.bluetooth.set'),
+    ('device', 'SetBrightnessAction', 'set_brightness', 'is.workflow.actions.setbrightness'),
+    ('device', 'SetDoNotDisturbAction', 'set_do_not_disturb', 'is.workflow.actions.dnd.set'),
+    ('device', 'SetLowPowerModeAction', 'set_low_power_mode', 'is.workflow.actions.lowpowermode.set'),
+    ('device', 'SetMobileDataAction', 'set_mobile_data', 'is.workflow.actions.cellulardata.set'),
+    ('device', 'SetTorchAction', 'set_torch', 'is.workflow.actions.flashlight'),
+    ('device', 'SetVolumeAction', 'set_volume', 'is.workflow.actions.setvolume'),
+    ('device', 'SetWiFiAction', 'set_wifi', 'is.workflow.actions.wifi.set'),
+    ('dictionary', 'DictionaryAction', 'dictionary', 'is.workflow.actions.dictionary'),
+    ('dictionary', 'GetDictionaryValueAction', 'get_value_for_key', 'is.workflow.actions.getvalueforkey'),
+    ('files', 'CreateFolderAction', 'create_folder', 'is.workflow.actions.file.createfolder'),
+    ('files', 'PreviewDocumentAction', 'preview', 'is.workflow.actions.previewdocument'),
+    ('files', 'ReadFileAction', 'read_file', 'is.workflow.actions.documentpicker.open'),
+    ('files', 'SaveFileAction', 'save_file', 'is.workflow.actions.documentpicker.save'),
+    ('input', 'AskAction', 'ask', 'is.workflow.actions.ask'),
+    ('menu', 'MenuEndAction', 'end_menu', 'is.workflow.actions.choosefrommenu'),
+    ('menu', 'MenuItemAction', 'menu_item', 'is.workflow.actions.choosefrommenu'),
+    ('menu', 'MenuStartAction', 'start_menu', 'is.workflow.actions.choosefrommenu'),
+    ('messages', 'SendMessageAction', 'send_message', 'is.workflow.actions.sendmessage'),
+    ('out', 'ExitAction', 'exit', 'is.workflow.actions.exit'),
+    ('out', 'ShowAlertAction', 'alert', 'is.workflow.actions.alert'),
+    ('out', 'ShowResultAction', 'show_result', 'is.workflow.actions.showresult'),
+    ('out', 'SpeakTextAction', 'speak_text', 'is.workflow.actions.speaktext'),
+    ('out', 'VibrateAction', 'vibrate', 'is.workflow.actions.vibrate'),
+    ('photo', 'CameraAction', 'take_photo', 'is.workflow.actions.takephoto'),
+    ('photo', 'GetLastPhotoAction', 'get_last_photo', 'is.workflow.actions.getlastphoto'),
+    ('photo', 'ImageConvertAction', 'convert_image', 'is.workflow.actions.image.convert'),
+    ('photo', 'SelectPhotoAction', 'select_photo', 'is.workflow.actions.selectphoto'),
+    ('scripting', 'ContinueInShortcutAppAction', 'continue_in_shortcut_app', 'is.workflow.actions.handoff'),
+    ('scripting', 'DelayAction', 'delay', 'is.workflow.actions.delay'),
+    ('scripting', 'NothingAction', 'nothing', 'is.workflow.actions.nothing'),
+    ('scripting', 'RepeatEndAction', 'repeat_end', 'is.workflow.actions.repeat.count'),
+    ('scripting', 'RepeatStartAction', 'repeat_start', 'is.workflow.actions.repeat.count'),
+    ('scripting', 'SetItemNameAction', 'set_item_name', 'is.workflow.actions.setitemname'),
+    ('scripting', 'ViewContentGraphAction', 'view_content_graph', 'is.workflow.actions.viewresult'),
+    ('scripting', 'WaitToReturnAction', 'wait_to_return', 'is.workflow.actions.waittoreturn'),
+    ('text', 'CommentAction', 'comment', 'is.workflow.actions.comment'),
+    ('text', 'TextAction', 'text', 'is.workflow.actions.gettext'),
+    ('variables', 'GetVariableAction', 'get_variable', 'is.workflow.actions.getvariable'),
+    ('variables', 'SetVariableAction', 'set_variable', 'is.workflow.actions.setvariable'),
+    ('web', 'GetURLAction', 'get_url', 'is.workflow.actions.downloadurl'),
+    ('web', 'URLAction', 'url', 'is.workflow.actions.url'),
 )
-from shortcuts.actions.text import CommentAction, TextAction
-from shortcuts.actions.variables import GetVariableAction, SetVariableAction
-from shortcuts.actions.web import GetURLAction, URLAction
+# itypes and keywords are in every loaded shortcut, loaders share them (see `shortcuts.symbols`)
+add_symbols(itype for _, _, _, itype in ACTIONS)
+add_symbols(keyword for _, _, keyword, _ in ACTIONS)
+
+
+class ActionMap(Mapping[str, Type[BaseAction]]):
+    """Read-only map: key -> action class. The module of an action is imported on the first lookup"""
+    def __init__(self, class_names: Dict[str, str]) -> None:
+        self._class_names = class_names  # key -> class name
+        self._classes: Dict[str, Type[BaseAction]] = {}
+
+    def __getitem__(self, key: str) -> Type[BaseAction]:
+        try:
+            return self._classes[key]
+        except KeyError:
+            action_class = self._classes[key] = get_action_class(self._class_names[key])
+            return action_class
+
+    def get(self, key: str, default: Any = None) -> Any:  # type: ignore
+        # it's called for every loaded action, so the imported classes are checked first
+        action_class = self._classes.get(key)
+        if action_class is None:
+            return self[key] if key in self._class_names else default
+        return action_class
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._class_names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._class_names)
+
+    def __len__(self) -> int:
+        return len(self._class_names)
+
+
+# class name -> module
+_MODULES: Dict[str, str] = {class_name: module for module, class_name, _, _ in ACTIONS}
+
+KEYWORD_TO_ACTION_MAP = ActionMap({keyword: class_name for _, class_name, keyword, _ in ACTIONS})
+ITYPE_TO_ACTION_MAP = ActionMap({itype: class_name for _, class_name, _, itype in ACTIONS})
+
+
+def _get_itype_class_names() -> Dict[str, List[str]]:
+    """Returns itype -> class names of actions with this itype"""
+    itype_class_names: Dict[str, List[str]] = {}
+    for _, class_name, _, itype in ACTIONS:
+        itype_class_names.setdefault(itype, []).append(class_name)
+    return itype_class_names
+
+
+_ITYPE_CLASS_NAMES = _get_itype_class_names()
+
+# itype -> (discriminator parameter, value of the parameter -> class, class for a missing parameter)
+# an itype is indexed on the first lookup, together with the import of its actions
+_ITYPE_INDEX: Dict[str, Tuple[Optional[str], Dict[Any, Type[BaseAction]], Optional[Type[BaseAction]]]] = {}
+
+
+def resolve_action_class(itype: str, parameters: Mapping[str, Any]) -> Optional[Type[BaseAction]]:
+    """
+    Returns the action class by itype and parameters of an action from a plist, None if the action is unknown.
+    Actions with the same itype are distinguished by the value of their `discriminator` parameter
+    """
+    try:
+        discriminator, variants, default = _ITYPE_INDEX[itype]
+    except KeyError:
+        if itype not in _ITYPE_CLASS_NAMES:
+            return None
+        discriminator, variants, default = _ITYPE_INDEX[itype] = _index_itype(itype)
+
+    if discriminator is None:
+        return default
+
+    if discriminator not in parameters:
+        if default is None:
+            raise RuntimeError(f'Action "{itype}" must have parameter "{discriminator}"')
+        return default
+
+    value = parameters[discriminator]
+    try:
+        return variants[value]
+    except (KeyError, TypeError):  # TypeError: unhashable value
+        raise RuntimeError(f'Unknown {discriminator}: "{value}"')
+
+
+def _index_itype(itype: str) -> Tuple[Optional[str], Dict[Any, Type[BaseAction]], Optional[Type[BaseAction]]]:
+    classes = [get_action_class(class_name) for class_name in _ITYPE_CLASS_NAMES[itype]]
+    if len(classes) == 1:
+        return None, {}, classes[0]
+
+    discriminators = {action_class.discriminator for action_class in classes}
+    if len(discriminators) != 1 or None in discriminators:
+        raise RuntimeError(f'Actions with itype "{itype}" must have the same discriminator: {classes}')
+    discriminator = discriminators.pop()
+
+    variants = {action_class.default_fields[discriminator]: action_class for action_class in classes}  # type: ignore
+    if len(variants) != len(classes):
+        raise RuntimeError(f'Actions with itype "{itype}" must have different values of "{discriminator}"')
+
+    defaults = [action_class for action_class in classes if action_class.default_variant]
+    return discriminator, variants, defaults[0] if defaults else None
 
 
-# flake8: noqa
+def get_action_class(class_name: str) -> Type[BaseAction]:
+    """Imports the module of the action and returns its class"""
+    module = importlib.import_module(f'shortcuts.actions.{_MODULES[class_name]}')
+    action_class = getattr(module, class_name)
+    globals()[class_name] = action_class  # the next import from the package doesn't call `__getattr__`
+    return action_class
 
 
-KEYWORD_TO_ACTION_MAP: Dict[str, Type[BaseAction]] = {}
-ITYPE_TO_ACTION_MAP: Dict[str, Type[BaseAction]] = {}
+class _ActionsModule(types.ModuleType):
+    """
+    Imports action classes on the first access to them as attributes of the package.
+    It's the class of the module instead of module-level `__getattr__` (PEP 562) which needs python 3.7
+    """
+    def __getattr__(self, name: str) -> Type[BaseAction]:
+        # it's called only if the module doesn't have the attribute yet
+        if name in _MODULES:
+            return get_action_class(name)
+        raise AttributeError(f'module {self.__name__!r} has no attribute {name!r}')
 
+    def __dir__(self) -> List[str]:
+        return sorted(set(globals()) | set(_MODULES))
 
-def _create_maps():
-    # from all imported actions above it
-    # creates two maps: KEYWORD_TO_ACTION_MAP and ITYPE_TO_ACTION_MAP
-    # which the library uses to find action classes by keyword or type
-    for name, val in globals().items():
-        if isinstance(val, type) and issubclass(val, base.BaseAction) and val.keyword:
-            KEYWORD_TO_ACTION_MAP[val.keyword] = val
-            ITYPE_TO_ACTION_MAP[val.itype] = val
 
+sys.modules[__name__].__class__ = _ActionsModule
 
-_create_maps()
+if TYPE_CHECKING:
+    # type checkers don't know about the class of the module
+    def __getattr__(name: str) -> Type[BaseAction]:
+        ...
@@ -5,6 +5,8 @@ class Base64EncodeAction(BaseAction):
     '''Base64 encode'''
     itype = 'is.workflow.actions.base64encode'
     keyword = 'base64_encode'
+    discriminator = 'WFEncodeMode'
+    default_variant = True  # Shortcuts app encodes if WFEncodeMode is missing
 
     default_fields = {
         'WFEncodeMode': 'Encode',
@@ -15,6 +17,7 @@ class Base64DecodeAction(BaseAction):
     '''Base64 decode'''
     itype = 'is.workflow.actions.base64encode'
     keyword = 'base64_decode'
+    discriminator = 'WFEncodeMode'
 
     default_fields = {
         'WFEncodeMode': 'Decode',
@@ -1,79 +1,192 @@
+import functools
 import re
-from copy import deepcopy
-from typing import Any, Dict, List, Tuple, Union
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Type, Union
 
+from shortcuts.symbols import add_symbols
 
-class BaseAction:
-    itype: Union[str, None] = None  # identificator from shortcut source (being used by iOS app): WFWorkflowActionIdentifier
-    keyword: Union[str, None] = None  # this keyword is being used in the toml file
-    default_fields: Dict = {}  # noqa dictionary with default parameters fields
 
-    def __init__(self, data: Union[Dict, None] = None) -> None:
-        self.data = data if data is not None else {}
-        self.default_fields = deepcopy(self.default_fields)
+class SlotsMeta(type):
+    """
+    Adds empty `__slots__` to classes which don't declare them,
+    so instances of actions and fields never have `__dict__`
+    """
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        namespace.setdefault('__slots__', ())
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
 
-    def dump(self) -> Dict:
-        data = {
-            'WFWorkflowActionIdentifier': self.itype,
-            'WFWorkflowActionParameters': {},
-        }
 
-        data['WFWorkflowActionParameters'].update(  # type: ignore
-            self._get_parameters(),
-        )
+class DefaultFields:
+    """
+    Descriptor of `BaseAction.default_fields`: the read-only mapping of the class,
+    or the own copy of an instance which was changed by `_set_default_field`
+    """
+    def __get__(self, instance: Optional['BaseAction'], owner: Type['BaseAction']) -> Mapping[str, Any]:
+        if instance is not None and instance._own_default_fields is not None:
+            return instance._own_default_fields
+        return owner._class_default_fields
 
-        return data
 
-    def _get_parameters(self) -> Dict:
-        params = {}
+class BaseAction(metaclass=SlotsMeta):
+    # instances hold only data and, if it was changed, own copy of default fields,
+    # everything else is shared by all instances of the class
+    __slots__ = ('data', '_own_default_fields')
 
-        if self.default_fields:
-            params.update(self.default_fields)
+    itype: Union[str, None] = None  # identificator from shortcut source (being used by iOS app): WFWorkflowActionIdentifier
+    keyword: Union[str, None] = None  # this keyword is being used in the toml file
+    # dictionary with default parameters fields, it's shared by all instances of the class (read-only),
+    # an instance gets its own copy only when it changes a value: see `_set_default_field`
+    default_fields: Mapping[str, Any] = DefaultFields()  # type: ignore
+    _class_default_fields: Mapping[str, Any] = MappingProxyType({})
+    # actions with the same itype are distinguished by the value of this parameter in `default_fields`,
+    # for example `WFControlFlowMode` of if/else/endif actions (see `shortcuts.actions.resolve_action_class`)
+    discriminator: Union[str, None] = None
+    default_variant = False  # the action is used if a plist doesn't have the discriminator parameter
+
+    # field registry, it is collected once per class by `__init_subclass__`
+    _fields: Tuple['Field', ...] = ()
+    _fields_by_name: Mapping[str, 'Field'] = MappingProxyType({})  # WF parameter name -> field
+    _fields_by_attr: Mapping[str, 'Field'] = MappingProxyType({})  # class attribute name -> field
+
+    # serialization plan, compiled once per class from the fields:
+    # (parameter name, attribute name, converter or None, default value, required)
+    _dump_plan: Tuple[Tuple[str, str, Optional[Callable], Any, bool], ...] = ()
+    # actions without fields don't need own instances (see `create`)
+    _shared_instance: Optional['BaseAction'] = None
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if 'default_fields' in cls.__dict__:
+            # the mapping of the class is moved behind the descriptor of `BaseAction`
+            cls._class_default_fields = MappingProxyType(dict(cls.__dict__['default_fields']))
+            delattr(cls, 'default_fields')
+            add_symbols(cls._class_default_fields)
+        cls._collect_fields()
+        cls._compile_dump_plan()
+        cls._shared_instance = None  # it's not inherited: a subclass can have fields
+
+    @classmethod
+    def _collect_fields(cls) -> None:
+        """Collects all fields of the class (including inherited ones) sorted by attribute name"""
+        fields_by_attr = {}
+        for attr in dir(cls):
+            field = getattr(cls, attr)
+            if isinstance(field, Field):
+                fields_by_attr[attr] = field
+
+        cls._fields = tuple(fields_by_attr.values())
+        # names of parameters (plists) and attributes (toml files) are shared by loaded shortcuts
+        add_symbols(f.name for f in cls._fields)
+        add_symbols(fields_by_attr)
+        cls._fields_by_name = MappingProxyType({f.name: f for f in cls._fields})
+        cls._fields_by_attr = MappingProxyType(fields_by_attr)
+
+    @classmethod
+    def _compile_dump_plan(cls) -> None:
+        cls._dump_plan = tuple(
+            (field.name, attr, field.get_converter(), field.default, field.required)
+            for attr, field in cls._fields_by_attr.items()
+        )
 
-        for field in self.fields:
-            try:
-                data_value = self.data[field._attr]
-            except KeyError:
-                if field.default is not None:
-                    data_value = field.default
-                elif field.required:
-                    raise ValueError(f'{self}, Field is required: {field._attr}:{field.name}')
-                else:
-                    continue
+    def __init__(self, data: Union[Dict, None] = None) -> None:
+        self.data = data if data is not None else {}
+        self._own_default_fields: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def create(cls, data: Union[Dict, None] = None) -> 'BaseAction':
+        """
+        Returns a new action, or the shared read-only instance if the action doesn't have fields
+        and data is empty. Loaders create actions with this method
+        """
+        if data or cls._fields:
+            return cls(data=data)
+
+        if cls._shared_instance is None:
+            action = cls()
+            action.data = MappingProxyType({})  # type: ignore
+            cls._shared_instance = action
+        return cls._shared_instance
+
+    def _set_default_field(self, name: str, value: Any) -> None:
+        """Copy-on-write: default fields of the class are copied to the instance on the first change"""
+        if self._own_default_fields is None:
+            if self is self._shared_instance:
+                raise TypeError(f'{self} is shared by all actions of the class, it can\'t be changed')
+            self._own_default_fields = dict(self._class_default_fields)
+        self._own_default_fields[name] = value
+
+    def dump(self, extra_data: Optional[Dict] = None) -> Dict:
+        """
+        extra_data: values which are used instead of values from `self.data` only in this dump,
+        for example group ids which are generated by the shortcut
+        """
+        return {
+            'WFWorkflowActionIdentifier': self.itype,
+            'WFWorkflowActionParameters': self._get_parameters(extra_data),
+        }
 
-            params[field.name] = field.process_value(data_value)
+    def _has_class_dump(self) -> bool:
+        """
+        Checks that the dump of the action is the same for all actions of the class:
+        the action doesn't have fields and its default fields were not changed
+        """
+        return not self._fields and self._own_default_fields is None
+
+    def _get_parameters(self, extra_data: Optional[Dict] = None) -> Dict:
+        own_default_fields = self._own_default_fields
+        params = dict(self._class_default_fields if own_default_fields is None else own_default_fields)
+        data = self.data if not extra_data else {**self.data, **extra_data}
+
+        for name, attr, converter, default, required in self._dump_plan:
+            if attr in data:
+                value = data[attr]
+            elif default is not None:
+                value = default
+            elif required:
+                raise ValueError(f'{self}, Field is required: {attr}:{name}')
+            else:
+                continue
+
+            params[name] = converter(value) if converter is not None else value
 
         return params
 
     @property
-    def fields(self) -> List[Any]:
-        if not hasattr(self, '_fields'):
-            self._fields: List['Field'] = []
-            for attr in dir(self):
-                field = getattr(self, attr)
-                if isinstance(field, (Field, VariablesField)):
-                    field._attr = attr
-                    self._fields.append(field)
-
+    def fields(self) -> Tuple['Field', ...]:
         return self._fields
 
 
-class Field:
-    _attr: Union[None, str] = None
+class Field(metaclass=SlotsMeta):
+    # subclasses with own attributes declare them in `__slots__` (see `ChoiceField`)
+    __slots__ = ('name', 'required', 'capitalize', 'help', 'default', '_attr')
 
     def __init__(self, name, default=None, required=True, capitalize=False, help=''):
+        self._attr: Union[None, str] = None  # it's set when the field is assigned to an action class
         self.name = name
         self.required = required
         self.capitalize = capitalize
         self.help = help
         self.default = default
 
+    def __set_name__(self, owner, attr):
+        # called once, when the field is assigned to an attribute of an action class
+        self._attr = attr
+
     def process_value(self, value):
         if self.capitalize:
             value = value.capitalize()
 
         return value
 
+    def get_converter(self) -> Optional[Callable]:
+        """
+        Returns a callable which is used to convert values of this field during dump,
+        or None if values don't need any conversion
+        """
+        if type(self).process_value is Field.process_value and not self.capitalize:
+            return None
+        return self.process_value
+
 
 class GroupIDField(Field):
     def __init__(self, *args, **kwargs):
@@ -82,6 +195,8 @@ class GroupIDField(Field):
 
 
 class ChoiceField(Field):
+    __slots__ = ('choices',)
+
     def __init__(self, name, choices, required=True, capitalize=False, help=''):
         super().__init__(name=name, required=required, capitalize=capitalize, help=help)
         self.choices = choices
@@ -105,11 +220,21 @@ class FloatField(Field):
     def process_value(self, value):
         return float(super().process_value(value))
 
+    def get_converter(self) -> Optional[Callable]:
+        if type(self).process_value is FloatField.process_value and not self.capitalize:
+            return float
+        return self.process_value
+
 
 class IntegerField(Field):
     def process_value(self, value):
         return int(super().process_value(value))
 
+    def get_converter(self) -> Optional[Callable]:
+        if type(self).process_value is IntegerField.process_value and not self.capitalize:
+            return int
+        return self.process_value
+
 
 class BooleanField(Field):
     def process_value(self, value):
@@ -136,8 +261,39 @@ class WFVariableField(Field):
         }
 
 
+OBJECT_REPLACEMENT_CHARACTER = '\ufffc'
+VARIABLE_REGEXP = re.compile(r'{{([A-Za-z0-9_-]+)}}')
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_variables(value: str) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    """
+    Replaces every variable in the text with OBJECT REPLACEMENT CHARACTER in a single pass.
+    Returns the new string and (range, variable name) for all variables.
+    Range is "{position, 1}", where position is the index of the variable's replacement character
+    in the new string.
+
+    Generated shortcuts often repeat the same strings, so results are cached.
+    """
+    parts = []
+    variables = []
+    last_end = 0
+    position = 0
+    for m in VARIABLE_REGEXP.finditer(value):
+        start, end = m.span()
+        parts.append(value[last_end:start])
+        parts.append(OBJECT_REPLACEMENT_CHARACTER)
+        position += start - last_end
+        variables.append(('{%d, 1}' % position, m.group(1)))
+        position += 1  # the replacement character
+        last_end = end
+
+    parts.append(value[last_end:])
+    return ''.join(parts), tuple(variables)
+
+
 class VariablesField(Field):
-    _regexp = re.compile(r'({{[A-Za-z0-9_-]+}})')
+    _regexp = VARIABLE_REGEXP
     _system_variables = {
         'ask_when_run': 'Ask',
     }
@@ -147,8 +303,12 @@ class VariablesField(Field):
         if token:
             return token
 
+        attachments_by_range, string = self._get_variables_from_text(value)
         return {
-            'Value': self._get_variables_dict(value),
+            'Value': {
+                'attachmentsByRange': attachments_by_range,
+                'string': string,
+            },
             'WFSerializationType': 'WFTextTokenString',
         }
 
@@ -161,29 +321,23 @@ class VariablesField(Field):
                 'Value': {'Type': type},
             }
 
-    def _get_variables_dict(self, value: str) -> Dict:
-        attachments_by_range, string = self._get_variables_from_text(value)
-        return {
-            'attachmentsByRange': attachments_by_range,
-            'string': string,
-        }
-
     def _get_variables_from_text(self, value: str) -> Tuple[Dict[str, Dict[str, str]], str]:
+        if '{{' not in value:
+            # fast path: most of texts don't have variables
+            return {}, value
+
+        # replacing all variables with char 65523 (OBJECT REPLACEMENT CHARACTER)
+        string, variables = _parse_variables(value)
+
+        # dictionaries are built on every call, so the cached result can't be modified by the caller
         attachments_by_range = {}
-        offset = 0
-        for m in self._regexp.finditer(value):
-            variable_name = m.group().strip('{}')
+        for variable_range, variable_name in variables:
             type = self._system_variables.get(variable_name, 'Variable')
-            variable_range = f'{{{m.start() - offset}, {1}}}'
-            attachments_by_range[variable_range] = {
-                'Type': type,
-            }
+            attachment = {'Type': type}
             if type == 'Variable':
-                attachments_by_range[variable_range]['VariableName'] = variable_name
-            offset += len(m.group())
+                attachment['VariableName'] = variable_name
+            attachments_by_range[variable_range] = attachment
 
-        # replacing all variables with char 65523 (OBJECT REPLACEMENT CHARACTER)
-        string = self._regexp.sub('￼', value)
         return attachments_by_range, string
 
 
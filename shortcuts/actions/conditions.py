@@ -11,6 +11,7 @@ class IfAction(BaseAction):
     '''If'''
     itype = 'is.workflow.actions.conditional'
     keyword = 'if'
+    discriminator = 'WFControlFlowMode'
 
     condition = ChoiceField('WFCondition', choices=IF_CHOICES, capitalize=True)
     compare_with = Field('WFConditionalActionString')
@@ -25,6 +26,7 @@ class ElseAction(BaseAction):
     '''Else'''
     itype = 'is.workflow.actions.conditional'
     keyword = 'else'
+    discriminator = 'WFControlFlowMode'
 
     group_id = GroupIDField('GroupingIdentifier')
 
@@ -37,6 +39,7 @@ class EndIfAction(BaseAction):
     '''EndIf: end a condition'''
     itype = 'is.workflow.actions.conditional'
     keyword = 'endif'
+    discriminator = 'WFControlFlowMode'
 
     group_id = GroupIDField('GroupingIdentifier')
 
@@ -28,6 +28,7 @@ class MenuStartAction(BaseAction):
     '''
     itype = 'is.workflow.actions.choosefrommenu'
     keyword = 'start_menu'
+    discriminator = 'WFControlFlowMode'
 
     group_id = GroupIDField('GroupingIdentifier')
 
@@ -47,6 +48,7 @@ class MenuItemAction(BaseAction):
     '''
     itype = 'is.workflow.actions.choosefrommenu'
     keyword = 'menu_item'
+    discriminator = 'WFControlFlowMode'
 
     group_id = GroupIDField('GroupingIdentifier')
     title = Field('WFMenuItemTitle')
@@ -60,6 +62,7 @@ class MenuEndAction(BaseAction):
     '''End menu'''
     itype = 'is.workflow.actions.choosefrommenu'
     keyword = 'end_menu'
+    discriminator = 'WFControlFlowMode'
 
     group_id = GroupIDField('GroupingIdentifier')
 
@@ -56,6 +56,7 @@ class RepeatStartAction(BaseAction):
     '''Repeat'''
     itype = 'is.workflow.actions.repeat.count'
     keyword = 'repeat_start'
+    discriminator = 'WFControlFlowMode'
 
     group_id = GroupIDField('GroupingIdentifier')
     count = IntegerField('WFRepeatCount')
@@ -69,6 +70,7 @@ class RepeatEndAction(BaseAction):
     '''Repeat'''
     itype = 'is.workflow.actions.repeat.count'
     keyword = 'repeat_end'
+    discriminator = 'WFControlFlowMode'
 
     group_id = GroupIDField('GroupingIdentifier')
 
@@ -35,13 +35,12 @@ class GetURLAction(BaseAction):
     form = DictionaryField('WFFormValues', required=False)  # todo: array or dict
 
     def __init__(self, data: Union[Dict, None] = None) -> None:
-        self.default_fields = {}
         super().__init__(data=data)
 
         if data and data.get('form'):
-            self.default_fields['WFHTTPBodyType'] = 'Form'
+            self._set_default_field('WFHTTPBodyType', 'Form')
         elif data and data.get('json'):
-            self.default_fields['WFHTTPBodyType'] = 'Json'
+            self._set_default_field('WFHTTPBodyType', 'Json')
 
         if data and data.get('headers'):
-            self.default_fields['ShowHeaders'] = True
+            self._set_default_field('ShowHeaders', True)
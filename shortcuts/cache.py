@@ -0,0 +1,109 @@
+import hashlib
+import os
+import re
+import shutil
+from typing import Iterator, List, Tuple
+
+import shortcuts
+
+
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024  # bytes
+# artifacts are stored only in this subdirectory of the cache directory: `artifacts/<key[:2]>/<key>`
+ARTIFACTS_DIRNAME = 'artifacts'
+KEY_REGEXP = re.compile(r'^[0-9a-f]{64}$')  # sha256, see `CompileCache.get_key`
+
+
+def get_default_cache_dir() -> str:
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'shortcuts')
+
+
+class CompileCache:
+    """
+    On-disk cache of conversion results.
+
+    Every artifact is stored under a key which is a hash of the input content,
+    the library version and the output format, so a changed source, a new version of the library
+    or another output format never hit an old artifact.
+    Artifacts are evicted in LRU order (by modification time, which is updated on every hit)
+    when the size of the cache exceeds `max_size` bytes.
+    Only files which look like artifacts are evicted, other files in the directory are never touched.
+    """
+    def __init__(self, dirpath: str, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.dirpath = dirpath
+        self.max_size = max_size
+
+    def get_key(self, content: bytes, out_format: str) -> str:
+        key = hashlib.sha256()
+        key.update(f'{shortcuts.VERSION}:{out_format}:'.encode('utf-8'))
+        key.update(content)
+        return key.hexdigest()
+
+    def get(self, key: str, out_filepath: str) -> bool:
+        """Copies the cached artifact to `out_filepath`, returns False if there is no such artifact"""
+        filepath = self._get_filepath(key)
+        try:
+            shutil.copyfile(filepath, out_filepath)
+            os.utime(filepath)  # mark as recently used
+        except FileNotFoundError:
+            return False
+        return True
+
+    def put(self, key: str, filepath: str) -> None:
+        """Saves a copy of `filepath` to the cache"""
+        cache_filepath = self._get_filepath(key)
+        os.makedirs(os.path.dirname(cache_filepath), exist_ok=True)
+
+        import tempfile  # it's needed only on a miss, a hit doesn't pay for its import
+
+        # the artifact is copied to a temporary file and then renamed,
+        # so parallel workers never see a partially written artifact
+        fd, tmp_filepath = tempfile.mkstemp(dir=os.path.dirname(cache_filepath))
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file, open(filepath, 'rb') as f:
+                shutil.copyfileobj(f, tmp_file)
+            os.replace(tmp_filepath, cache_filepath)
+        except BaseException:
+            os.unlink(tmp_filepath)
+            raise
+
+    def evict(self) -> None:
+        """Removes least recently used artifacts until the cache fits into `max_size`"""
+        artifacts: List[Tuple[float, int, str]] = []
+        total_size = 0
+        for filepath in self._iter_artifacts():
+            try:
+                stat = os.stat(filepath, follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            artifacts.append((stat.st_mtime, stat.st_size, filepath))
+            total_size += stat.st_size
+
+        for _, size, filepath in sorted(artifacts):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.unlink(filepath)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def _iter_artifacts(self) -> Iterator[str]:
+        """Yields paths of artifacts: files with names of keys in `artifacts/<key[:2]>/` directories"""
+        artifacts_dirpath = os.path.join(self.dirpath, ARTIFACTS_DIRNAME)
+        try:
+            subdirs = list(os.scandir(artifacts_dirpath))
+        except FileNotFoundError:
+            return
+
+        for subdir in subdirs:
+            if len(subdir.name) != 2 or not subdir.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(subdir.path):
+                if (KEY_REGEXP.match(entry.name) and entry.name[:2] == subdir.name
+                        and entry.is_file(follow_symlinks=False)):
+                    yield entry.path
+
+    def _get_filepath(self, key: str) -> str:
+        # artifacts are spread over subdirectories to keep directories small
+        return os.path.join(self.dirpath, ARTIFACTS_DIRNAME, key[:2], key)
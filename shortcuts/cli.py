@@ -1,24 +1,147 @@
 import argparse
+import glob
+import io
 import os.path
+import sys
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
 import shortcuts
-from shortcuts.utils import convert_plist_to_binary, convert_plist_to_xml
 
 
-def convert_shortcut(input_filepath, out_filepath):
+if TYPE_CHECKING:
+    from shortcuts.cache import CompileCache  # noqa
+
+
+SUPPORTED_EXTENSIONS = ('shortcut', 'plist', 'toml')
+# the compile cache and the profiler are imported only when they are used,
+# so their defaults are repeated here (see `shortcuts.cache` and `shortcuts.profiling`)
+DEFAULT_CACHE_DIR = '$XDG_CACHE_HOME/shortcuts or ~/.cache/shortcuts'
+DEFAULT_CACHE_SIZE = 512  # MB
+PROFILE_FORMATS = ('json', 'cprofile')
+
+
+def convert_shortcut(input_filepath, out_filepath, cache: Optional['CompileCache'] = None):
     input_format = _get_format(input_filepath)
     out_format = _get_format(out_filepath)
 
-    if input_format == 'plist':
-        convert_plist_to_xml(input_filepath)
+    if cache is None:
+        # binary and XML plists are parsed natively, the input file is never modified
+        with open(input_filepath, 'rb') as f:
+            sc = shortcuts.Shortcut.load(f, file_format=input_format)
+        _dump_shortcut(sc, out_filepath, out_format)
+        return
 
     with open(input_filepath, 'rb') as f:
-        sc = shortcuts.Shortcut.load(f, file_format=input_format)
-    with open(out_filepath, 'w') as f:
-        sc.dump(f, file_format=out_format)
+        content = f.read()
+
+    key = cache.get_key(content, out_format)
+    if cache.get(key, out_filepath):
+        return
+
+    sc = shortcuts.Shortcut.load(io.BytesIO(content), file_format=input_format)
+    _dump_shortcut(sc, out_filepath, out_format)
+    cache.put(key, out_filepath)
 
+
+def _dump_shortcut(sc, out_filepath, out_format):
     if out_format == 'plist':
-        convert_plist_to_binary(out_filepath)
+        # Shortcuts app imports binary plists, so they are written directly without plutil
+        with open(out_filepath, 'wb') as f:
+            sc.dump(f, file_format='bplist')
+    else:
+        # toml files are always UTF-8, whatever the locale is
+        with open(out_filepath, 'w', encoding='utf-8') as f:
+            sc.dump(f, file_format=out_format)
+
+
+def convert_shortcuts(input_paths: List[str],
+                      out_dirpath: str,
+                      out_extension: Optional[str] = None,
+                      jobs: Optional[int] = None,
+                      cache: Optional['CompileCache'] = None) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Converts many files at once and saves results to `out_dirpath`.
+
+    `input_paths` can contain files, directories (all supported files in them are converted)
+    and glob patterns. If `out_extension` is not set, toml files are converted to shortcuts
+    and shortcuts to toml files.
+
+    Files are converted by `jobs` worker processes (by default one per CPU).
+    A failed file doesn't stop the batch: returns list of (input file, output file, error or None).
+    Raises ValueError if several input files have the same output file.
+    """
+    tasks = []
+    input_filepaths: Dict[str, str] = {}  # output file -> input file
+    for input_filepath, out_relpath in _collect_input_files(input_paths):
+        out_filepath = _get_out_filepath(input_filepath, out_dirpath, out_relpath, out_extension)
+        # otherwise one result is overwritten by another one (and parallel workers write the same file)
+        key = os.path.normcase(os.path.abspath(out_filepath))
+        if key in input_filepaths:
+            raise ValueError(
+                f'{input_filepaths[key]} and {input_filepath} have the same output file: {out_filepath}',
+            )
+        input_filepaths[key] = input_filepath
+        tasks.append((input_filepath, out_filepath, cache))
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(tasks) <= 1:
+        results = [_convert_task(task) for task in tasks]
+    else:
+        # imported only for parallel batches: it's the most expensive import of the command line tool
+        from concurrent.futures import ProcessPoolExecutor
+
+        # every worker imports the library and the actions registry once
+        # and converts a chunk of files, so the start-up cost is paid only once per process
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_convert_task, tasks, chunksize=chunksize))
+
+    if cache is not None:
+        # workers only add artifacts, the cache is trimmed once after the whole batch
+        cache.evict()
+
+    return results
+
+
+def _convert_task(task: Tuple[str, str, Optional['CompileCache']]) -> Tuple[str, str, Optional[str]]:
+    input_filepath, out_filepath, cache = task
+    try:
+        os.makedirs(os.path.dirname(out_filepath), exist_ok=True)
+        convert_shortcut(input_filepath, out_filepath, cache=cache)
+    except Exception as e:
+        # exception objects are not always picklable, so only the message is returned to the main process
+        return input_filepath, out_filepath, f'{e.__class__.__name__}: {e}'
+
+    return input_filepath, out_filepath, None
+
+
+def _collect_input_files(input_paths: List[str]) -> Iterator[Tuple[str, str]]:
+    """Yields (input file, output path relative to the output directory) for every input file"""
+    for input_path in input_paths:
+        if os.path.isdir(input_path):
+            for dirpath, _, filenames in os.walk(input_path):
+                for filename in sorted(filenames):
+                    if _is_supported(filename):
+                        filepath = os.path.join(dirpath, filename)
+                        yield filepath, os.path.relpath(filepath, input_path)
+        elif any(c in input_path for c in '*?['):  # glob pattern
+            for filepath in sorted(glob.glob(input_path, recursive=True)):
+                if os.path.isfile(filepath) and _is_supported(filepath):
+                    yield filepath, os.path.basename(filepath)
+        else:
+            yield input_path, os.path.basename(input_path)
+
+
+def _is_supported(filepath: str) -> bool:
+    return os.path.splitext(filepath)[1].strip('.') in SUPPORTED_EXTENSIONS
+
+
+def _get_out_filepath(input_filepath: str, out_dirpath: str, out_relpath: str, out_extension: Optional[str]) -> str:
+    if not out_extension:
+        out_extension = 'shortcut' if _get_format(input_filepath) == 'toml' else 'toml'
+
+    out_relpath, _ = os.path.splitext(out_relpath)
+    return os.path.join(out_dirpath, f'{out_relpath}.{out_extension}')
 
 
 def _get_format(filepath):
@@ -32,22 +155,232 @@ def _get_format(filepath):
     raise RuntimeError(f'Unsupported file format: {filepath}: "{ext}"')
 
 
+def generate_shortcuts(out_dirpath: str,
+                       count: int,
+                       out_extension: str = 'toml',
+                       seed: Any = None,
+                       **options: Any) -> List[str]:
+    """
+    Generates `count` random shortcuts (see `shortcuts.generator.ShortcutGenerator`, `options` are passed to it)
+    and saves them to `out_dirpath`. Every shortcut is written while it is generated.
+    Returns list of generated files.
+    """
+    from shortcuts.generator import ShortcutGenerator
+
+    filepaths = []
+    for index in range(count):
+        # shortcuts are different, but every one of them can be reproduced with the same seed
+        generator = ShortcutGenerator(seed=f'{seed}:{index}' if seed is not None else None, **options)
+        os.makedirs(out_dirpath, exist_ok=True)
+        filepath = os.path.join(out_dirpath, f'synthetic-{index}.{out_extension}')
+        if _get_format(filepath) == 'toml':
+            with open(filepath, 'w') as f:
+                generator.dump(f, file_format='toml', name=f'synthetic-{index}')
+        else:
+            # .shortcut files are imported by Shortcuts app, so they are binary as converted ones
+            file_format = 'bplist' if out_extension == 'shortcut' else 'plist'
+            with open(filepath, 'wb') as f:
+                generator.dump(f, file_format=file_format, name=f'synthetic-{index}')
+        filepaths.append(filepath)
+
+    return filepaths
+
+
+def _parse_action_types(string: str) -> Dict[str, float]:
+    """Parses "text=5,if=1" to {"text": 5.0, "if": 1.0}"""
+    action_types = {}
+    for item in string.split(','):
+        keyword, _, weight = item.partition('=')
+        try:
+            action_types[keyword.strip()] = float(weight) if weight else 1.0
+        except ValueError:
+            raise argparse.ArgumentTypeError(f'invalid weight of "{keyword}": "{weight}"')
+    return action_types
+
+
+def generate_main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog='shortcuts generate',
+        description='Shortcuts: generator of random shortcuts for load testing',
+    )
+    parser.add_argument('output_dir', help='Directory for generated shortcuts')
+    parser.add_argument('-n', '--count', type=int, default=1, help='Number of shortcuts (default: %(default)s)')
+    parser.add_argument(
+        '--actions',
+        type=int,
+        default=100,
+        help='Number of actions in every shortcut (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--output-format',
+        choices=SUPPORTED_EXTENSIONS,
+        default='toml',
+        help='Extension of generated files: shortcut is a binary plist, plist is an XML plist (default: %(default)s)',
+    )
+    parser.add_argument('--seed', help='Seed of the random generator, the same seed generates the same shortcuts')
+    parser.add_argument(
+        '--max-depth',
+        type=int,
+        default=3,
+        help='Max nesting depth of if/repeat/menu blocks (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--max-block-size',
+        type=int,
+        default=10,
+        help='Max number of actions in a branch of a block (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--variables-density',
+        type=float,
+        default=0.2,
+        help='Share of variables in text fields with variables, 0..1 (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--max-dictionary-size',
+        type=int,
+        default=5,
+        help='Max number of items in dictionaries (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--action-types',
+        type=_parse_action_types,
+        help='Mix of action types: comma separated keywords with weights, "text=5,if=1" (default: all actions)',
+    )
+
+    args = parser.parse_args(argv)
+
+    try:
+        filepaths = generate_shortcuts(
+            out_dirpath=args.output_dir,
+            count=args.count,
+            out_extension=args.output_format,
+            seed=args.seed,
+            actions_count=args.actions,
+            max_depth=args.max_depth,
+            max_block_size=args.max_block_size,
+            variables_density=args.variables_density,
+            max_dictionary_size=args.max_dictionary_size,
+            action_types=args.action_types,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f'Generated: {len(filepaths)}')
+
+
 def main():
-    parser = argparse.ArgumentParser(description='Shortcuts: Siri shortcuts creator')
-    parser.add_argument('file', nargs='?', help='Input file: *.(toml|shortcut)')
-    parser.add_argument('output', nargs='?', help='Output file: *.(toml|shortcut)')
+    if sys.argv[1:2] == ['generate']:
+        generate_main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description='Shortcuts: Siri shortcuts creator',
+        epilog='Run "shortcuts generate --help" to generate random shortcuts for load testing',
+    )
+    parser.add_argument(
+        'files',
+        nargs='*',
+        help='Input and output files: *.(toml|shortcut); with --output-dir: input files, directories or globs',
+    )
+    parser.add_argument('-o', '--output-dir', help='Batch mode: convert all input files to this directory')
+    parser.add_argument(
+        '--output-format',
+        choices=SUPPORTED_EXTENSIONS,
+        help='Batch mode: extension of output files (default: toml -> shortcut, shortcut -> toml)',
+    )
+    parser.add_argument('-j', '--jobs', type=int, help='Batch mode: number of worker processes (default: CPU count)')
+    parser.add_argument(
+        '--cache-dir',
+        help=f'Directory of the compile cache (default: {DEFAULT_CACHE_DIR})',
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help='Max size of the compile cache in MB (default: %(default)s)',
+    )
+    parser.add_argument('--no-cache', action='store_true', help='Convert all files without the compile cache')
+    parser.add_argument(
+        '--profile',
+        metavar='FILE',
+        help='Save time and allocations of every phase of the conversion to FILE (batch mode runs in one process)',
+    )
+    parser.add_argument(
+        '--profile-format',
+        choices=PROFILE_FORMATS,
+        default='json',
+        help='Format of the --profile file: json with phases or cProfile stats (default: %(default)s)',
+    )
     parser.add_argument('--version', action='store_true', help='Version information')
 
     args = parser.parse_args()
 
-    if not any([args.version, args.file, args.output]):
-        parser.error('the following arguments are required: file, output')
-
     if args.version:
         print(f'Shortcuts v{shortcuts.VERSION}')
         return
 
-    convert_shortcut(args.file, args.output)
+    if args.profile:
+        from shortcuts.profiling import Profiler
+
+        # hooks are installed only for the profiled run,
+        # the profile is saved even if some files of a batch are failed
+        profiler = Profiler(cprofile=args.profile_format == 'cprofile')
+        try:
+            with profiler:
+                _convert(parser, args)
+        finally:
+            profiler.save(args.profile, output_format=args.profile_format)
+            print(f'Profile saved: {args.profile}', file=sys.stderr)
+        return
+
+    _convert(parser, args)
+
+
+def _convert(parser, args):
+    cache = None
+    if not args.no_cache:
+        # hashlib and shutil are imported with the cache only when it's enabled
+        from shortcuts.cache import CompileCache, get_default_cache_dir
+
+        cache = CompileCache(args.cache_dir or get_default_cache_dir(), max_size=args.cache_size * 1024 * 1024)
+
+    if args.output_dir:
+        if not args.files:
+            parser.error('the following arguments are required: files')
+        _convert_batch(parser, args, cache)
+        return
+
+    if len(args.files) != 2:
+        parser.error('the following arguments are required: file, output')
+
+    convert_shortcut(*args.files, cache=cache)
+    if cache is not None:
+        cache.evict()
+
+
+def _convert_batch(parser, args, cache):
+    try:
+        results = convert_shortcuts(
+            input_paths=args.files,
+            out_dirpath=args.output_dir,
+            out_extension=args.output_format,
+            # profiler collects stats only in the current process
+            jobs=1 if args.profile else args.jobs,
+            cache=cache,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    failed = 0
+    for input_filepath, _, error in results:
+        if error:
+            failed += 1
+            print(f'{input_filepath}: {error}', file=sys.stderr)
+
+    print(f'Converted: {len(results) - failed}, failed: {failed}')
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,153 @@
+import operator
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple, Type
+
+from shortcuts.actions.base import GroupIDField
+
+
+if TYPE_CHECKING:
+    from shortcuts.actions.base import BaseAction  # noqa
+
+
+# start, items and end of a menu have the same identifier and differ by the control flow mode,
+# the classes of menu actions are not imported: it would import all actions with the library
+MENU_ITYPE = 'is.workflow.actions.choosefrommenu'
+
+
+class Block:
+    """Control flow block: if-else-endif, repeat or menu"""
+    def __init__(self, start: int, group_id: str) -> None:
+        self.start = start  # index of the first action of the block
+        self.end: Optional[int] = None  # index of the last action, None if the block is not closed
+        self.branches: List[int] = []  # indexes of "else" and "menu item" actions
+        self.group_id = group_id
+        self.children: List[Block] = []
+
+
+class ControlFlow:
+    """
+    Resolves control flow of a list of actions in one pass:
+    builds a tree of blocks and finds group ids and menu items for all actions.
+
+    Each cycle or condition (if-else, repeat) and menu in Shortcuts app must have group id.
+    Start and end of the block must have the same group_id, a stack of open blocks
+    is used to give the same group_id to all actions of the block.
+
+    Actions are not modified, the result is kept here and passed to `BaseAction.dump`.
+    `options` are other inputs of `generate_group_id` (for example, the name of the shortcut),
+    the result is not valid anymore when they are changed.
+    """
+    def __init__(self,
+                 actions: Sequence['BaseAction'],
+                 generate_group_id: Callable[[int], str],
+                 options: Hashable = None) -> None:
+        self.blocks: List[Block] = []  # top-level blocks
+        self.group_ids: Dict[int, str] = {}  # index of action -> group id
+        self.menu_items: Dict[int, List[str]] = {}  # index of menu start action -> titles of menu items
+
+        self._actions = self._get_actions_snapshot(actions)
+        self._options = options
+        # values of actions which were used to resolve the control flow: (action, data key, value)
+        self._used_values: List[Tuple['BaseAction', str, Any]] = []
+
+        self._resolve(actions, generate_group_id)
+
+    def is_valid_for(self, actions: Sequence['BaseAction'], options: Hashable = None) -> bool:
+        """Checks that actions and options were not changed since the control flow was resolved"""
+        if options != self._options or not self._is_same_actions(actions):
+            return False
+        return all(action.data.get(key) == value for action, key, value in self._used_values)
+
+    def get_action_data(self, index: int) -> Optional[Dict[str, Any]]:
+        """Returns resolved data for action with index `index` or None if it's not a control flow action"""
+        group_id = self.group_ids.get(index)
+        if group_id is None:
+            return None
+
+        data: Dict[str, Any] = {'group_id': group_id}
+        if index in self.menu_items:
+            data['menu_items'] = self.menu_items[index]
+        return data
+
+    def _resolve(self, actions: Sequence['BaseAction'], generate_group_id: Callable[[int], str]) -> None:
+        blocks: List[Block] = []  # stack of open blocks
+        menus: List[int] = []  # stack of open menus
+        groups_count = 0
+
+        for index, action_class in enumerate(self._iter_classes(actions)):
+            # only actions with GroupIDField take part in the control flow
+            if not isinstance(action_class._fields_by_attr.get('group_id'), GroupIDField):
+                continue
+
+            action = actions[index]
+
+            control_mode = action.default_fields['WFControlFlowMode']
+            if control_mode == 0:
+                # 0 means beginning of the group
+                group_id = self._get_value(action, 'group_id')
+                if group_id is None:
+                    group_id = generate_group_id(groups_count)
+                groups_count += 1
+
+                block = Block(start=index, group_id=group_id)
+                (blocks[-1].children if blocks else self.blocks).append(block)
+                blocks.append(block)
+
+                if action_class.itype == MENU_ITYPE:
+                    self.menu_items[index] = []
+                    menus.append(index)
+            elif control_mode == 1:
+                # 1 - else or menu item, it belongs to the latest open block
+                if not blocks:
+                    raise RuntimeError('Incomplete cycle')
+                block = blocks[-1]
+                block.branches.append(index)
+
+                if action_class.itype == MENU_ITYPE:
+                    if not menus:
+                        raise RuntimeError('Incomplete menu action')
+                    self.menu_items[menus[-1]].append(self._get_value(action, 'title'))
+            elif control_mode == 2:
+                # end of the group
+                if not blocks:
+                    # if actions are correct, all groups must be completed
+                    # (group complete if it has start and end actions)
+                    raise RuntimeError('Incomplete cycle')
+                block = blocks.pop()
+                block.end = index
+
+                if action_class.itype == MENU_ITYPE:
+                    if not menus:
+                        raise RuntimeError('Incomplete menu action')
+                    menus.pop()
+            else:
+                continue
+
+            self.group_ids[index] = block.group_id
+
+    def _get_actions_snapshot(self, actions: Sequence['BaseAction']) -> Tuple:
+        from shortcuts.table import ActionTable  # noqa  # tables are imported only when they are used
+
+        if isinstance(actions, ActionTable):
+            # actions of a table are created on every access, but the table can only grow
+            return (actions, len(actions))
+        # actions themselves are kept, not their ids: ids of garbage collected actions can be reused
+        return tuple(actions)
+
+    def _is_same_actions(self, actions: Sequence['BaseAction']) -> bool:
+        snapshot = self._get_actions_snapshot(actions)
+        return len(snapshot) == len(self._actions) and all(map(operator.is_, snapshot, self._actions))
+
+    def _iter_classes(self, actions: Sequence['BaseAction']) -> Iterator[Type['BaseAction']]:
+        from shortcuts.loader import LazyAction  # noqa
+        from shortcuts.table import ActionTable  # noqa
+
+        if isinstance(actions, ActionTable):
+            # actions of a table are not created to find their classes
+            return actions.iter_classes()
+        # lazy actions find their class without deserialization of parameters
+        return (action.action_class if isinstance(action, LazyAction) else type(action) for action in actions)
+
+    def _get_value(self, action: 'BaseAction', key: str) -> Any:
+        value = action.data.get(key)
+        self._used_values.append((action, key, value))
+        return value
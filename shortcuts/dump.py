@@ -1,29 +1,101 @@
-import plistlib
-from typing import TYPE_CHECKING, Any, Dict, TextIO, Type
+import io
+import itertools
+import sys
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Union
 
-import toml
+from shortcuts import toml_backend
+from shortcuts.actions.base import BaseAction
 
 
 if TYPE_CHECKING:
     from shortcuts import Shortcut  # noqa
-    from shortcuts.actions.base import BaseAction  # noqa
+
+
+def _get_plist_writer_class() -> Any:
+    """
+    plistlib doesn't have a public API to write a plist value by value, so its private XML writer is used.
+    It's the same in all versions which were checked, in other versions (or if it's missing)
+    the whole document is built by `plistlib.dumps`.
+    plistlib is imported only when a plist is written.
+    """
+    import plistlib
+
+    return getattr(plistlib, '_PlistWriter', None) if (3, 6) <= sys.version_info < (3, 14) else None
+
+
+class _XMLPListWriter:
+    """
+    Writes XML plist value by value, the output is the same as `plistlib.dumps` produces.
+    It's the only code which uses internals of plistlib, check `is_supported()` before use.
+    """
+    def __init__(self, file_obj: IO[bytes]) -> None:
+        self._file_obj = file_obj
+        self._writer_class = _get_plist_writer_class()
+        self._writer = self._writer_class(file_obj)  # it writes the XML header
+
+    @staticmethod
+    def is_supported() -> bool:
+        return _get_plist_writer_class() is not None
+
+    def writeln(self, line: str) -> None:
+        self._writer.writeln(line)
+
+    def begin_element(self, element: str) -> None:
+        self._writer.begin_element(element)
+
+    def end_element(self, element: str) -> None:
+        self._writer.end_element(element)
+
+    def simple_element(self, element: str, value: Optional[str] = None) -> None:
+        self._writer.simple_element(element, value)
+
+    def write_value(self, value: Any) -> None:
+        self._writer.write_value(value)
+
+    def serialize(self, value: Any) -> bytes:
+        """Returns XML of the value with the current indentation, it can be written later by `write_serialized`"""
+        buffer = io.BytesIO()
+        writer = self._writer_class(buffer, indent_level=self._writer._indent_level, writeHeader=0)
+        writer.write_value(value)
+        return buffer.getvalue()
+
+    def write_serialized(self, xml: bytes) -> None:
+        self._file_obj.write(xml)
 
 
 class BaseDumper:
     def __init__(self, shortcut: 'Shortcut') -> None:
         self.shortcut = shortcut
 
-    def dump(self, file_obj: TextIO) -> None:
+    def dump(self, file_obj: IO) -> None:
         file_obj.write(self.dumps())
 
-    def dumps(self) -> str:
+    def dumps(self) -> Union[str, bytes]:
         raise NotImplementedError()
 
 
 class PListDumper(BaseDumper):
+    """
+    Writes XML plist incrementally: actions are dumped and written one by one,
+    so the whole document is never held in memory.
+    The output is the same as `plistlib.dumps` produces.
+    """
+    def dump(self, file_obj: IO) -> None:
+        if isinstance(file_obj, io.TextIOBase):
+            # text streams are still supported, but the document is built in memory
+            file_obj.write(self.dumps())
+            return
+
+        self._write(file_obj)
+
     def dumps(self) -> str:
-        data = {
-            'WFWorkflowActions': self.shortcut._get_actions(),
+        buffer = io.BytesIO()
+        self._write(buffer)
+        return buffer.getvalue().decode('utf-8')
+
+    def _get_data(self, actions: Any) -> Dict[str, Any]:
+        return {
+            'WFWorkflowActions': actions,
             'WFWorkflowImportQuestions': self.shortcut._get_import_questions(),
             'WFWorkflowClientRelease': self.shortcut.client_release,
             'WFWorkflowClientVersion': self.shortcut.client_version,
@@ -31,7 +103,105 @@ class PListDumper(BaseDumper):
             'WFWorkflowIcon': self.shortcut._get_icon(),
             'WFWorkflowInputContentItemClasses': self.shortcut._get_input_content_item_classes(),
         }
-        return plistlib.dumps(data).decode('utf-8')
+
+    def dump_actions(self, file_obj: IO[bytes], actions: Iterable[Dict]) -> None:
+        """
+        Writes the shortcut with `actions` (already dumped, `BaseAction.dump()`) instead of actions of the shortcut,
+        `actions` can be an iterator which is never held in memory
+        """
+        self._write(file_obj, actions=actions)
+
+    def _write(self, file_obj: IO[bytes], actions: Optional[Iterable[Dict]] = None) -> None:
+        if not _XMLPListWriter.is_supported():
+            import plistlib
+
+            if actions is None:
+                actions = self.shortcut._iter_actions()
+            file_obj.write(plistlib.dumps(self._get_data(actions=list(actions))))
+            return
+
+        data = self._get_data(actions=None)  # actions will be written one by one
+
+        # every single value is written as `plistlib.dumps` writes it, so the output is the same
+        writer = _XMLPListWriter(file_obj)
+        writer.writeln('<plist version="1.0">')
+        writer.begin_element('dict')
+        for key, value in sorted(data.items()):
+            writer.simple_element('key', key)
+            if key == 'WFWorkflowActions':
+                self._write_actions(writer, self._iter_shortcut_actions() if actions is None else actions)
+            else:
+                writer.write_value(value)
+        writer.end_element('dict')
+        writer.writeln('</plist>')
+
+    def _iter_shortcut_actions(self) -> Iterator[Union[Dict, BaseAction]]:
+        """
+        Yields dumps of actions of the shortcut, actions which have the same dump
+        for the whole class (see `BaseAction._has_class_dump`) are yielded as they are
+        """
+        for action, extra_data in self.shortcut._iter_actions_with_data():
+            if isinstance(action, BaseAction) and action._has_class_dump():
+                yield action
+            else:
+                yield action.dump(extra_data=extra_data)
+
+    def _write_actions(self, writer: _XMLPListWriter, actions: Iterable[Union[Dict, BaseAction]]) -> None:
+        """Writes dumps of actions, actions with the dump of their class are serialized once, then XML is copied"""
+        serialized: Dict[type, bytes] = {}
+        actions = iter(actions)
+        first_action = next(actions, None)
+        if first_action is None:
+            writer.simple_element('array')  # plistlib writes empty arrays as <array/>
+            return
+
+        writer.begin_element('array')
+        for action in itertools.chain((first_action, ), actions):
+            if isinstance(action, BaseAction):
+                xml = serialized.get(type(action))
+                if xml is None:
+                    xml = serialized[type(action)] = writer.serialize(action.dump())
+                writer.write_serialized(xml)
+            else:
+                writer.write_value(action)
+        writer.end_element('array')
+
+
+class BinaryPListDumper(PListDumper):
+    """
+    Writes binary plist (bplist00) which can be imported by Shortcuts app without any conversion.
+    Binary plist has an offset table at the end, so the whole document is built in memory,
+    plistlib stores repeated strings (identifiers, serialization types, etc) only once.
+    """
+    def dump(self, file_obj: IO[bytes]) -> None:
+        import plistlib
+
+        plistlib.dump(self._get_data(actions=self._get_actions()), file_obj, fmt=plistlib.FMT_BINARY)
+
+    def dumps(self) -> bytes:  # type: ignore
+        import plistlib
+
+        return plistlib.dumps(self._get_data(actions=self._get_actions()), fmt=plistlib.FMT_BINARY)
+
+    def dump_actions(self, file_obj: IO[bytes], actions: Iterable[Dict]) -> None:
+        """Writes the shortcut with `actions` (already dumped) instead of actions of the shortcut"""
+        import plistlib
+
+        plistlib.dump(self._get_data(actions=list(actions)), file_obj, fmt=plistlib.FMT_BINARY)
+
+    def _get_actions(self) -> List[Dict]:
+        # actions with the same dump for the whole class share one dictionary in this document,
+        # plistlib writes an object which is referenced several times only once
+        class_dumps: Dict[type, Dict] = {}
+        actions = []
+        for action in self._iter_shortcut_actions():
+            if isinstance(action, BaseAction):
+                action_class = type(action)
+                if action_class not in class_dumps:
+                    class_dumps[action_class] = action.dump()
+                action = class_dumps[action_class]
+            actions.append(action)
+        return actions
 
 
 class TomlDumper(BaseDumper):
@@ -39,12 +209,31 @@ class TomlDumper(BaseDumper):
         data = {
             'action': [self._process_action(a) for a in self.shortcut.actions],
         }
-        return toml.dumps(data)
+        return toml_backend.dumps(data)
 
-    def _process_action(self, action: Type['BaseAction']) -> Dict[str, Any]:
-        data = {
-            # ignore: (mypy/#1465)
-            f._attr: action.data[f._attr] for f in action.fields if f._attr in action.data  # type: ignore
+    def dump_actions(self, file_obj: IO[str], actions: Iterable['BaseAction']) -> None:
+        """
+        Writes `actions` instead of actions of the shortcut, every action is a separate `[[action]]` table,
+        so `actions` can be an iterator which is never held in memory
+        """
+        tables: Dict[Any, str] = {}  # tables of actions without fields are the same, they are dumped once
+        for action in actions:
+            table = None if action.fields else tables.get(action.keyword)
+            if table is None:
+                table = self._dump_table(action)
+                if not action.fields:
+                    tables[action.keyword] = table
+            file_obj.write(table)
+
+    def _dump_table(self, action: 'BaseAction') -> str:
+        # the same separator as in `dumps`: a blank line after every table
+        return toml_backend.dumps({'action': [self._process_action(action)]}).rstrip('\n') + '\n\n'
+
+    def _process_action(self, action: 'BaseAction') -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            f._attr: action.data[f._attr]  # type: ignore
+            for f in action.fields
+            if action.data.get(f._attr) is not None  # toml doesn't have null values
         }
         data['type'] = action.keyword
         return data
@@ -0,0 +1,230 @@
+"""
+Generator of random valid shortcuts for load testing.
+
+Actions are generated one by one and written to a file as soon as they are generated,
+so shortcuts of any size are produced in constant memory.
+"""
+import random
+import uuid
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from shortcuts.actions import (
+    KEYWORD_TO_ACTION_MAP,
+    ElseAction,
+    EndIfAction,
+    IfAction,
+    MenuEndAction,
+    MenuItemAction,
+    MenuStartAction,
+    RepeatEndAction,
+    RepeatStartAction,
+)
+from shortcuts.actions.base import (
+    ArrayField,
+    BaseAction,
+    BooleanField,
+    ChoiceField,
+    DictionaryField,
+    Field,
+    FloatField,
+    GroupIDField,
+    IntegerField,
+    VariablesField,
+    WFVariableField,
+)
+from shortcuts.actions.web import HTTPMethodField
+
+
+# keyword of the first action of a block -> (start, middle, end) classes of the block
+BLOCKS: Dict[str, Tuple[Type[BaseAction], Optional[Type[BaseAction]], Type[BaseAction]]] = {
+    IfAction.keyword: (IfAction, ElseAction, EndIfAction),  # type: ignore
+    RepeatStartAction.keyword: (RepeatStartAction, None, RepeatEndAction),  # type: ignore
+    MenuStartAction.keyword: (MenuStartAction, MenuItemAction, MenuEndAction),  # type: ignore
+}
+# the minimal number of actions in a block
+MIN_BLOCK_SIZE = {
+    IfAction.keyword: 2,  # if, end if
+    RepeatStartAction.keyword: 2,  # repeat, end repeat
+    MenuStartAction.keyword: 3,  # menu, item, end menu
+}
+
+WORDS = ('hello', 'world', 'shortcut', 'battery', 'shields', 'are', 'at', 'and', 'falling', 'photo', 'message')
+VARIABLES = tuple(f'variable{i}' for i in range(10))
+
+
+def get_default_action_types() -> Dict[str, float]:
+    """
+    Returns mix of action types: keyword -> weight.
+    Only first actions of blocks are in the mix (`if`, `repeat_start`, `start_menu`), the rest is generated with them
+    """
+    return {
+        keyword: 1.0 for keyword, action_class in KEYWORD_TO_ACTION_MAP.items()
+        if keyword in BLOCKS or not isinstance(action_class._fields_by_attr.get('group_id'), GroupIDField)
+    }
+
+
+class ShortcutGenerator:
+    """
+    Generates random valid shortcuts:
+
+        actions_count: exact number of actions in the shortcut
+        max_depth: max nesting depth of if/repeat/menu blocks
+        max_block_size: max number of actions in one branch of a block
+        variables_density: probability of a variable instead of a word in text fields with variables
+        max_dictionary_size: max number of items in dictionary fields
+        action_types: keyword -> weight, mix of action types (by default all actions have the same weight)
+        seed: the same seed always produces the same shortcut
+    """
+    def __init__(self,
+                 actions_count: int = 100,
+                 max_depth: int = 3,
+                 max_block_size: int = 10,
+                 variables_density: float = 0.2,
+                 max_dictionary_size: int = 5,
+                 action_types: Optional[Dict[str, float]] = None,
+                 seed: Any = None) -> None:
+        self.actions_count = actions_count
+        self.max_depth = max_depth
+        self.max_block_size = max_block_size
+        self.variables_density = variables_density
+        self.max_dictionary_size = max_dictionary_size
+        self.action_types = action_types if action_types is not None else get_default_action_types()
+        self.seed = seed
+
+        unknown_types = set(self.action_types) - set(get_default_action_types())
+        if unknown_types:
+            raise ValueError(f'Unknown action types: {", ".join(sorted(unknown_types))}')
+
+        self._keywords = list(self.action_types)
+        self._weights = [self.action_types[k] for k in self._keywords]
+        self._random = random.Random(seed)
+
+    def iter_actions(self) -> Iterator[BaseAction]:
+        """Yields actions one by one, group ids and menu items are already set"""
+        self._random.seed(self.seed)
+        yield from self._iter_actions(depth=0, count=self.actions_count)
+
+    def dump(self, file_obj: IO, file_format: str = 'toml', name: str = 'python-shortcuts') -> None:
+        """
+        Writes the shortcut to a file: toml (text file), XML plist or binary plist (bplist, binary files).
+        Binary plists are built in memory, toml files and XML plists are written while actions are generated.
+        """
+        from shortcuts import Shortcut
+        from shortcuts.dump import BinaryPListDumper, PListDumper, TomlDumper
+
+        shortcut = Shortcut(name=name)
+        if file_format == 'toml':
+            TomlDumper(shortcut).dump_actions(file_obj, self.iter_actions())
+        elif file_format == 'plist':
+            PListDumper(shortcut).dump_actions(file_obj, (action.dump() for action in self.iter_actions()))
+        elif file_format == 'bplist':
+            BinaryPListDumper(shortcut).dump_actions(file_obj, (action.dump() for action in self.iter_actions()))
+        else:
+            raise RuntimeError(f'Unsupported file format: {file_format}')
+
+    def _iter_actions(self, depth: int, count: int) -> Iterator[BaseAction]:
+        """Yields exactly `count` actions: single actions and blocks of actions"""
+        while count > 0:
+            keyword = self._random.choices(self._keywords, weights=self._weights)[0]
+            if keyword in BLOCKS and (depth >= self.max_depth or count < MIN_BLOCK_SIZE[keyword]):
+                # there is no place for a block, the nearest single action in the mix is used instead
+                single_keyword = self._get_single_keyword(keyword)
+                if single_keyword is None:
+                    raise ValueError('Mix of action types must contain single actions, not only blocks')
+                keyword = single_keyword
+
+            if keyword in BLOCKS:
+                actions = self._iter_block(keyword, depth=depth, count=count)
+            else:
+                actions = iter([self._get_action(KEYWORD_TO_ACTION_MAP[keyword])])
+
+            for action in actions:
+                count -= 1
+                yield action
+
+    def _iter_block(self, keyword: str, depth: int, count: int) -> Iterator[BaseAction]:
+        """Yields a block (not more than `count` actions): start, branches with nested actions, end"""
+        start_class, middle_class, end_class = BLOCKS[keyword]
+        group_id = str(uuid.UUID(int=self._random.getrandbits(128), version=4))
+
+        available = count - MIN_BLOCK_SIZE[keyword]
+        if middle_class is MenuItemAction:
+            # every menu item is a branch, menu has at least one item
+            branches_count = 1 + self._random.randint(0, min(3, available))
+        elif middle_class is not None:
+            # if - else
+            branches_count = self._random.randint(1, 2) if available else 1
+        else:
+            branches_count = 1
+        available -= branches_count - 1
+
+        titles = [self._get_text() for _ in range(branches_count)]
+        start_data: Dict[str, Any] = {'group_id': group_id}
+        if start_class is MenuStartAction:
+            start_data['menu_items'] = titles
+        yield self._get_action(start_class, data=start_data)
+
+        for branch in range(branches_count):
+            if start_class is MenuStartAction:
+                yield self._get_action(MenuItemAction, data={'group_id': group_id, 'title': titles[branch]})
+            elif branch:
+                yield self._get_action(middle_class, data={'group_id': group_id})  # type: ignore
+
+            branch_size = self._random.randint(0, min(self.max_block_size, available))
+            available -= branch_size
+            yield from self._iter_actions(depth=depth + 1, count=branch_size)
+
+        yield self._get_action(end_class, data={'group_id': group_id})
+
+    def _get_single_keyword(self, keyword: str) -> Optional[str]:
+        single_keywords = [k for k in self._keywords if k not in BLOCKS]
+        if not single_keywords:
+            return None
+        return single_keywords[self._keywords.index(keyword) % len(single_keywords)]
+
+    def get_sample_data(self, action_class: Type[BaseAction]) -> Dict[str, Any]:
+        """Returns random valid values of all fields of the action except group ids"""
+        return {
+            attr: self._get_value(field)
+            for attr, field in action_class._fields_by_attr.items()
+            if not isinstance(field, GroupIDField)
+        }
+
+    def _get_action(self, action_class: Type[BaseAction], data: Optional[Dict[str, Any]] = None) -> BaseAction:
+        action_data = self.get_sample_data(action_class)
+        action_data.update(data or {})
+        return action_class.create(data=action_data)
+
+    def _get_value(self, field: Field) -> Any:
+        """Returns a random valid value of the field"""
+        if isinstance(field, ChoiceField):
+            return self._random.choice(field.choices)
+        elif isinstance(field, HTTPMethodField):
+            return self._random.choice(field.methods)
+        elif isinstance(field, BooleanField):
+            return self._random.random() < 0.5
+        elif isinstance(field, IntegerField):
+            return self._random.randint(1, 10)
+        elif isinstance(field, FloatField):
+            return round(self._random.random(), 2)
+        elif isinstance(field, ArrayField):
+            return [self._get_text() for _ in range(self._random.randint(1, 3))]
+        elif isinstance(field, DictionaryField):
+            return [
+                {'key': f'key{i}', 'value': self._get_text(variables=True)}
+                for i in range(self._random.randint(1, max(1, self.max_dictionary_size)))
+            ]
+        elif isinstance(field, VariablesField):
+            return self._get_text(variables=True)
+        elif isinstance(field, WFVariableField):
+            return self._random.choice(VARIABLES)
+        return self._get_text()
+
+    def _get_text(self, variables: bool = False) -> str:
+        words: List[str] = []
+        for _ in range(self._random.randint(1, 6)):
+            if variables and self._random.random() < self.variables_density:
+                words.append('{{%s}}' % self._random.choice(VARIABLES))
+            else:
+                words.append(self._random.choice(WORDS))
+        return ' '.join(words)
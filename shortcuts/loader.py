@@ -1,74 +1,292 @@
-import collections
+import binascii
 import copy
-import plistlib
-from typing import TYPE_CHECKING, Any, Dict, List, TextIO, Tuple, Type, Union
+import datetime
+import functools
+import io
+import re
+import warnings
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
 
-import toml
-
-from shortcuts.actions import ITYPE_TO_ACTION_MAP, KEYWORD_TO_ACTION_MAP
+from shortcuts import toml_backend
+from shortcuts.actions import KEYWORD_TO_ACTION_MAP, resolve_action_class
+from shortcuts.symbols import add_symbols, intern_symbol
 
 
 if TYPE_CHECKING:
+    import mmap  # noqa
+    from xml.etree import ElementTree  # noqa
     from shortcuts import Shortcut  # noqa
     from shortcuts.actions.base import BaseAction  # noqa
+    from shortcuts.table import ActionTable  # noqa
 
 
 class BaseLoader:
     @classmethod
-    def load(cls, file_obj: TextIO) -> 'Shortcut':
+    def load(cls, file_obj: IO, lazy: bool = False) -> 'Shortcut':
         content = file_obj.read()
         if isinstance(content, (bytes, bytearray)):
             content = content.decode('utf-8')
-        return cls.loads(content)
+        return cls.loads(content, lazy=lazy)
 
     @classmethod
-    def loads(cls, string: str) -> 'Shortcut':
+    def loads(cls, string: Union[str, bytes], lazy: bool = False) -> 'Shortcut':
         raise NotImplementedError()
 
+    @classmethod
+    def iter_actions(cls, file_obj: IO) -> Iterator['BaseAction']:
+        """Yields actions from the file one by one"""
+        yield from cls.load(file_obj).actions
+
+    @classmethod
+    def load_table(cls, file_obj: IO) -> 'ActionTable':
+        """Loads actions to a columnar table, every action is added to it as soon as it's read"""
+        from shortcuts.table import ActionTable  # noqa
+
+        return ActionTable(cls.iter_actions(file_obj))
+
 
 class TomlLoader(BaseLoader):
+    # header of an action table: [[action]]
+    ACTION_HEADER_REGEXP = re.compile(r'^\s*\[\[\s*action\s*\]\]\s*(#.*)?$')
+
     @classmethod
-    def loads(cls, string: str) -> 'Shortcut':
+    def loads(cls, string: Union[str, bytes], lazy: bool = False) -> 'Shortcut':
+        # toml files are always loaded eagerly: actions are parsed together with the whole file
         from shortcuts import Shortcut  # noqa
 
-        shortcut_dict = toml.loads(string)
+        if isinstance(string, (bytes, bytearray)):
+            string = string.decode('utf-8')
+
+        shortcut_dict = toml_backend.loads(string)
         shortcut = Shortcut(name=shortcut_dict.get('name', 'python-shortcuts'))
 
         if not isinstance(shortcut_dict.get('action'), list):
             raise ValueError('toml file must contain "action" array with actions')
 
         for action in shortcut_dict['action']:
-            action_params = copy.deepcopy(action)
-            del action_params['type']
-            shortcut.actions.append(
-                KEYWORD_TO_ACTION_MAP[action['type']](data=action_params)
-            )
+            shortcut.actions.append(cls._action_from_dict(action))
 
         return shortcut
 
+    @classmethod
+    def iter_actions(cls, file_obj: IO) -> Iterator['BaseAction']:
+        """
+        Reads the file line by line and yields every action
+        as soon as its `[[action]]` table is read, without parsing the whole file.
+        Lines inside multiline strings are never taken as headers of tables.
+        Files without `[[action]]` tables (for example, with an inline array `action = [...]`)
+        are parsed as a whole.
+        """
+        lines: List[str] = []
+        actions_found = False
+        multiline_quote: Optional[str] = None  # delimiter of a multiline string which isn't closed yet
+        for line in file_obj:
+            if isinstance(line, (bytes, bytearray)):
+                line = line.decode('utf-8')
+
+            is_header = multiline_quote is None and cls.ACTION_HEADER_REGEXP.match(line)
+            multiline_quote = _get_open_multiline_quote(line, multiline_quote)
+            if is_header:
+                # beginning of the next action: the previous one (or the header of the shortcut) is complete
+                if actions_found:
+                    yield cls._action_from_toml(''.join(lines))
+                lines = [line]
+                actions_found = True
+            else:
+                lines.append(line)
+
+        if not actions_found:
+            yield from cls.loads(''.join(lines)).actions
+            return
+
+        yield cls._action_from_toml(''.join(lines))
+
+    @classmethod
+    def _action_from_toml(cls, string: str) -> 'BaseAction':
+        return cls._action_from_dict(toml_backend.loads(string)['action'][0])
+
+    @classmethod
+    def _action_from_dict(cls, action: Dict) -> 'BaseAction':
+        # tables are parsed for this action only, so nested values are not copied:
+        # a shallow copy is enough to remove "type" without changing the table,
+        # names of fields in the copy are shared strings (see `shortcuts.symbols`)
+        action_params = {intern_symbol(key): value for key, value in action.items()}
+        keyword = action_params.pop('type')
+        return KEYWORD_TO_ACTION_MAP[keyword].create(data=action_params)
+
+
+def _get_open_multiline_quote(line: str, quote: Optional[str] = None) -> Optional[str]:
+    """
+    Returns the delimiter of a multiline string which is still open in the end of the toml line,
+    `quote` is the delimiter of a string which is open in the beginning of the line
+    """
+    i = 0
+    while i < len(line):
+        if quote is not None:
+            if quote == '"""' and line[i] == '\\':
+                i += 2  # escaped character
+            elif line.startswith(quote, i):
+                quote = None
+                i += 3
+            else:
+                i += 1
+            continue
+
+        char = line[i]
+        if char == '#':
+            break
+        if line.startswith(('"""', "'''"), i):
+            quote = line[i:i + 3]
+            i += 3
+        elif char in ('"', "'"):
+            # a single line string: skip it, quotes are escaped only in basic strings
+            i += 1
+            while i < len(line) and line[i] != char:
+                i += 2 if char == '"' and line[i] == '\\' else 1
+            i += 1
+        else:
+            i += 1
+    return quote
+
 
 class PListLoader(BaseLoader):
+    """
+    Loads shortcuts from XML and binary (bplist00) plists.
+    Binary files are parsed as they are, without conversion to XML or decoding to str.
+
+    With `lazy=True` actions are loaded as `LazyAction` proxies,
+    their parameters are deserialized only when they are used.
+    """
+    BINARY_MAGIC = b'bplist00'
+    CHUNK_SIZE = 64 * 1024  # size of chunks for incremental parsing of XML plists
+
     @classmethod
-    def loads(cls, string: Union[str, bytes]) -> 'Shortcut':
-        from shortcuts import Shortcut  # noqa
+    def load(cls, file_obj: IO, lazy: bool = False) -> 'Shortcut':
+        # plistlib and mmap are imported with the first plist, TOML files don't need them
+        import mmap  # noqa: F811
+
+        # regular files are mapped into memory: plistlib reads only the parts it needs
+        # from the mapping instead of a copy of the whole file
+        try:
+            buffer = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, io.UnsupportedOperation, OSError, ValueError):
+            # not a regular file (BytesIO, pipe, etc) or an empty file
+            return cls.loads(file_obj.read(), lazy=lazy)
 
+        with buffer:
+            return cls._load_from_file(buffer, lazy=lazy)
+
+    @classmethod
+    def loads(cls, string: Union[str, bytes], lazy: bool = False) -> 'Shortcut':
         if isinstance(string, str):
             string = string.encode('utf-8')
 
-        shortcut_dict: Dict = plistlib.loads(string)
+        return cls._load_from_file(io.BytesIO(string), lazy=lazy)
+
+    @classmethod
+    def _load_from_file(cls, file_obj: Union[IO[bytes], 'mmap.mmap'], lazy: bool = False) -> 'Shortcut':
+        import plistlib
+
+        # plistlib detects the format (XML or binary) itself
+        shortcut_dict = plistlib.load(file_obj)  # type: ignore
+        return cls._shortcut_from_dict(shortcut_dict, lazy=lazy)
+
+    @classmethod
+    def iter_actions(cls, file_obj: IO) -> Iterator['BaseAction']:
+        """
+        Yields actions one by one.
+        XML plists are parsed incrementally: an action is yielded as soon as its <dict> is read.
+        Binary plists can't be read partially (the offset table is in the end of the file),
+        so they are loaded entirely.
+        """
+        for action_dict in cls._iter_action_dicts(file_obj):
+            yield cls._action_from_dict(action_dict)
+
+    @classmethod
+    def _iter_action_dicts(cls, file_obj: IO) -> Iterator[Dict]:
+        head = file_obj.read(len(cls.BINARY_MAGIC))
+        if head == cls.BINARY_MAGIC:
+            import plistlib
+
+            yield from plistlib.loads(head + file_obj.read(), fmt=plistlib.FMT_BINARY)['WFWorkflowActions']
+            return
+
+        # ElementTree is needed only here, it isn't imported with the library
+        from xml.etree import ElementTree
+
+        parser: ElementTree.XMLPullParser = ElementTree.XMLPullParser(events=('start', 'end'))
+        depth = 0  # <plist> - 1, main <dict> - 2, its keys and values - 3, actions - 4
+        key = None  # the last key of the main dictionary
+        actions: Optional[ElementTree.Element] = None  # <array> of actions
+        chunk = head
+        while chunk:
+            parser.feed(chunk)
+            # only "start" and "end" events are requested, all of them have elements
+            events: Iterator[Tuple[str, ElementTree.Element]] = parser.read_events()  # type: ignore
+            for event, element in events:
+                if event == 'start':
+                    depth += 1
+                    if depth == 3 and element.tag == 'array' and key == 'WFWorkflowActions':
+                        actions = element
+                    continue
+
+                if depth == 4 and actions is not None:
+                    yield _get_plist_value(element)
+                    # parsed actions are removed from the tree, so it doesn't grow with the file
+                    actions.remove(element)
+                elif depth == 3:
+                    if element is actions:
+                        # the rest of the file is not needed
+                        return
+                    if element.tag == 'key':
+                        key = element.text
+                depth -= 1
+
+            chunk = file_obj.read(cls.CHUNK_SIZE)
+
+    @classmethod
+    def _shortcut_from_dict(cls, shortcut_dict: Dict, lazy: bool = False) -> 'Shortcut':
+        from shortcuts import Shortcut  # noqa
+
         shortcut = Shortcut(
             name=shortcut_dict.get('name', 'python-shortcuts'),
             client_release=shortcut_dict['WFWorkflowClientRelease'],
             client_version=shortcut_dict['WFWorkflowClientVersion'],
         )
 
-        for action in shortcut_dict['WFWorkflowActions']:
-            shortcut.actions.append(cls._action_from_dict(action))
+        if lazy:
+            # a binary plist stores a dictionary which is used by several actions once (see `BinaryPListDumper`),
+            # plistlib returns one object for it, so it's interned once and the actions keep sharing it
+            interned: Dict[int, Dict] = {}
+            for action in shortcut_dict['WFWorkflowActions']:
+                if id(action) not in interned:
+                    interned[id(action)] = _intern_action(action)
+                shortcut.actions.append(LazyAction(interned[id(action)]))
+        else:
+            for action in shortcut_dict['WFWorkflowActions']:
+                shortcut.actions.append(cls._action_from_dict(action))
 
         return shortcut
 
     @classmethod
     def _action_from_dict(cls, action_dict: Dict) -> 'BaseAction':
+        action_class = cls._get_known_action_class(action_dict)
+
+        fields_by_name = action_class._fields_by_name
+        if not fields_by_name:
+            # parameters are not needed, all such actions are the same
+            return action_class.create()
+
+        params = {
+            fields_by_name[p]._attr: deserialize(v)
+            for p, v in action_dict['WFWorkflowActionParameters'].items()
+            if p in fields_by_name
+        }
+
+        return action_class.create(data=params)
+
+    @classmethod
+    def _get_known_action_class(cls, action_dict: Dict) -> Type['BaseAction']:
         action_class = cls._get_action_class(action_dict)
 
         if not action_class:
@@ -86,147 +304,206 @@ class PListLoader(BaseLoader):
             '''
             raise RuntimeError(msg)
 
-        shortcut_name_to_field_name = {
-            f.name: f._attr for f in action_class().fields
-        }
-        params = {
-            shortcut_name_to_field_name[p]: WFDeserializer(v).deserialized_data
-            for p, v in action_dict['WFWorkflowActionParameters'].items()
-            if p in shortcut_name_to_field_name
-        }
-
-        return action_class(data=params)
+        return action_class
 
     @classmethod
     def _get_action_class(cls, action_dict: Dict) -> Union[Type['BaseAction'], None]:
-        identifier = action_dict['WFWorkflowActionIdentifier']
-        action_class = ITYPE_TO_ACTION_MAP.get(identifier)
-
-        # in some cases we have action classes with the same itype (identifier)
-        # but they have different parameters
-        #
-        # For example, Base64EncodeAction and Base64DecodeAction
-        # classes have the same itype: "is.workflow.actions.base64encode"
-        # we need to check parameters to determine which action class we need to use
-        #
-        # todo: action-based common solution
-        if identifier == 'is.workflow.actions.conditional':
-            action_class = cls._get_if_else_action_class(action_dict)
-        elif identifier == 'is.workflow.actions.base64encode':
-            action_class = cls._get_base64_action_class(action_dict)
-        elif identifier == 'is.workflow.actions.repeat.count':
-            action_class = cls._get_repeat_action_class(action_dict)
-        elif identifier == 'is.workflow.actions.choosefrommenu':
-            action_class = cls._get_menu_action_class(action_dict)
+        # actions with the same itype (if/else/endif, base64 encode/decode, etc) are distinguished
+        # by a parameter which they declare as `discriminator`
+        return resolve_action_class(
+            action_dict['WFWorkflowActionIdentifier'],
+            action_dict['WFWorkflowActionParameters'],
+        )
 
-        return action_class
 
-    @classmethod
-    def _get_if_else_action_class(cls, action_dict: Dict) -> Type['BaseAction']:
-        """Returns If-Else-EndIf action class based on WFControlFlowMode parameter of action_dict"""
-        from shortcuts.actions import IfAction, ElseAction, EndIfAction
-        return cls._get_action_class_by_wf_control_flow(
-            from_classes=(IfAction, ElseAction, EndIfAction),
-            action_dict=action_dict,
-        )
+def _intern_action(action_dict: Dict) -> Dict:
+    """
+    Replaces the identifier and names of parameters of a loaded action
+    with shared strings (see `shortcuts.symbols`), values of parameters are kept as they are.
+    Lazy actions keep their raw dictionaries, so they would hold copies of these strings otherwise.
+    """
+    result = {intern_symbol(key): value for key, value in action_dict.items()}
+    itype = result.get('WFWorkflowActionIdentifier')
+    if isinstance(itype, str):
+        result['WFWorkflowActionIdentifier'] = intern_symbol(itype)
+    params = result.get('WFWorkflowActionParameters')
+    if isinstance(params, dict):
+        result['WFWorkflowActionParameters'] = {intern_symbol(key): value for key, value in params.items()}
+    return result
+
+
+def _get_plist_value(element: 'ElementTree.Element') -> Any:
+    """Converts XML element of a plist to a python object, as `plistlib` does"""
+    tag = element.tag
+    if tag == 'dict':
+        children = list(element)
+        return {
+            children[i].text or '': _get_plist_value(children[i + 1]) for i in range(0, len(children) - 1, 2)
+        }
+    elif tag == 'array':
+        return [_get_plist_value(child) for child in element]
+    elif tag == 'string':
+        return element.text or ''
+    elif tag == 'integer':
+        text = element.text or '0'
+        if text.startswith(('0x', '0X')):
+            return int(text, 16)
+        return int(text)
+    elif tag == 'real':
+        return float(element.text or '0')
+    elif tag == 'true':
+        return True
+    elif tag == 'false':
+        return False
+    elif tag == 'data':
+        return binascii.a2b_base64(element.text or '')  # as plistlib decodes <data>
+    elif tag == 'date':
+        return datetime.datetime.strptime(element.text or '', '%Y-%m-%dT%H:%M:%SZ')
+
+    raise ValueError(f'Unsupported plist element: {tag}')
+
+
+class LazyAction:
+    """
+    Proxy of an action loaded from a plist with `lazy=True`.
 
-    @classmethod
-    def _get_repeat_action_class(cls, action_dict: Dict) -> Type['BaseAction']:
-        """Returns Repeat-Start or Repeat-End action class based on WFControlFlowMode parameter of action_dict"""
-        from shortcuts.actions import RepeatEndAction, RepeatStartAction
-        return cls._get_action_class_by_wf_control_flow(
-            from_classes=(RepeatEndAction, RepeatStartAction),
-            action_dict=action_dict,
-        )
+    It keeps the raw plist dictionary of the action: the action class is found
+    and parameters are deserialized only when the action is used (`data`, `fields`, etc.).
+    An unchanged action is dumped as its raw dictionary, without serialization of parameters.
+    """
+    def __init__(self, action_dict: Dict) -> None:
+        self.raw = action_dict
+        self._action_class: Optional[Type['BaseAction']] = None
+        self._action: Optional['BaseAction'] = None
+        self._loaded_data: Optional[Dict] = None  # copy of deserialized data, to find changes
 
-    @classmethod
-    def _get_menu_action_class(cls, action_dict: Dict) -> Type['BaseAction']:
-        """Returns Menu action class based on WFControlFlowMode parameter of action_dict"""
-        from shortcuts.actions import MenuStartAction, MenuItemAction, MenuEndAction
-        return cls._get_action_class_by_wf_control_flow(
-            from_classes=(MenuStartAction, MenuItemAction, MenuEndAction),
-            action_dict=action_dict,
-        )
+    @property
+    def itype(self) -> str:
+        return self.raw['WFWorkflowActionIdentifier']
 
-    @classmethod
-    def _get_action_class_by_wf_control_flow(cls,
-                                             from_classes: Tuple[Type['BaseAction'], ...],
-                                             action_dict: Dict) -> Type['BaseAction']:
-        """Returns class from `from_classes` based on WFControlFlowMode parameter of action_dict"""
-        flow_to_action = {a.default_fields['WFControlFlowMode']: a for a in from_classes}  # type: ignore
-        wf_control_flow_mode = action_dict['WFWorkflowActionParameters']['WFControlFlowMode']
-        return flow_to_action[wf_control_flow_mode]
+    @property
+    def action_class(self) -> Type['BaseAction']:
+        """Class of the action, it's found without deserialization of parameters"""
+        if self._action_class is None:
+            self._action_class = PListLoader._get_known_action_class(self.raw)
+        return self._action_class
 
-    @classmethod
-    def _get_base64_action_class(cls, action_dict: Dict) -> Type['BaseAction']:
-        """Returns Base64EncodeAction or Base64DecodeAction based on WFEncodeMode parameter of action_dict"""
-        from shortcuts.actions import Base64EncodeAction, Base64DecodeAction
-        action_params = action_dict['WFWorkflowActionParameters']
+    @property
+    def action(self) -> 'BaseAction':
+        """The action object, it's created on the first access"""
+        if self._action is None:
+            self._action = PListLoader._action_from_dict(self.raw)
+            self._action_class = type(self._action)
+            self._loaded_data = copy.deepcopy(dict(self._action.data))
+        return self._action
 
-        # by default it's encode, even if it doesn't have WFEncodeMode parameter
-        encode_mode = action_params.get('WFEncodeMode', 'Encode')
-        if encode_mode == 'Encode':
-            return Base64EncodeAction
-        elif encode_mode == 'Decode':
-            return Base64DecodeAction
+    @property
+    def data(self) -> Dict:
+        return self.action.data
 
-        raise RuntimeError(f'Unknown WFEncodeMode: "{encode_mode}"')
+    @data.setter
+    def data(self, value: Dict) -> None:
+        self.action.data = value
+
+    def dump(self, extra_data: Optional[Dict] = None) -> Dict:
+        if self._is_unchanged(extra_data):
+            return self.raw
+        return self.action.dump(extra_data=extra_data)
+
+    def _is_unchanged(self, extra_data: Optional[Dict]) -> bool:
+        if self._action is None and not extra_data:
+            # parameters were not even deserialized
+            return True
+
+        data = self.action.data
+        if data != self._loaded_data:
+            return False
+        # extra data (group id, menu items) is already in the raw dictionary if it's the same as loaded
+        return all(data.get(key) == value for key, value in (extra_data or {}).items())
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            # private attributes are not proxied, it also protects from recursion before __init__
+            raise AttributeError(name)
+        return getattr(self.action, name)
+
+    def __repr__(self) -> str:
+        return f'<LazyAction: {self.itype}>'
+
+
+def deserialize(data: Any) -> Any:
+    """
+    Converts data of WF fields (from shortcuts plist)
+    to a format acceptable by Actions.
+
+    Serialized values are dictionaries with `WFSerializationType`,
+    they are converted by functions from `DESERIALIZERS`.
+    Nested values (items of dictionaries) are converted with an explicit stack
+    instead of recursion, so deeply nested dictionaries don't hit the recursion limit.
+    """
+    if not isinstance(data, dict):
+        # todo: check if there are other types
+        return data
+
+    result = [data]
+    # stack of (container, key): container[key] is a serialized value which must be converted
+    stack: List[Tuple[Any, Any]] = [(result, 0)]
+    while stack:
+        container, key = stack.pop()
+        value = container[key]
+        # a deserializer returns either the final value or a nested serialized value (for wrappers)
+        while isinstance(value, dict):
+            serialization_type = value.get('WFSerializationType')
+            deserializer = DESERIALIZERS.get(serialization_type)  # type: ignore
+            if deserializer is None:
+                raise RuntimeError(f'Unknown serialization type: {serialization_type}')
+            value = deserializer(value, stack)
+        container[key] = value
+
+    return result[0]
 
 
 class WFDeserializer:
     """
     Deserializer for WF fields (from shortcuts plist)
     which converts their data to a format acceptable by Actions
+
+    Kept for backward compatibility, use `deserialize`.
     """
     def __init__(self, data) -> None:
         self._data = data
 
     @property
     def deserialized_data(self) -> Union[str, List, Dict]:
-        if not isinstance(self._data, dict):
-            # todo: check if there are other types
-            return self._data
-
-        serialization_to_field_map: Dict[str, Type[WFDeserializer]] = {
-            'WFTextTokenString': WFVariableStringField,
-            'WFDictionaryFieldValue': WFDictionaryField,
-            'WFTextTokenAttachment': WFTextTokenAttachmentField,
-            'WFTokenAttachmentParameterState': WFTokenAttachmentParameterStateField,
-        }
+        return deserialize(self._data)
 
-        deserializer = serialization_to_field_map[self._data.get('WFSerializationType')]  # type: ignore
-        if deserializer:
-            return deserializer(self._data).deserialized_data
 
-        raise RuntimeError(f'Unknown serialization type: {self._data.get("WFSerializationType")}')
+def _deserialize_parameter_state(data: Dict, stack: List) -> Any:
+    # a wrapper, its value is converted by the next deserializer
+    return data['Value']
 
 
-class WFTokenAttachmentParameterStateField(WFDeserializer):
-    def __init__(self, data) -> None:
-        self._data = data['Value']
+def _deserialize_text_token_attachment(data: Dict, stack: List) -> str:
+    if data['Value'].get('Type') == 'Ask':
+        return '{{ask_when_run}}'
 
+    return data['Value']['VariableName']
 
-class WFTextTokenAttachmentField(WFDeserializer):
-    @property
-    def deserialized_data(self) -> str:
-        if self._data['Value'].get('Type') == 'Ask':
-            return '{{ask_when_run}}'
 
-        return self._data['Value']['VariableName']
+def _deserialize_dictionary(data: Dict, stack: List) -> List[Dict[str, Any]]:
+    result = []
+    for item in data['Value']['WFDictionaryFieldValueItems']:
+        # serialized keys and values are converted later, `deserialize` replaces them in place
+        result_item = {'key': item['WFKey'], 'value': item['WFValue']}
+        if isinstance(result_item['key'], dict):
+            stack.append((result_item, 'key'))
+        if isinstance(result_item['value'], dict):
+            stack.append((result_item, 'value'))
+        result.append(result_item)
+    return result
 
 
-class WFDictionaryField(WFDeserializer):
-    @property
-    def deserialized_data(self) -> List[Dict[str, Any]]:
-        result = []
-        for item in self._data['Value']['WFDictionaryFieldValueItems']:
-            key = WFDeserializer(item['WFKey']).deserialized_data
-            value = WFDeserializer(item['WFValue']).deserialized_data
-            result.append({'key': key, 'value': value})
-        return result
-
-
-class WFVariableStringField(WFDeserializer):
+def _deserialize_variable_string(data: Dict, stack: List) -> str:
     """
     Converts wf variable string (dictionary)
         <dict>
@@ -252,41 +529,84 @@ class WFVariableStringField(WFDeserializer):
     to a shortcuts-string:
         "Hello, {{var}}!"
     """
-    @property
-    def deserialized_data(self) -> str:
-        # if this field is a string with variables,
-        # we need to convert it to our representation
-        value = self._data['Value']
-        value_string = value['string']
-
-        positions = {}
-
-        supported_types = ('Ask', 'Variable')
-
-        for variable_range, variable_data in value['attachmentsByRange'].items():
-            if variable_data['Type'] not in supported_types:
-                # it doesn't support magic variables yet
-                raise RuntimeError(
-                    f'Unsupported variable type: {variable_data["Type"]} (possibly it is a magic variable)',
-                )
-
-            if variable_data['Type'] == 'Variable':
-                variable_name = variable_data['VariableName']
-            elif variable_data['Type'] == 'Ask':
-                variable_name = 'ask_when_run'
-
-            # let's find positions of all variables in the string
-            position = self._get_position(variable_range)
-            positions[position] = '{{%s}}' % variable_name
-
-        # and then replace them with '{{variable_name}}'
-        offset = 0
-        for pos, variable in collections.OrderedDict(sorted(positions.items())).items():
-            value_string = value_string[:pos + offset] + variable + value_string[pos + offset:]
-            offset += len(variable)
-
+    value = data['Value']
+    value_string = value['string']
+    attachments = value['attachmentsByRange']
+    if not attachments:
         return value_string
 
-    def _get_position(self, range_str: str) -> int:
-        ranges = list(map(lambda x: int(x.strip()), range_str.strip('{} ').split(',')))
-        return ranges[0]
+    variables = []
+
+    supported_types = ('Ask', 'Variable')
+
+    for variable_range, variable_data in attachments.items():
+        if variable_data['Type'] not in supported_types:
+            # it doesn't support magic variables yet
+            raise RuntimeError(
+                f'Unsupported variable type: {variable_data["Type"]} (possibly it is a magic variable)',
+            )
+
+        if variable_data['Type'] == 'Variable':
+            variable_name = variable_data['VariableName']
+        elif variable_data['Type'] == 'Ask':
+            variable_name = 'ask_when_run'
+
+        # let's find positions of all variables in the string
+        position, length = _parse_range(variable_range)
+        variables.append((position, length, '{{%s}}' % variable_name))
+
+    # and then replace them with '{{variable_name}}':
+    # the string is built from its parts in one pass instead of re-slicing it for every variable
+    parts = []
+    last = 0
+    for position, length, variable in sorted(variables):
+        parts.append(value_string[last:position])
+        parts.append(variable)
+        last = max(last, position + length)  # the variable replaces its placeholder (U+FFFC)
+    parts.append(value_string[last:])
+
+    return ''.join(parts)
+
+
+# WFSerializationType -> function(serialized value, stack of nested values) -> deserialized value
+DESERIALIZERS: Dict[str, Callable[[Dict, List], Any]] = {
+    'WFTextTokenString': _deserialize_variable_string,
+    'WFDictionaryFieldValue': _deserialize_dictionary,
+    'WFTextTokenAttachment': _deserialize_text_token_attachment,
+    'WFTokenAttachmentParameterState': _deserialize_parameter_state,
+}
+add_symbols(DESERIALIZERS)
+
+
+class _DeprecatedDeserializer(WFDeserializer):
+    def __init__(self, data) -> None:
+        warnings.warn(
+            f'{type(self).__name__} is deprecated, use shortcuts.loader.deserialize',
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        super().__init__(data)
+
+
+# deserializers of previous versions, `deserialize` finds the function by `WFSerializationType` of the data
+class WFTokenAttachmentParameterStateField(_DeprecatedDeserializer):
+    pass
+
+
+class WFTextTokenAttachmentField(_DeprecatedDeserializer):
+    pass
+
+
+class WFDictionaryField(_DeprecatedDeserializer):
+    pass
+
+
+class WFVariableStringField(_DeprecatedDeserializer):
+    pass
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_range(range_str: str) -> Tuple[int, int]:
+    """Parses range of an attachment: '{7, 1}' -> (7, 1)"""
+    position, length = range_str.strip('{} ').split(',')
+    return int(position), int(length)
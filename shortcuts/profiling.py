@@ -0,0 +1,194 @@
+"""
+Opt-in instrumentation of conversions.
+
+    from shortcuts.profiling import Profiler
+
+    with Profiler() as profiler:
+        sc = Shortcut.load(f, file_format='plist')
+        sc.dump(out, file_format='toml')
+
+    profiler.get_stats()  # {'parse': {'calls': 1, 'seconds': 0.01, 'net_allocated_blocks': 1042}, ...}
+    profiler.save('profile.json')
+
+Hooks are installed into loaders, dumpers and actions only inside the `with` block,
+the code of the library doesn't check any flags, so there is no cost when profiling is disabled.
+
+Phases (`PHASES`) are nested, every phase reports only its own time and allocations without nested phases,
+so the sum of all phases is about the time of the conversion. `net_allocated_blocks` is the net change
+of the number of allocated memory blocks in the phase (`sys.getallocatedblocks`): blocks which were allocated
+and not freed, it's not the number of allocations.
+Dumps of actions are grouped by identifiers of actions: `dump:is.workflow.actions.gettext`.
+Actions without parameters share one dump of their class in a document (see `BaseAction._has_class_dump`),
+every such action is counted as a call of its `dump:` phase, the time is reported for the only real dump.
+
+With `cprofile=True` the standard `cProfile` profiler runs too, `save(filepath, output_format='cprofile')`
+writes its stats which can be read by `pstats` or any viewer of `.prof` files.
+"""
+import functools
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from shortcuts import loader, shortcut
+from shortcuts.actions.base import BaseAction
+from shortcuts.dump import BinaryPListDumper, PListDumper, TomlDumper
+
+
+if TYPE_CHECKING:
+    import cProfile  # noqa
+
+
+OUTPUT_FORMATS = ('json', 'cprofile')
+
+PhaseName = Union[str, Callable[..., str]]
+
+# (object, name of the function or method, phase)
+PHASES: List[Tuple[Any, str, PhaseName]] = [
+    (loader.BaseLoader, 'load', 'read'),
+    (loader.PListLoader, 'load', 'read'),
+    (loader.TomlLoader, 'loads', 'parse'),
+    (loader.TomlLoader, '_action_from_toml', 'parse'),
+    (loader.PListLoader, 'loads', 'parse'),
+    (loader.PListLoader, '_load_from_file', 'parse'),
+    (loader.TomlLoader, '_action_from_dict', 'create_action'),
+    (loader.PListLoader, '_action_from_dict', 'create_action'),
+    (loader.PListLoader, '_get_known_action_class', 'resolve_action_class'),
+    (loader, 'deserialize', 'deserialize'),
+    (shortcut.Shortcut, '_get_control_flow', 'control_flow'),
+    (BaseAction, 'dump', lambda action, *args, **kwargs: f'dump:{action.itype}'),
+    (loader.LazyAction, 'dump', lambda action, *args, **kwargs: f'dump:{action.itype}'),
+    (PListDumper, '_write', 'encode'),
+    (BinaryPListDumper, 'dump', 'encode'),
+    (BinaryPListDumper, 'dumps', 'encode'),
+    (TomlDumper, 'dumps', 'encode'),
+    (TomlDumper, 'dump_actions', 'encode'),
+    (TomlDumper, '_process_action', lambda dumper, action: f'dump:{action.itype}'),
+]
+
+# (object, name of the generator function, phase of an item): items are counted as calls of phases without time,
+# actions with the dump of their class are dumped once per document, other such actions only reuse the dump
+COUNTERS: List[Tuple[Any, str, Callable[[Any], Optional[str]]]] = [
+    (
+        PListDumper,
+        '_iter_shortcut_actions',
+        lambda item: f'dump:{item.itype}' if isinstance(item, BaseAction) else None,
+    ),
+]
+
+
+class Profiler:
+    """
+    Context manager which records wall time and allocations of every phase of conversions
+    (see `PHASES`) while it's active. Only one profiler can be active at a time.
+    """
+    _active: Optional['Profiler'] = None
+
+    def __init__(self, cprofile: bool = False) -> None:
+        # the command line tool imports this module, cProfile and json are imported only when they are used
+        self.cprofile: Optional['cProfile.Profile'] = None
+        if cprofile:
+            import cProfile  # noqa: F811
+            self.cprofile = cProfile.Profile()
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.seconds = 0.0
+        # frames of active phases: [phase, start time, start allocated blocks, time and blocks of nested phases]
+        self._stack: List[List[Any]] = []
+        self._patches: List[Tuple[Any, str, Any]] = []
+        self._start = 0.0
+
+    def __enter__(self) -> 'Profiler':
+        if Profiler._active is not None:
+            raise RuntimeError('Another profiler is already active')
+        Profiler._active = self
+
+        for obj, name, phase in PHASES:
+            self._patch(obj, name, self._wrap(obj.__dict__[name], phase))
+        for obj, name, get_phase in COUNTERS:
+            self._patch(obj, name, self._wrap_counter(obj.__dict__[name], get_phase))
+
+        self._start = time.perf_counter()
+        if self.cprofile:
+            self.cprofile.enable()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        if self.cprofile:
+            self.cprofile.disable()
+        self.seconds += time.perf_counter() - self._start
+
+        for obj, name, original in reversed(self._patches):
+            setattr(obj, name, original)
+        self._patches = []
+        Profiler._active = None
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns {phase: {"calls": int, "seconds": float, "net_allocated_blocks": int}}"""
+        return {phase: dict(stats) for phase, stats in sorted(self.stats.items())}
+
+    def to_json(self) -> str:
+        import json
+        return json.dumps({'seconds': self.seconds, 'phases': self.get_stats()}, indent=2)
+
+    def save(self, filepath: str, output_format: str = 'json') -> None:
+        """Saves stats of phases (json) or stats of cProfile (cprofile)"""
+        if output_format == 'json':
+            with open(filepath, 'w') as f:
+                f.write(self.to_json())
+                f.write('\n')
+        elif output_format == 'cprofile':
+            if self.cprofile is None:
+                raise RuntimeError('cProfile stats are collected only with Profiler(cprofile=True)')
+            self.cprofile.dump_stats(filepath)
+        else:
+            raise RuntimeError(f'Unsupported output format: {output_format}')
+
+    def _patch(self, obj: Any, name: str, patched: Any) -> None:
+        self._patches.append((obj, name, obj.__dict__[name]))
+        setattr(obj, name, patched)
+
+    def _wrap(self, func: Any, phase: PhaseName) -> Any:
+        if isinstance(func, classmethod):
+            return classmethod(self._wrap(func.__func__, phase))
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            name = phase(*args, **kwargs) if callable(phase) else phase
+            if self._stack and self._stack[-1][0] == name:
+                # the same phase calls itself (`loads` -> `_load_from_file`, etc), it's one call
+                return func(*args, **kwargs)
+
+            frame: List[Any] = [name, time.perf_counter(), sys.getallocatedblocks(), 0.0, 0]
+            self._stack.append(frame)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._stack.pop()
+                seconds = time.perf_counter() - frame[1]
+                blocks = sys.getallocatedblocks() - frame[2]
+                if self._stack:
+                    self._stack[-1][3] += seconds
+                    self._stack[-1][4] += blocks
+
+                stats = self._get_phase_stats(name)
+                stats['calls'] += 1
+                stats['seconds'] += seconds - frame[3]
+                stats['net_allocated_blocks'] += blocks - frame[4]
+
+        return wrapper
+
+    def _wrap_counter(self, func: Callable, get_phase: Callable[[Any], Optional[str]]) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Iterator[Any]:
+            classes = set()  # the first item of every class is dumped and counted by the phase itself
+            for item in func(*args, **kwargs):
+                name = get_phase(item)
+                if name is not None:
+                    if type(item) in classes:
+                        self._get_phase_stats(name)['calls'] += 1
+                    classes.add(type(item))
+                yield item
+
+        return wrapper
+
+    def _get_phase_stats(self, name: str) -> Dict[str, Any]:
+        return self.stats.setdefault(name, {'calls': 0, 'seconds': 0.0, 'net_allocated_blocks': 0})
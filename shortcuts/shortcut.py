@@ -1,42 +1,78 @@
 import logging
-import plistlib
-import uuid
-from typing import Any, Dict, List, TextIO, Type
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Type, Union
 
-from shortcuts.actions import MenuEndAction, MenuItemAction, MenuStartAction
-from shortcuts.actions.base import GroupIDField
-from shortcuts.dump import BaseDumper, PListDumper, TomlDumper
-from shortcuts.loader import BaseLoader, PListLoader, TomlLoader
+
+if TYPE_CHECKING:
+    from shortcuts.actions.base import BaseAction  # noqa
+    from shortcuts.control_flow import ControlFlow  # noqa
+    from shortcuts.dump import BaseDumper  # noqa
+    from shortcuts.loader import BaseLoader  # noqa
+    from shortcuts.table import ActionTable  # noqa
 
 
 logger = logging.getLogger(__name__)
 
 
+# namespace for deterministic group ids (see `Shortcut.deterministic_group_ids`)
+# it's uuid5(NAMESPACE_URL, 'https://github.com/alexander-akhmetov/python-shortcuts'),
+# the value is written as is: `uuid` is imported only when group ids are generated
+GROUP_ID_NAMESPACE = '3405497d-5dc2-5551-8c4b-18ffe3db8d4e'
+
+
 class Shortcut:
     def __init__(self,
                  name: str = '',
                  client_release: str = '2.0',
                  client_version: str = '700',
                  minimal_client_version: int = 411,
-                 actions: List = None) -> None:
+                 actions: List = None,
+                 deterministic_group_ids: bool = False) -> None:
         self.name = name
         self.client_release = client_release
         self.client_version = client_version
         self.minimal_client_version = minimal_client_version
-        self.actions = actions if actions else []
+        self.actions = actions if actions is not None else []
+        # if True, generated group ids depend only on the name of the shortcut and the position of the group,
+        # so the same shortcut is always dumped to the same file
+        self.deterministic_group_ids = deterministic_group_ids
+        self._control_flow: Optional['ControlFlow'] = None
 
     @classmethod
-    def load(cls, file_object: TextIO, file_format: str = 'toml') -> 'Shortcut':
-        return cls._get_loader_class(file_format).load(file_object)
+    def load(cls, file_object: IO, file_format: str = 'toml', lazy: bool = False) -> 'Shortcut':
+        """
+        Loads a shortcut from a file.
+        If `lazy` is True, actions of plists are deserialized only when they are used (see `LazyAction`)
+        """
+        return cls._get_loader_class(file_format).load(file_object, lazy=lazy)
+
+    @classmethod
+    def loads(cls, string: Union[str, bytes], file_format: str = 'toml', lazy: bool = False) -> 'Shortcut':
+        return cls._get_loader_class(file_format).loads(string, lazy=lazy)
+
+    @classmethod
+    def iter_actions(cls, file_object: IO, file_format: str = 'toml') -> Iterator['BaseAction']:
+        """
+        Yields actions from a file one by one as they are parsed, without loading the whole shortcut,
+        so big files are processed in constant memory
+        """
+        return cls._get_loader_class(file_format).iter_actions(file_object)
 
     @classmethod
-    def loads(cls, string: str, file_format: str = 'toml') -> 'Shortcut':
-        return cls._get_loader_class(file_format).loads(string)
+    def load_table(cls, file_object: IO, file_format: str = 'toml') -> 'ActionTable':
+        """
+        Loads actions from a file to `ActionTable`: columnar storage for very large shortcuts.
+        The table can be used as actions of a shortcut: `Shortcut(actions=table).dumps()`
+        """
+        return cls._get_loader_class(file_format).load_table(file_object)
 
     @classmethod
-    def _get_loader_class(self, file_format: str) -> Type[BaseLoader]:
+    def _get_loader_class(self, file_format: str) -> Type['BaseLoader']:
         """Based on file_format returns loader class"""
+        # loaders and dumpers are imported on the first use, they aren't needed on import of the library
+        from shortcuts.loader import PListLoader, TomlLoader  # noqa
+
         supported_formats = {
+            'bplist': PListLoader,
             'plist': PListLoader,
             'shortcut': PListLoader,
             'toml': TomlLoader,
@@ -47,15 +83,18 @@ class Shortcut:
 
         raise RuntimeError(f'Unknown file_format: {file_format}')
 
-    def dump(self, file_object: TextIO, file_format: str = 'plist') -> None:
+    def dump(self, file_object: IO, file_format: str = 'plist') -> None:
         self._get_dumper_class(file_format)(shortcut=self).dump(file_object)
 
-    def dumps(self, file_format: str = 'plist') -> str:
+    def dumps(self, file_format: str = 'plist') -> Union[str, bytes]:
         return self._get_dumper_class(file_format)(shortcut=self).dumps()
 
-    def _get_dumper_class(self, file_format: str) -> Type[BaseDumper]:
+    def _get_dumper_class(self, file_format: str) -> Type['BaseDumper']:
         """Based on file_format returns dumper class"""
+        from shortcuts.dump import BinaryPListDumper, PListDumper, TomlDumper  # noqa
+
         supported_formats = {
+            'bplist': BinaryPListDumper,
             'plist': PListDumper,
             'shortcut': PListDumper,
             'toml': TomlDumper,
@@ -66,65 +105,50 @@ class Shortcut:
 
         raise RuntimeError(f'Unknown file_format: {file_format}')
 
-    def _get_actions(self) -> List[str]:
+    def _get_actions(self) -> List[Dict]:
         """returns list of all actions"""
-        self._set_group_ids()
-        self._set_menu_items()
-        return [a.dump() for a in self.actions]
+        return list(self._iter_actions())
 
-    def _set_group_ids(self):
-        """
-        Automatically sets group_id based on WFControlFlowMode param
-        Uses list as a stack to hold generated group_ids
+    def _iter_actions(self) -> Iterator[Dict]:
+        """dumps actions one by one"""
+        for action, extra_data in self._iter_actions_with_data():
+            yield action.dump(extra_data=extra_data)
+
+    def _iter_actions_with_data(self) -> Iterator[Tuple['BaseAction', Optional[Dict]]]:
+        """yields actions with their extra data for `dump()`: group ids and menu items"""
+        control_flow = self._get_control_flow()
+        for index, action in enumerate(self.actions):
+            yield action, control_flow.get_action_data(index)
 
-        Each cycle or condition (if-else, repeat) in Shortcuts app must have group id.
-        Start and end of the cycle must have the same group_id. To do this,
-        we use stack to save generated or readed group_id to save it to all actions of the cycle
+    def _get_control_flow(self) -> 'ControlFlow':
         """
-        ids = []
-        for action in self.actions:
-            # if action has GroupIDField, we may need to generate it's value automatically
-            if not isinstance(getattr(action, 'group_id', None), GroupIDField):
-                continue
-
-            control_mode = action.default_fields['WFControlFlowMode']
-            if control_mode == 0:
-                # 0 means beginning of the group
-                group_id = action.data.get('group_id', str(uuid.uuid4()))
-                action.data['group_id'] = group_id  # if wasn't defined
-                ids.append(group_id)
-            elif control_mode == 1:
-                # 1 - else, so we don't need to remove group_id from the stack
-                # we need to just use the latest one
-                action.data['group_id'] = ids[-1]
-            elif control_mode == 2:
-                # end of the group, we must remove group_id
-                try:
-                    action.data['group_id'] = ids.pop()
-                except IndexError:
-                    # if actions are correct, all groups must be compelted
-                    # (group complete if it has start and end actions)
-                    raise RuntimeError('Incomplete cycle')
-
-    def _set_menu_items(self):
-        menus = []
-        for action in self.actions:
-            if isinstance(action, MenuStartAction):
-                action.data['menu_items'] = []
-                menus.append(action)
-            elif isinstance(action, MenuItemAction):
-                menus[-1].data['menu_items'].append(action.data['title'])
-            elif isinstance(action, MenuEndAction):
-                try:
-                    menus.pop()
-                except IndexError:
-                    raise RuntimeError('Incomplete menu action')
+        Returns group ids and menu items of actions.
+        The result is cached until actions (or their group ids and titles), the name
+        or `deterministic_group_ids` are changed,
+        so dumping the same shortcut to several formats resolves it only once
+        """
+        from shortcuts.control_flow import ControlFlow  # noqa
+
+        options = (self.name, self.deterministic_group_ids)  # inputs of `_generate_group_id`
+        if self._control_flow is None or not self._control_flow.is_valid_for(self.actions, options):
+            self._control_flow = ControlFlow(self.actions, generate_group_id=self._generate_group_id, options=options)
+        return self._control_flow
+
+    def _generate_group_id(self, group_number: int) -> str:
+        import uuid
+
+        if self.deterministic_group_ids:
+            # uuid5 is a hash of the namespace and the name, it doesn't need random bytes from the OS
+            return str(uuid.uuid5(uuid.UUID(GROUP_ID_NAMESPACE), f'{self.name}:{group_number}'))
+        return str(uuid.uuid4())
 
     def _get_import_questions(self) -> List:
         # todo: change me
         return []
 
     def _get_icon(self) -> Dict[str, Any]:
+        import plistlib
+
         # todo: change me
         return {
             'WFWorkflowIconGlyphNumber': 59511,
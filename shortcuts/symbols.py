@@ -0,0 +1,43 @@
+"""
+Process-wide table of strings which are repeated in every shortcut:
+identifiers of actions, names of parameters, types of serialized values, etc.
+
+Loaders replace such strings with objects from the table, so all loaded shortcuts
+share one object per string instead of a new copy for every occurrence,
+and lookups of parameters by name compare strings by identity.
+Other strings (texts, names of variables) are not added to the table.
+"""
+from typing import Dict, Iterable
+
+
+SYMBOLS: Dict[str, str] = {}
+
+
+def add_symbols(strings: Iterable[str]) -> None:
+    for string in strings:
+        SYMBOLS.setdefault(string, string)
+
+
+def intern_symbol(string: str) -> str:
+    """Returns the string from the table which is equal to `string`, or `string` itself if it's not a symbol"""
+    return SYMBOLS.get(string, string)
+
+
+# keys of plists which are not names of fields: itypes and fields are added by `shortcuts.actions`
+# and by classes of actions when they are created
+add_symbols((
+    'WFWorkflowActionIdentifier',
+    'WFWorkflowActionParameters',
+    'WFSerializationType',
+    'Value',
+    'string',
+    'attachmentsByRange',
+    'Type',
+    'VariableName',
+    'Variable',
+    'Ask',
+    'WFDictionaryFieldValueItems',
+    'WFItemType',
+    'WFKey',
+    'WFValue',
+))
@@ -0,0 +1,168 @@
+"""
+Columnar storage of actions for very large shortcuts.
+
+`ActionTable` keeps actions as columns of numbers instead of a list of objects:
+codes of action classes, ids of parameter keys and ids of values in a pool where equal values are stored once.
+Actions are created from the columns only when they are accessed.
+"""
+import collections
+import copy
+import itertools
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple, Type, Union, overload
+
+from shortcuts.actions.base import BaseAction
+from shortcuts.loader import LazyAction
+
+
+class ActionTable(Sequence[BaseAction]):
+    """
+    Sequence of actions stored in columns, it can be used instead of a list of actions
+    in `Shortcut.actions` and is filled by `Shortcut.load_table`.
+
+    Every access to an item creates a new action from the columns (or returns the shared instance of an action
+    without fields, see `BaseAction.create`), changes of the action are not saved to the table.
+    The table is append-only: actions can be added, but can't be changed or removed.
+
+    Counting and filtering by itype work with the column of type codes without creation of actions.
+    """
+    def __init__(self, actions: Iterable[BaseAction] = ()) -> None:
+        self._type_codes = array('H')  # code of the class of every action: index in `_classes`
+        # parameters of the action with index `i` are in `_keys` and `_values` from `_offsets[i]` to `_offsets[i + 1]`
+        self._offsets = array('I', [0])
+        self._keys = array('H')  # ids of parameter keys: indexes in `_key_names`
+        self._values = array('I')  # ids of values: indexes in `_pool`
+
+        # registries are append-only, so they are shared by tables created from this one (see `_take`)
+        self._classes: List[Type[BaseAction]] = []
+        self._class_codes: Dict[Type[BaseAction], int] = {}
+        self._key_names: List[str] = []
+        self._key_ids: Dict[str, int] = {}
+        self._pool: List[Any] = []
+        self._pool_ids: Dict[Tuple[type, Any], int] = {}  # hashable values are stored in the pool once
+
+        self.extend(actions)
+
+    def append(self, action: BaseAction) -> None:
+        if isinstance(action, LazyAction):
+            action = action.action
+
+        action_class = type(action)
+        code = self._class_codes.get(action_class)
+        if code is None:
+            code = self._class_codes[action_class] = len(self._classes)
+            self._classes.append(action_class)
+
+        for key, value in action.data.items():
+            self._keys.append(self._get_key_id(key))
+            self._values.append(self._get_value_id(value))
+
+        self._type_codes.append(code)
+        self._offsets.append(len(self._keys))
+
+    def extend(self, actions: Iterable[BaseAction]) -> None:
+        for action in actions:
+            self.append(action)
+
+    def _get_key_id(self, key: str) -> int:
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = self._key_ids[key] = len(self._key_names)
+            self._key_names.append(key)
+        return key_id
+
+    def _get_value_id(self, value: Any) -> int:
+        try:
+            # the type is a part of the key: True, 1 and 1.0 are equal, but they are different values
+            pool_key = (type(value), value)
+            value_id = self._pool_ids.get(pool_key)
+        except TypeError:
+            # unhashable values (lists, dictionaries) are not deduplicated
+            pool_key, value_id = None, None
+
+        if value_id is None:
+            value_id = len(self._pool)
+            self._pool.append(value)
+            if pool_key is not None:
+                self._pool_ids[pool_key] = value_id
+        return value_id
+
+    def __len__(self) -> int:
+        return len(self._type_codes)
+
+    @overload
+    def __getitem__(self, index: int) -> BaseAction:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> 'ActionTable':
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[BaseAction, 'ActionTable']:
+        if isinstance(index, slice):
+            return self._take(range(len(self))[index])
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('action index out of range')
+
+        start, end = self._offsets[index], self._offsets[index + 1]
+        data = {}
+        for key_id, value_id in zip(self._keys[start:end], self._values[start:end]):
+            value = self._pool[value_id]
+            # nested values are copied, so changes of an action don't change the table
+            data[self._key_names[key_id]] = copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+
+        return self._classes[self._type_codes[index]].create(data=data)
+
+    def __iter__(self) -> Iterator[BaseAction]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_class(self, index: int) -> Type[BaseAction]:
+        """Returns class of the action without its creation"""
+        return self._classes[self._type_codes[index]]
+
+    def iter_classes(self) -> Iterator[Type[BaseAction]]:
+        """Yields classes of all actions without their creation"""
+        return map(self._classes.__getitem__, self._type_codes)
+
+    def count_itype(self, itype: str) -> int:
+        """Returns number of actions with the itype"""
+        return sum(self._type_codes.count(code) for code in self._get_codes(itype))
+
+    def itype_counts(self) -> Dict[str, int]:
+        """Returns number of actions of every itype"""
+        counts: Dict[str, int] = collections.Counter()
+        for code, count in collections.Counter(self._type_codes).items():
+            counts[self._classes[code].itype] += count  # type: ignore
+        return dict(counts)
+
+    def filter_itype(self, itype: str) -> 'ActionTable':
+        """Returns a new table with actions of the itype"""
+        codes = self._get_codes(itype)
+        return self._take(itertools.compress(range(len(self)), map(codes.__contains__, self._type_codes)))
+
+    def _get_codes(self, itype: str) -> frozenset:
+        # several classes can have the same itype (if/else/end if, etc)
+        return frozenset(code for code, action_class in enumerate(self._classes) if action_class.itype == itype)
+
+    def _take(self, indexes: Iterable[int]) -> 'ActionTable':
+        """Returns a new table with actions from `indexes`, registries of classes, keys and values are shared"""
+        table = ActionTable()
+        table._classes, table._class_codes = self._classes, self._class_codes
+        table._key_names, table._key_ids = self._key_names, self._key_ids
+        table._pool, table._pool_ids = self._pool, self._pool_ids
+
+        for index in indexes:
+            start, end = self._offsets[index], self._offsets[index + 1]
+            table._type_codes.append(self._type_codes[index])
+            table._keys.extend(self._keys[start:end])
+            table._values.extend(self._values[start:end])
+            table._offsets.append(len(table._keys))
+
+        return table
+
+    def __repr__(self) -> str:
+        return f'<ActionTable: {len(self)} actions>'
@@ -0,0 +1,84 @@
+"""
+TOML backends.
+
+The fastest installed library is used:
+`tomllib` (python 3.11+) or `tomli` to load files, the `toml` package is the fallback.
+Files are dumped with `toml`: it's faster than `tomli_w` (see `benchmarks/toml_backends.py`),
+`tomli_w` is used only if `toml` is not installed.
+"""
+import functools
+from typing import Any, Callable, Dict, Optional
+
+
+def _get_tomllib_loads() -> Callable[[str], Dict[str, Any]]:
+    import tomllib  # type: ignore
+    return tomllib.loads
+
+
+def _get_tomli_loads() -> Callable[[str], Dict[str, Any]]:
+    import tomli  # type: ignore
+    return tomli.loads
+
+
+def _get_toml_loads() -> Callable[[str], Dict[str, Any]]:
+    import toml
+    return toml.loads
+
+
+def _get_tomli_w_dumps() -> Callable[[Dict[str, Any]], str]:
+    import tomli_w  # type: ignore
+    # multiline strings are written as they are (as in examples/multiline.toml), not with escaped "\n"
+    return functools.partial(tomli_w.dumps, multiline_strings=True)
+
+
+def _get_toml_dumps() -> Callable[[Dict[str, Any]], str]:
+    import toml
+    return toml.dumps
+
+
+# backend name -> function which imports the backend and returns its loads/dumps function,
+# in order of preference
+LOADS_BACKENDS: Dict[str, Callable[[], Callable[[str], Dict[str, Any]]]] = {
+    'tomllib': _get_tomllib_loads,
+    'tomli': _get_tomli_loads,
+    'toml': _get_toml_loads,
+}
+DUMPS_BACKENDS: Dict[str, Callable[[], Callable[[Dict[str, Any]], str]]] = {
+    'toml': _get_toml_dumps,
+    'tomli_w': _get_tomli_w_dumps,
+}
+
+
+def loads(string: str) -> Dict[str, Any]:
+    return get_loads()(string)
+
+
+def dumps(data: Dict[str, Any]) -> str:
+    return get_dumps()(data)
+
+
+@functools.lru_cache(maxsize=None)
+def get_loads(backend: Optional[str] = None) -> Callable[[str], Dict[str, Any]]:
+    """Returns loads function of the backend, by default of the first installed one"""
+    return _get_function(LOADS_BACKENDS, backend)
+
+
+@functools.lru_cache(maxsize=None)
+def get_dumps(backend: Optional[str] = None) -> Callable[[Dict[str, Any]], str]:
+    """Returns dumps function of the backend, by default of the first installed one"""
+    return _get_function(DUMPS_BACKENDS, backend)
+
+
+def _get_function(backends: Dict[str, Callable[[], Callable]], backend: Optional[str]) -> Callable:
+    if backend is not None:
+        if backend not in backends:
+            raise RuntimeError(f'Unknown toml backend: {backend}')
+        return backends[backend]()
+
+    for get_function in backends.values():
+        try:
+            return get_function()
+        except ImportError:
+            continue
+
+    raise RuntimeError('There is no installed toml library')
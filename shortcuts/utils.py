@@ -1,9 +1,17 @@
+import warnings
 from subprocess import call
 
 
 def convert_plist_to_binary(filepath):
+    _warn_deprecated('convert_plist_to_binary', "Shortcut.dump(f, file_format='bplist')")
     call(['plutil', '-convert', 'binary1', filepath])
 
 
 def convert_plist_to_xml(filepath):
+    _warn_deprecated('convert_plist_to_xml', "Shortcut.load(f, file_format='plist')")
     call(['plutil', '-convert', 'xml1', filepath])
+
+
+def _warn_deprecated(name, replacement):
+    # plistlib reads and writes binary plists, plutil is not needed anymore
+    warnings.warn(f'{name} is deprecated, use {replacement}', DeprecationWarning, stacklevel=3)
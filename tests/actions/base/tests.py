@@ -4,6 +4,7 @@ from shortcuts.actions.base import (
     BaseAction,
     BooleanField,
     ChoiceField,
+    Field,
     FloatField,
     IntegerField,
     ArrayField,
@@ -13,8 +14,10 @@ from shortcuts.actions.base import (
 
 class TestBaseAction:
     def test_get_parameters(self):
-        base_action = BaseAction()
-        base_action.itype = '123'
+        class MyAction(BaseAction):
+            itype = '123'
+
+        base_action = MyAction()
         dump = base_action.dump()
 
         exp_dump = {
@@ -24,6 +27,182 @@ class TestBaseAction:
         assert dump == exp_dump
 
 
+class TestBaseActionFields:
+    def test_fields_are_collected_once_per_class(self):
+        class MyAction(BaseAction):
+            second = VariablesField('WFSecond')
+            first = BooleanField('WFFirst')
+
+        assert MyAction._fields == (MyAction.first, MyAction.second)
+        assert MyAction().fields is MyAction._fields
+        assert dict(MyAction._fields_by_name) == {'WFFirst': MyAction.first, 'WFSecond': MyAction.second}
+        assert dict(MyAction._fields_by_attr) == {'first': MyAction.first, 'second': MyAction.second}
+        assert MyAction.first._attr == 'first'
+
+    def test_inherited_fields(self):
+        class ParentAction(BaseAction):
+            parent = BooleanField('WFParent')
+
+        class ChildAction(ParentAction):
+            child = FloatField('WFChild')
+
+        assert ParentAction._fields == (ParentAction.parent, )
+        assert ChildAction._fields == (ChildAction.child, ParentAction.parent)
+
+
+class TestBaseActionDumpPlan:
+    class MyAction(BaseAction):
+        itype = 'my.identifier'
+
+        count = IntegerField('WFCount')
+        text = Field('WFText', required=False)
+        flag = BooleanField('WFFlag', default=True)
+
+        default_fields = {
+            'WFStatic': 'value',
+        }
+
+    def test_dump_plan(self):
+        assert self.MyAction._dump_plan == (
+            ('WFCount', 'count', int, None, True),
+            ('WFFlag', 'flag', self.MyAction.flag.process_value, True, True),
+            ('WFText', 'text', None, None, False),
+        )
+
+    def test_dump(self):
+        dump = self.MyAction(data={'count': '5'}).dump()
+
+        exp_dump = {
+            'WFWorkflowActionIdentifier': 'my.identifier',
+            'WFWorkflowActionParameters': {
+                'WFCount': 5,
+                'WFFlag': True,
+                'WFStatic': 'value',
+            },
+        }
+        assert dump == exp_dump
+
+    def test_dump_without_required_field(self):
+        with pytest.raises(ValueError):
+            self.MyAction(data={'text': 'some text'}).dump()
+
+
+class TestBaseActionDefaultFields:
+    class MyAction(BaseAction):
+        default_fields = {
+            'WFStatic': 'value',
+        }
+
+    def test_default_fields_are_shared(self):
+        assert self.MyAction().default_fields is self.MyAction().default_fields
+
+        with pytest.raises(TypeError):
+            self.MyAction().default_fields['WFStatic'] = 'new value'  # type: ignore
+
+    def test_set_default_field(self):
+        action = self.MyAction()
+        action._set_default_field('WFNew', 'new value')
+
+        assert action.default_fields == {'WFStatic': 'value', 'WFNew': 'new value'}
+        assert self.MyAction.default_fields == {'WFStatic': 'value'}
+        assert self.MyAction().default_fields == {'WFStatic': 'value'}
+        assert action.dump()['WFWorkflowActionParameters'] == {'WFStatic': 'value', 'WFNew': 'new value'}
+
+    def test_inherited_default_fields(self):
+        class ChildAction(self.MyAction):
+            pass
+
+        assert ChildAction.default_fields == {'WFStatic': 'value'}
+        assert ChildAction().dump()['WFWorkflowActionParameters'] == {'WFStatic': 'value'}
+
+
+class TestSharedInstance:
+    class MyAction(BaseAction):
+        itype = 'my.identifier'
+
+        default_fields = {
+            'WFStatic': 'value',
+        }
+
+    def test_create(self):
+        action = self.MyAction.create()
+
+        assert self.MyAction.create() is action
+        assert self.MyAction.create(data={}) is action
+        assert self.MyAction() is not action
+        assert self.MyAction.create(data={'unknown': 'value'}) is not action
+
+    def test_actions_with_fields_are_not_shared(self):
+        class ChildAction(self.MyAction):
+            text = Field('WFText')
+
+        assert ChildAction.create() is not ChildAction.create()
+        assert ChildAction()._has_class_dump() is False
+
+    def test_shared_instance_is_read_only(self):
+        action = self.MyAction.create()
+
+        with pytest.raises(TypeError):
+            action.data['key'] = 'value'
+        with pytest.raises(TypeError):
+            action._set_default_field('WFStatic', 'new value')
+
+        assert self.MyAction().default_fields == {'WFStatic': 'value'}
+
+    def test_class_dump(self):
+        exp_dump = {
+            'WFWorkflowActionIdentifier': 'my.identifier',
+            'WFWorkflowActionParameters': {'WFStatic': 'value'},
+        }
+
+        assert self.MyAction.create()._has_class_dump() is True
+        assert self.MyAction.create().dump() == exp_dump
+        assert self.MyAction().dump(extra_data={'group_id': 'id'}) == exp_dump
+
+    def test_dump_is_not_shared(self):
+        dump = self.MyAction.create().dump()
+        dump['WFWorkflowActionParameters']['WFStatic'] = 'changed'
+
+        assert self.MyAction.create().dump() is not dump
+        assert self.MyAction.create().dump()['WFWorkflowActionParameters'] == {'WFStatic': 'value'}
+
+    def test_dump_of_changed_default_fields(self):
+        action = self.MyAction()
+        action._set_default_field('WFStatic', 'new value')
+
+        assert action._has_class_dump() is False
+        assert action.dump()['WFWorkflowActionParameters'] == {'WFStatic': 'new value'}
+        assert self.MyAction().dump()['WFWorkflowActionParameters'] == {'WFStatic': 'value'}
+
+
+class TestSlots:
+    def test_actions_without_dict(self):
+        from shortcuts.actions import KEYWORD_TO_ACTION_MAP
+
+        for action_class in KEYWORD_TO_ACTION_MAP.values():
+            action = action_class()
+            assert not hasattr(action, '__dict__'), action_class
+            with pytest.raises(AttributeError):
+                action.unknown_attribute = 'value'
+
+    def test_fields_without_dict(self):
+        for field in (Field('WFField'), ChoiceField('WFChoice', choices=('a', 'b')), VariablesField('WFText')):
+            assert not hasattr(field, '__dict__')
+
+    def test_own_slots(self):
+        class MyField(Field):
+            __slots__ = ('extra',)
+
+            def __init__(self, name, extra):
+                super().__init__(name)
+                self.extra = extra
+
+        field = MyField('WFField', extra='value')
+
+        assert field.extra == 'value'
+        assert not hasattr(field, '__dict__')
+
+
 class TestBooleanField:
     def test_boolean_field(self):
         f = BooleanField('test')
@@ -89,6 +268,65 @@ class TestArrayField:
             f.process_value('value')
 
 
+class TestVariablesField:
+    def test_text_without_variables(self):
+        f = VariablesField('t')
+
+        exp_value = {
+            'Value': {'attachmentsByRange': {}, 'string': 'text'},
+            'WFSerializationType': 'WFTextTokenString',
+        }
+        assert f.process_value('text') == exp_value
+
+    def test_text_with_variables(self):
+        f = VariablesField('t')
+
+        exp_value = {
+            'Value': {
+                'attachmentsByRange': {
+                    '{6, 1}': {'Type': 'Variable', 'VariableName': 'name'},
+                    '{9, 1}': {'Type': 'Ask'},
+                },
+                'string': 'Hello ￼! ￼',
+            },
+            'WFSerializationType': 'WFTextTokenString',
+        }
+        assert f.process_value('Hello {{name}}! {{ask_when_run}}') == exp_value
+
+    @pytest.mark.parametrize('text, exp_string, exp_attachments', [
+        ('{{ask_when_run}}', None, None),
+        ('{{name}}', '￼', {'{0, 1}': {'Type': 'Variable', 'VariableName': 'name'}}),
+        ('{{ask_when_run}}!', '￼!', {'{0, 1}': {'Type': 'Ask'}}),
+        (
+            '{{a}}{{b}} text',
+            '￼￼ text',
+            {
+                '{0, 1}': {'Type': 'Variable', 'VariableName': 'a'},
+                '{1, 1}': {'Type': 'Variable', 'VariableName': 'b'},
+            },
+        ),
+        ('{{not a variable}}', '{{not a variable}}', {}),
+    ])
+    def test_text_starts_with_variable(self, text, exp_string, exp_attachments):
+        f = VariablesField('t')
+
+        value = f.process_value(text)
+
+        if exp_string is None:
+            assert value == {'WFSerializationType': 'WFTextTokenAttachment', 'Value': {'Type': 'Ask'}}
+        else:
+            assert value['Value'] == {'attachmentsByRange': exp_attachments, 'string': exp_string}
+
+    def test_cached_result_is_not_shared(self):
+        f = VariablesField('t')
+        text = 'Hello {{name}}!'
+
+        first_value = f.process_value(text)
+        first_value['Value']['attachmentsByRange']['{6, 1}']['VariableName'] = 'changed'
+
+        assert f.process_value(text)['Value']['attachmentsByRange']['{6, 1}']['VariableName'] == 'name'
+
+
 class TestActionWithAskWhenRunField:
     def test_action(self):
         identifier = 'my.identifier'
@@ -74,15 +74,13 @@ class TestConditionalAction:
         type = "repeat_end"'''
         sc = Shortcut.loads(toml)
 
-        mocked_uuid = mock.Mock()
-
         ids = ['first_id', 'second_id']
 
         def _return_id():
             return ids.pop()
 
-        mocked_uuid.uuid4 = _return_id
-        with mock.patch('shortcuts.shortcut.uuid', mocked_uuid):
+        # uuid is imported by the library only when group ids are generated
+        with mock.patch('uuid.uuid4', _return_id):
             dump = sc.dumps(file_format='plist')
 
         assert len(ids) == 0
@@ -91,9 +89,10 @@ class TestConditionalAction:
         assert dump == exp_dump
 
         # check all actions now has group_id
-        group_id_for_repeat = sc.actions[0].data.get('group_id')
+        group_ids = sc._get_control_flow().group_ids
+        group_id_for_repeat = group_ids.get(0)
         assert group_id_for_repeat is not None
-        group_id_for_if = sc.actions[2].data.get('group_id')
+        group_id_for_if = group_ids.get(2)
         assert group_id_for_if is not None
         # and they are not equal
         assert group_id_for_if != group_id_for_repeat
@@ -102,8 +101,8 @@ class TestConditionalAction:
         assert isinstance(sc.actions[0], actions.RepeatStartAction)
         assert isinstance(sc.actions[2], actions.IfAction)
 
-        for action in sc.actions:
+        for index, action in enumerate(sc.actions):
             if isinstance(action, (actions.RepeatEndAction, actions.RepeatStartAction)):
-                assert action.data.get('group_id') == group_id_for_repeat
+                assert group_ids[index] == group_id_for_repeat
             elif isinstance(action, (actions.IfAction, actions.ElseAction, actions.EndIfAction)):
-                assert action.data.get('group_id') == group_id_for_if
+                assert group_ids[index] == group_id_for_if
@@ -1,17 +1,26 @@
 import os
 import importlib
+import subprocess
+import sys
+
+import mock
+import pytest
 
 from shortcuts import actions
 
 
 class TestActions:
-    def test_all_actions_must_be_imported_in_the_init(self):
+    def test_all_actions_must_be_in_the_manifest(self):
         """
         checks that all subclasses of BaseAction in files `shortcuts/actions/*.py`
-        are imported in the `shortcuts/actions/__init__.py`
+        are in the manifest `shortcuts.actions.ACTIONS` with their keywords and itypes
         """
-        lib_actions = self._get_actions_from_module(actions)  # actions from shortcuts/actions/__init__.py
+        manifest = {
+            (f'shortcuts.actions.{module}', class_name, keyword, itype)
+            for module, class_name, keyword, itype in actions.ACTIONS
+        }
 
+        module_actions = set()
         files = os.listdir(os.path.dirname(actions.__file__))
         for module in files:
             if module == '__init__.py':
@@ -21,10 +30,74 @@ class TestActions:
                 continue
 
             imported_module = importlib.import_module(f'shortcuts.actions.{module_name}')
-            module_actions = self._get_actions_from_module(imported_module)
+            module_actions |= {
+                (cls.__module__, cls.__name__, cls.keyword, cls.itype)
+                for cls in self._get_actions_from_module(imported_module)
+            }
+
+        msg = 'Seems like you have actions which are not in `shortcuts.actions.ACTIONS`'
+        assert module_actions == manifest, msg
+
+    def test_imports(self):
+        from shortcuts.actions import TextAction
+        from shortcuts.actions.text import TextAction as ModuleTextAction
+
+        assert TextAction is ModuleTextAction
+        assert 'TextAction' in dir(actions)
+
+    def test_unknown_attribute(self):
+        with pytest.raises(AttributeError):
+            actions.UnknownAction
+
+    def test_maps(self):
+        from shortcuts.actions import Base64EncodeAction, IfAction, TextAction
+
+        assert actions.KEYWORD_TO_ACTION_MAP['text'] is TextAction
+        assert actions.KEYWORD_TO_ACTION_MAP.get('text') is TextAction
+        assert actions.KEYWORD_TO_ACTION_MAP.get('unknown') is None
+        assert 'unknown' not in actions.KEYWORD_TO_ACTION_MAP
+        assert len(actions.KEYWORD_TO_ACTION_MAP) == len(actions.ACTIONS)
+        # if several actions have the same itype, the last one is in the map
+        assert actions.ITYPE_TO_ACTION_MAP['is.workflow.actions.conditional'] is IfAction
+        assert actions.ITYPE_TO_ACTION_MAP['is.workflow.actions.base64encode'] is Base64EncodeAction
+
+        with pytest.raises(KeyError):
+            actions.ITYPE_TO_ACTION_MAP['unknown']
+
+    def test_actions_with_the_same_itype_have_discriminators(self):
+        itypes = {itype for _, _, _, itype in actions.ACTIONS}
+        for itype in itypes:
+            actions._index_itype(itype)  # raises RuntimeError if actions can't be distinguished
+
+    def test_actions_without_discriminator(self):
+        class FirstAction(actions.BaseAction):
+            itype = 'is.workflow.actions.test'
+
+        class SecondAction(actions.BaseAction):
+            itype = 'is.workflow.actions.test'
+
+        class_names = {'is.workflow.actions.test': ['FirstAction', 'SecondAction']}
+        classes = {'FirstAction': FirstAction, 'SecondAction': SecondAction}
+        with mock.patch.object(actions, '_ITYPE_CLASS_NAMES', class_names):
+            with mock.patch.object(actions, 'get_action_class', classes.get):
+                with pytest.raises(RuntimeError):
+                    actions._index_itype('is.workflow.actions.test')
 
-            msg = 'Seems like you have actions which are not imported in `shortcuts.actions.__init__.py`'
-            assert module_actions - lib_actions == set(), msg
+    def test_action_modules_are_imported_on_first_use(self):
+        code = (
+            'import sys\n'
+            'import shortcuts\n'
+            'assert "shortcuts.actions.photo" not in sys.modules\n'
+            'assert "shortcuts.actions.menu" not in sys.modules\n'
+            'assert "shortcuts.table" not in sys.modules\n'
+            'for name in ("toml", "plistlib", "uuid", "mmap"):\n'
+            '    assert name not in sys.modules, name\n'
+            'from shortcuts.actions import KEYWORD_TO_ACTION_MAP\n'
+            'KEYWORD_TO_ACTION_MAP["take_photo"]\n'
+            'assert "shortcuts.actions.photo" in sys.modules\n'
+            'assert "shortcuts.actions.web" not in sys.modules\n'
+        )
+        subprocess.run([sys.executable, '-c', code], check=True)
 
     def _get_actions_from_module(self, module):
         """Returns subclasses of the BaseAction from module"""
@@ -55,6 +55,8 @@ class TestGetURLAction:
             'method': 'POST',
         }
         assert action.data == exp_data
+        assert action.default_fields == {'WFHTTPBodyType': 'Json', 'ShowHeaders': True}
+        assert GetURLAction.default_fields == {}
 
     def test_dumps_to_plist(self):
         sc = Shortcut.loads(self.toml_string)
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from benchmarks import suite, synthetic
+from shortcuts import Shortcut
+from shortcuts.actions import KEYWORD_TO_ACTION_MAP
+
+
+class TestSyntheticShortcut:
+    @pytest.mark.parametrize('count', [1, 10, 57, 300])
+    def test_count(self, count):
+        assert len(synthetic.get_shortcut(count).actions) == count
+
+    def test_all_actions(self):
+        sc = synthetic.get_shortcut(200)
+
+        assert {type(a) for a in sc.actions} == set(KEYWORD_TO_ACTION_MAP.values())
+
+    @pytest.mark.parametrize('file_format', ['plist', 'toml'])
+    def test_round_trip(self, file_format):
+        sc = synthetic.get_shortcut(200)
+
+        new_sc = Shortcut.loads(sc.dumps(file_format=file_format), file_format=file_format)
+
+        assert [type(a) for a in new_sc.actions] == [type(a) for a in sc.actions]
+
+
+class TestSuite:
+    def test_find_regressions(self):
+        results = {'a[10]': 1.3, 'b[10]': 1.1, 'c[10]': 5.0}
+        baseline = {'a[10]': 1.0, 'b[10]': 1.0}
+
+        assert suite.find_regressions(results, baseline, threshold=0.25) == [('a[10]', 1.0, 1.3)]
+
+    def test_save_baseline(self, tmpdir):
+        filepath = os.path.join(str(tmpdir), 'baseline.json')
+        suite.save_baseline(filepath, {'a[10]': 1.0, 'b[10]': 2.0})
+        suite.save_baseline(filepath, {'a[10]': 3.0})
+
+        assert suite.load_baseline(filepath) == {'a[10]': 3.0, 'b[10]': 2.0}
+
+    def test_load_baseline_without_file(self, tmpdir):
+        assert suite.load_baseline(os.path.join(str(tmpdir), 'baseline.json')) == {}
+
+    @pytest.mark.parametrize('name', list(suite.BENCHMARKS))
+    def test_benchmarks_run(self, name):
+        suite.BENCHMARKS[name](10)()
@@ -0,0 +1,74 @@
+import os
+
+import mock
+
+from shortcuts.cache import CompileCache
+
+
+class TestCompileCache:
+    def _put(self, cache, tmpdir, key, content):
+        filepath = str(tmpdir.join(f'{key}.out'))
+        with open(filepath, 'wb') as f:
+            f.write(content)
+        cache.put(key, filepath)
+
+    def test_get_key(self, tmpdir):
+        cache = CompileCache(str(tmpdir))
+
+        key = cache.get_key(b'content', 'plist')
+
+        assert key == cache.get_key(b'content', 'plist')
+        assert key != cache.get_key(b'content', 'toml')
+        assert key != cache.get_key(b'another content', 'plist')
+        with mock.patch('shortcuts.VERSION', '100.0.0'):
+            assert key != cache.get_key(b'content', 'plist')
+
+    def test_put_and_get(self, tmpdir):
+        cache = CompileCache(str(tmpdir.join('cache')))
+        out_filepath = str(tmpdir.join('result'))
+        key = cache.get_key(b'content', 'plist')
+
+        assert cache.get(key, out_filepath) is False
+        assert not os.path.exists(out_filepath)
+
+        self._put(cache, tmpdir, key, b'artifact')
+
+        assert cache.get(key, out_filepath) is True
+        with open(out_filepath, 'rb') as f:
+            assert f.read() == b'artifact'
+
+    def test_evict_least_recently_used(self, tmpdir):
+        cache = CompileCache(str(tmpdir.join('cache')), max_size=10)
+        first, second, third = (cache.get_key(content, 'plist') for content in (b'first', b'second', b'third'))
+        for mtime, key in enumerate([first, second, third]):
+            self._put(cache, tmpdir, key, b'12345')
+            os.utime(cache._get_filepath(key), (mtime, mtime))
+
+        # "first" is used, so "second" is the least recently used one now
+        assert cache.get(first, str(tmpdir.join('result'))) is True
+
+        cache.evict()
+
+        assert os.path.exists(cache._get_filepath(first))
+        assert not os.path.exists(cache._get_filepath(second))
+        assert os.path.exists(cache._get_filepath(third))
+
+    def test_evict_only_artifacts(self, tmpdir):
+        cache_dir = tmpdir.mkdir('cache')
+        cache = CompileCache(str(cache_dir), max_size=0)
+        key = cache.get_key(b'content', 'plist')
+        self._put(cache, tmpdir, key, b'12345')
+        other_filepaths = [
+            cache_dir.join('notes.txt'),
+            cache_dir.join(key[:2], key),
+            cache_dir.join('artifacts', key[:2], 'notes.txt'),
+            cache_dir.join('artifacts', key[:2], 'nested', key),
+            cache_dir.join('artifacts', 'other', key),
+        ]
+        for filepath in other_filepaths:
+            filepath.write_binary(b'12345', ensure=True)
+
+        cache.evict()
+
+        assert not os.path.exists(cache._get_filepath(key))
+        assert all(filepath.exists() for filepath in other_filepaths)
@@ -0,0 +1,230 @@
+import json
+import os
+import plistlib
+import subprocess
+import sys
+
+import mock
+import pytest
+
+from shortcuts import cache, profiling
+from shortcuts.cache import CompileCache
+from shortcuts.cli import DEFAULT_CACHE_SIZE, PROFILE_FORMATS, convert_shortcut, convert_shortcuts, main
+
+
+class TestConvertShortcut:
+    def test_toml_to_shortcut(self, tmpdir):
+        out_filepath = str(tmpdir.join('base64.shortcut'))
+
+        convert_shortcut('./examples/base64.toml', out_filepath)
+
+        with open(out_filepath, 'rb') as f:
+            content = f.read()
+
+        assert content.startswith(b'bplist00')
+        actions = plistlib.loads(content)['WFWorkflowActions']
+        assert actions[0]['WFWorkflowActionIdentifier'] == 'is.workflow.actions.gettext'
+        assert len(actions) == 7
+
+    def test_shortcut_to_toml(self, tmpdir):
+        shortcut_filepath = str(tmpdir.join('base64.shortcut'))
+        toml_filepath = str(tmpdir.join('base64.toml'))
+
+        convert_shortcut('./examples/base64.toml', shortcut_filepath)
+        with open(shortcut_filepath, 'rb') as f:
+            shortcut_content = f.read()
+
+        convert_shortcut(shortcut_filepath, toml_filepath)
+
+        with open(toml_filepath, encoding='utf-8') as f:
+            assert 'type = "base64_encode"' in f.read()
+
+        # input file is not modified
+        with open(shortcut_filepath, 'rb') as f:
+            assert f.read() == shortcut_content
+
+
+class TestConvertShortcuts:
+    def test_convert_directory(self, tmpdir):
+        out_dirpath = str(tmpdir.join('out'))
+
+        results = convert_shortcuts(['./examples'], out_dirpath, jobs=2)
+
+        assert len(results) == len(os.listdir('./examples'))
+        assert all(error is None for _, _, error in results)
+        assert sorted(os.listdir(out_dirpath)) == sorted(
+            f.replace('.toml', '.shortcut') for f in os.listdir('./examples')
+        )
+
+    def test_convert_glob_to_toml(self, tmpdir):
+        results = convert_shortcuts(['./examples/base*.toml'], str(tmpdir), out_extension='toml', jobs=1)
+
+        assert results == [
+            ('./examples/base64.toml', str(tmpdir.join('base64.toml')), None),
+        ]
+
+    def test_failed_files_are_reported(self, tmpdir):
+        broken_filepath = str(tmpdir.join('broken.toml'))
+        with open(broken_filepath, 'w') as f:
+            f.write('[[action]]\ntype = "unknown_action"\n')
+
+        results = convert_shortcuts(
+            [broken_filepath, './examples/base64.toml'],
+            str(tmpdir.join('out')),
+            jobs=2,
+        )
+
+        assert results[0][0] == broken_filepath
+        assert results[0][2] == "KeyError: 'unknown_action'"
+        assert results[1][2] is None
+        assert os.path.exists(str(tmpdir.join('out', 'base64.shortcut')))
+
+    def test_files_with_the_same_output_file(self, tmpdir):
+        for dirname in ('a', 'b'):
+            tmpdir.mkdir(dirname).join('x.toml').write('[[action]]\ntype = "nothing"\n')
+
+        with pytest.raises(ValueError) as e:
+            convert_shortcuts([str(tmpdir.join('*', 'x.toml'))], str(tmpdir.join('out')), jobs=1)
+
+        assert 'have the same output file' in str(e.value)
+        assert not os.path.exists(str(tmpdir.join('out')))
+
+    def test_directories_keep_their_structure(self, tmpdir):
+        input_dir = tmpdir.mkdir('in')
+        for dirname in ('a', 'b'):
+            input_dir.mkdir(dirname).join('x.toml').write('[[action]]\ntype = "nothing"\n')
+
+        results = convert_shortcuts([str(tmpdir.join('in'))], str(tmpdir.join('out')), jobs=1)
+
+        assert sorted(out_filepath for _, out_filepath, _ in results) == [
+            str(tmpdir.join('out', 'a', 'x.shortcut')),
+            str(tmpdir.join('out', 'b', 'x.shortcut')),
+        ]
+
+
+class TestConvertShortcutWithCache:
+    def test_cache_hit(self, tmpdir):
+        cache = CompileCache(str(tmpdir.join('cache')))
+        first_filepath = str(tmpdir.join('first.shortcut'))
+        second_filepath = str(tmpdir.join('second.shortcut'))
+
+        convert_shortcut('./examples/base64.toml', first_filepath, cache=cache)
+
+        with mock.patch('shortcuts.cli.shortcuts.Shortcut.load') as load_mock:
+            convert_shortcut('./examples/base64.toml', second_filepath, cache=cache)
+
+        assert load_mock.called is False
+        with open(first_filepath, 'rb') as first, open(second_filepath, 'rb') as second:
+            assert first.read() == second.read()
+
+    def test_output_format_is_a_part_of_the_key(self, tmpdir):
+        cache = CompileCache(str(tmpdir.join('cache')))
+        shortcut_filepath = str(tmpdir.join('base64.shortcut'))
+        toml_filepath = str(tmpdir.join('base64.toml'))
+
+        convert_shortcut('./examples/base64.toml', shortcut_filepath, cache=cache)
+        convert_shortcut('./examples/base64.toml', toml_filepath, cache=cache)
+
+        with open(toml_filepath) as f:
+            assert 'type = "base64_encode"' in f.read()
+
+
+class TestMain:
+    def test_batch_mode(self, tmpdir, capsys):
+        argv = [
+            'shortcuts', './examples/base64.toml', './examples/shields.toml',
+            '-o', str(tmpdir), '-j', '1', '--no-cache',
+        ]
+        with mock.patch.object(sys, 'argv', argv):
+            main()
+
+        assert capsys.readouterr().out == 'Converted: 2, failed: 0\n'
+        assert sorted(os.listdir(str(tmpdir))) == ['base64.shortcut', 'shields.shortcut']
+
+    def test_single_file(self, tmpdir):
+        out_filepath = str(tmpdir.join('base64.shortcut'))
+        cache_dirpath = str(tmpdir.join('cache'))
+        argv = ['shortcuts', './examples/base64.toml', out_filepath, '--cache-dir', cache_dirpath]
+        with mock.patch.object(sys, 'argv', argv):
+            main()
+
+        assert os.path.exists(out_filepath)
+        assert os.listdir(cache_dirpath) == ['artifacts']
+        assert len(os.listdir(os.path.join(cache_dirpath, 'artifacts'))) == 1
+
+    def test_cache_is_enabled_by_default(self, tmpdir):
+        out_filepath = str(tmpdir.join('base64.shortcut'))
+        argv = ['shortcuts', './examples/base64.toml', out_filepath]
+        environ = {'XDG_CACHE_HOME': str(tmpdir.join('cache'))}
+        with mock.patch.object(sys, 'argv', argv), mock.patch.dict(os.environ, environ):
+            main()
+
+        assert os.path.exists(out_filepath)
+        assert os.listdir(str(tmpdir.join('cache', 'shortcuts'))) == ['artifacts']
+
+    def test_no_cache(self, tmpdir):
+        out_filepath = str(tmpdir.join('base64.shortcut'))
+        argv = ['shortcuts', './examples/base64.toml', out_filepath, '--no-cache']
+        with mock.patch.object(sys, 'argv', argv), mock.patch('shortcuts.cache.CompileCache') as cache_class:
+            main()
+
+        assert os.path.exists(out_filepath)
+        cache_class.assert_not_called()
+
+    def test_version_doesnt_import_cache(self):
+        code = (
+            'import sys\n'
+            'from shortcuts.cli import main\n'
+            'sys.argv = ["shortcuts", "--version"]\n'
+            'main()\n'
+            'for name in ("shortcuts.cache", "shortcuts.profiling", "hashlib", "plistlib"):\n'
+            '    assert name not in sys.modules, name\n'
+        )
+        subprocess.run([sys.executable, '-c', code], check=True)
+
+    def test_defaults(self):
+        # they are repeated in the command line tool, which doesn't import the cache and the profiler
+        assert DEFAULT_CACHE_SIZE * 1024 * 1024 == cache.DEFAULT_MAX_SIZE
+        assert PROFILE_FORMATS == profiling.OUTPUT_FORMATS
+
+    def test_generate(self, tmpdir, capsys):
+        argv = ['shortcuts', 'generate', str(tmpdir), '-n', '2', '--actions', '30', '--seed', '1']
+        with mock.patch.object(sys, 'argv', argv):
+            main()
+
+        assert capsys.readouterr().out == 'Generated: 2\n'
+        assert sorted(os.listdir(str(tmpdir))) == ['synthetic-0.toml', 'synthetic-1.toml']
+        with open(str(tmpdir.join('synthetic-0.toml'))) as f:
+            first_content = f.read()
+        with open(str(tmpdir.join('synthetic-1.toml'))) as f:
+            assert f.read() != first_content
+
+    def test_generate_shortcut(self, tmpdir):
+        argv = [
+            'shortcuts', 'generate', str(tmpdir), '--output-format', 'shortcut', '--actions', '30',
+            '--action-types', 'text=3,if=1',
+        ]
+        with mock.patch.object(sys, 'argv', argv):
+            main()
+
+        with open(str(tmpdir.join('synthetic-0.shortcut')), 'rb') as f:
+            assert f.read(8) == b'bplist00'
+            f.seek(0)
+            actions = plistlib.load(f)['WFWorkflowActions']
+        assert len(actions) == 30
+        assert {a['WFWorkflowActionIdentifier'] for a in actions} <= {
+            'is.workflow.actions.gettext', 'is.workflow.actions.conditional',
+        }
+
+    def test_profile(self, tmpdir, capsys):
+        out_filepath = str(tmpdir.join('base64.shortcut'))
+        profile_filepath = str(tmpdir.join('profile.json'))
+        argv = ['shortcuts', './examples/base64.toml', out_filepath, '--no-cache', '--profile', profile_filepath]
+        with mock.patch.object(sys, 'argv', argv):
+            main()
+
+        assert os.path.exists(out_filepath)
+        with open(profile_filepath) as f:
+            phases = json.load(f)['phases']
+        assert {'read', 'parse', 'create_action', 'control_flow', 'encode'} <= set(phases)
+        assert 'dump:is.workflow.actions.base64encode' in phases
@@ -0,0 +1,118 @@
+import io
+
+import pytest
+
+from shortcuts import Shortcut
+from shortcuts.actions import IfAction, MenuStartAction, RepeatStartAction, SetVariableAction
+from shortcuts.actions.base import GroupIDField
+from shortcuts.generator import ShortcutGenerator, get_default_action_types
+
+
+def _get_max_depth(actions):
+    depth = max_depth = 0
+    for action in actions:
+        if isinstance(action, (IfAction, RepeatStartAction, MenuStartAction)):
+            depth += 1
+            max_depth = max(max_depth, depth)
+        elif action.default_fields.get('WFControlFlowMode') == 2:  # end of a block
+            depth -= 1
+    assert depth == 0
+    return max_depth
+
+
+class TestShortcutGenerator:
+    @pytest.mark.parametrize('actions_count', [0, 1, 2, 3, 10, 500])
+    def test_actions_count(self, actions_count):
+        actions = list(ShortcutGenerator(actions_count=actions_count, seed=1).iter_actions())
+        assert len(actions) == actions_count
+
+    def test_seed(self):
+        def get_dump(seed):
+            f = io.StringIO()
+            ShortcutGenerator(actions_count=200, seed=seed).dump(f, file_format='toml')
+            return f.getvalue()
+
+        assert get_dump(1) == get_dump(1)
+        assert get_dump(1) != get_dump(2)
+
+    @pytest.mark.parametrize('max_depth', [0, 1, 3])
+    def test_max_depth(self, max_depth):
+        generator = ShortcutGenerator(
+            actions_count=1000,
+            max_depth=max_depth,
+            action_types={'if': 5, 'repeat_start': 5, 'start_menu': 5, 'comment': 1},
+            seed=1,
+        )
+        assert _get_max_depth(generator.iter_actions()) == max_depth
+
+    def test_action_types(self):
+        generator = ShortcutGenerator(actions_count=50, action_types={'set_variable': 1}, seed=1)
+        assert all(isinstance(action, SetVariableAction) for action in generator.iter_actions())
+
+    def test_unknown_action_types(self):
+        with pytest.raises(ValueError):
+            ShortcutGenerator(action_types={'unknown': 1})
+
+    def test_only_blocks(self):
+        generator = ShortcutGenerator(actions_count=10, max_depth=0, action_types={'if': 1}, seed=1)
+        with pytest.raises(ValueError):
+            list(generator.iter_actions())
+
+    def test_variables_density(self):
+        def get_variables_count(variables_density):
+            generator = ShortcutGenerator(
+                actions_count=100,
+                variables_density=variables_density,
+                action_types={'text': 1},
+                seed=1,
+            )
+            return sum(action.data['text'].count('{{') for action in generator.iter_actions())
+
+        assert get_variables_count(0) == 0
+        assert get_variables_count(0.1) < get_variables_count(0.9)
+
+    def test_max_dictionary_size(self):
+        generator = ShortcutGenerator(
+            actions_count=100,
+            max_dictionary_size=3,
+            action_types={'dictionary': 1},
+            seed=1,
+        )
+        sizes = {len(action.data['items']) for action in generator.iter_actions()}
+        assert sizes == {1, 2, 3}
+
+    def test_default_action_types(self):
+        action_types = get_default_action_types()
+
+        assert {'if', 'repeat_start', 'start_menu', 'text', 'dictionary'} <= set(action_types)
+        # middle and end actions of blocks are generated together with the first action
+        assert not {'else', 'endif', 'repeat_end', 'menu_item', 'end_menu'} & set(action_types)
+
+    @pytest.mark.parametrize('file_format', ['toml', 'plist', 'bplist'])
+    def test_dump_and_load(self, file_format):
+        generator = ShortcutGenerator(actions_count=300, seed=1)
+        f = io.StringIO() if file_format == 'toml' else io.BytesIO()
+
+        generator.dump(f, file_format=file_format)
+        sc = Shortcut.loads(f.getvalue(), file_format=file_format)
+
+        assert len(sc.actions) == 300
+        assert [a.keyword for a in sc.actions] == [a.keyword for a in generator.iter_actions()]
+        # group ids are set, so the shortcut can be dumped again
+        assert all(
+            action.data.get('group_id')
+            for action in sc.actions
+            if isinstance(action._fields_by_attr.get('group_id'), GroupIDField)
+        )
+        sc.dumps(file_format='plist')
+
+    def test_get_sample_data(self):
+        first = ShortcutGenerator(seed=1).get_sample_data(SetVariableAction)
+
+        assert set(first) == set(SetVariableAction._fields_by_attr)
+        assert first == ShortcutGenerator(seed=1).get_sample_data(SetVariableAction)
+        assert 'group_id' not in ShortcutGenerator(seed=1).get_sample_data(IfAction)
+
+    def test_dump_unsupported_format(self):
+        with pytest.raises(RuntimeError):
+            ShortcutGenerator(actions_count=1).dump(io.StringIO(), file_format='json')
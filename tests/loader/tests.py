@@ -0,0 +1,385 @@
+import datetime
+import glob
+import io
+import plistlib
+from xml.etree import ElementTree
+
+import mock
+import pytest
+
+from shortcuts import Shortcut
+from shortcuts.actions import (
+    Base64DecodeAction,
+    Base64EncodeAction,
+    ElseAction,
+    EndIfAction,
+    IfAction,
+    MenuEndAction,
+    MenuItemAction,
+    MenuStartAction,
+    NothingAction,
+    RepeatEndAction,
+    TextAction,
+)
+from shortcuts.loader import (
+    LazyAction,
+    PListLoader,
+    WFDeserializer,
+    WFDictionaryField,
+    WFTextTokenAttachmentField,
+    WFTokenAttachmentParameterStateField,
+    WFVariableStringField,
+    _get_plist_value,
+    deserialize,
+)
+
+
+def _variable_string(string, attachments):
+    return {
+        'Value': {
+            'attachmentsByRange': attachments,
+            'string': string,
+        },
+        'WFSerializationType': 'WFTextTokenString',
+    }
+
+
+class TestDeserializeVariableString:
+    @pytest.mark.parametrize('string, attachments, exp_string', [
+        ('Hello, ￼!', {'{7, 1}': {'Type': 'Variable', 'VariableName': 'name'}}, 'Hello, {{name}}!'),
+        ('￼', {'{0, 1}': {'Type': 'Ask'}}, '{{ask_when_run}}'),
+        ('Hello!', {}, 'Hello!'),
+        (
+            '￼ and ￼!',
+            {
+                '{6, 1}': {'Type': 'Variable', 'VariableName': 'v2'},
+                '{0, 1}': {'Type': 'Variable', 'VariableName': 'v1'},
+            },
+            '{{v1}} and {{v2}}!',
+        ),
+    ])
+    def test_deserialized_data(self, string, attachments, exp_string):
+        assert deserialize(_variable_string(string, attachments)) == exp_string
+
+    def test_deserialized_data_with_many_variables(self):
+        count = 10000
+        attachments = {f'{{{i * 2}, 1}}': {'Type': 'Variable', 'VariableName': f'v{i}'} for i in range(count)}
+        data = _variable_string('￼ ' * count, attachments)
+
+        exp_string = ''.join(f'{{{{v{i}}}}} ' for i in range(count))
+        assert deserialize(data) == exp_string
+
+    def test_unsupported_variable_type(self):
+        attachments = {'{0, 1}': {'Type': 'ActionOutput'}}
+        with pytest.raises(RuntimeError):
+            deserialize(_variable_string('￼', attachments))
+
+
+def _dictionary(items):
+    return {
+        'Value': {
+            'WFDictionaryFieldValueItems': [
+                {'WFItemType': 0, 'WFKey': _variable_string(key, {}), 'WFValue': value} for key, value in items
+            ],
+        },
+        'WFSerializationType': 'WFDictionaryFieldValue',
+    }
+
+
+class TestDeserialize:
+    @pytest.mark.parametrize('data', ['text', 1, 1.5, True, ['a', 'b']])
+    def test_not_serialized_value(self, data):
+        assert deserialize(data) == data
+
+    def test_text_token_attachment(self):
+        data = {
+            'Value': {'Type': 'Variable', 'VariableName': 'name'},
+            'WFSerializationType': 'WFTextTokenAttachment',
+        }
+        assert deserialize(data) == 'name'
+
+    def test_parameter_state(self):
+        data = {
+            'Value': {'Value': {'Type': 'Ask'}, 'WFSerializationType': 'WFTextTokenAttachment'},
+            'WFSerializationType': 'WFTokenAttachmentParameterState',
+        }
+        assert deserialize(data) == '{{ask_when_run}}'
+
+    def test_dictionary(self):
+        data = _dictionary([
+            ('k1', _variable_string('Hello, ￼!', {'{7, 1}': {'Type': 'Variable', 'VariableName': 'name'}})),
+            ('k2', _dictionary([('k3', _variable_string('v3', {}))])),
+        ])
+
+        exp_data = [
+            {'key': 'k1', 'value': 'Hello, {{name}}!'},
+            {'key': 'k2', 'value': [{'key': 'k3', 'value': 'v3'}]},
+        ]
+        assert deserialize(data) == exp_data
+
+    def test_deeply_nested_dictionary(self):
+        depth = 5000
+        data = _variable_string('value', {})
+        for _ in range(depth):
+            data = _dictionary([('key', data)])
+
+        result = deserialize(data)
+        for _ in range(depth):
+            assert result[0]['key'] == 'key'
+            result = result[0]['value']
+        assert result == 'value'
+
+    def test_unknown_serialization_type(self):
+        with pytest.raises(RuntimeError):
+            deserialize({'Value': 'value', 'WFSerializationType': 'Unknown'})
+
+
+class TestDeprecatedDeserializers:
+    @pytest.mark.parametrize('deserializer_class, data, exp_data', [
+        (
+            WFTokenAttachmentParameterStateField,
+            {
+                'Value': {'Value': {'Type': 'Ask'}, 'WFSerializationType': 'WFTextTokenAttachment'},
+                'WFSerializationType': 'WFTokenAttachmentParameterState',
+            },
+            '{{ask_when_run}}',
+        ),
+        (
+            WFTextTokenAttachmentField,
+            {'Value': {'Type': 'Variable', 'VariableName': 'name'}, 'WFSerializationType': 'WFTextTokenAttachment'},
+            'name',
+        ),
+        (WFDictionaryField, _dictionary([('k', _variable_string('v', {}))]), [{'key': 'k', 'value': 'v'}]),
+        (
+            WFVariableStringField,
+            _variable_string('Hello, ￼!', {'{7, 1}': {'Type': 'Variable', 'VariableName': 'name'}}),
+            'Hello, {{name}}!',
+        ),
+    ])
+    def test_deserialized_data(self, deserializer_class, data, exp_data):
+        with pytest.warns(DeprecationWarning):
+            deserializer = deserializer_class(data)
+
+        assert isinstance(deserializer, WFDeserializer)
+        assert deserializer.deserialized_data == exp_data
+
+
+class TestLazyAction:
+    def _get_plist(self):
+        sc = Shortcut(name='test', deterministic_group_ids=True)
+        sc.actions = [
+            TextAction(data={'text': 'Hello, {{name}}!'}),
+            IfAction(data={'condition': 'equals', 'compare_with': 'test'}),
+            ElseAction(),
+            EndIfAction(),
+            MenuStartAction(),
+            MenuItemAction(data={'title': 'item'}),
+            MenuEndAction(),
+        ]
+        return sc.dumps(file_format='plist')
+
+    def test_loads(self):
+        sc = Shortcut.loads(self._get_plist(), file_format='plist', lazy=True)
+
+        assert all(isinstance(a, LazyAction) for a in sc.actions)
+        assert sc.actions[0].itype == 'is.workflow.actions.gettext'
+        assert sc.actions[0].action_class is TextAction
+        # nothing was deserialized
+        assert all(a._action is None for a in sc.actions)
+
+    def test_data(self):
+        plist = self._get_plist()
+        sc = Shortcut.loads(plist, file_format='plist', lazy=True)
+        exp_sc = Shortcut.loads(plist, file_format='plist')
+
+        assert [a.data for a in sc.actions] == [a.data for a in exp_sc.actions]
+        assert sc.actions[0].keyword == 'text'
+        assert isinstance(sc.actions[0].action, TextAction)
+
+    def test_dumps_unchanged_actions(self):
+        plist = self._get_plist()
+        sc = Shortcut.loads(plist, file_format='plist', lazy=True)
+
+        dumped = sc.dumps(file_format='plist')
+
+        actions = plistlib.loads(plist.encode('utf-8'))['WFWorkflowActions']
+        assert plistlib.loads(dumped.encode('utf-8'))['WFWorkflowActions'] == actions
+        # only control flow actions are deserialized to find group ids
+        assert sc.actions[0]._action is None
+        control_flow = sc._get_control_flow()
+        for index, action in enumerate(sc.actions):
+            assert action.dump(extra_data=control_flow.get_action_data(index)) is action.raw
+
+    def test_dumps_changed_action(self):
+        sc = Shortcut.loads(self._get_plist(), file_format='plist', lazy=True)
+        sc.actions[0].data['text'] = 'Bye'
+
+        action = plistlib.loads(sc.dumps(file_format='plist').encode('utf-8'))['WFWorkflowActions'][0]
+        assert action == TextAction(data={'text': 'Bye'}).dump()
+
+    def test_dumps_toml(self):
+        plist = self._get_plist()
+        sc = Shortcut.loads(plist, file_format='plist', lazy=True)
+        exp_sc = Shortcut.loads(plist, file_format='plist')
+
+        assert sc.dumps(file_format='toml') == exp_sc.dumps(file_format='toml')
+
+    def test_unknown_action(self):
+        action = LazyAction({'WFWorkflowActionIdentifier': 'unknown', 'WFWorkflowActionParameters': {}})
+
+        assert action.itype == 'unknown'
+        with pytest.raises(RuntimeError):
+            action.data
+
+
+class TestActionsWithoutFields:
+    @pytest.mark.parametrize('file_format', ['toml', 'plist', 'bplist'])
+    def test_actions_are_shared(self, file_format):
+        sc = Shortcut(name='test')
+        sc.actions = [NothingAction(), TextAction(data={'text': 'text'}), NothingAction(), Base64DecodeAction()]
+
+        loaded_sc = Shortcut.loads(sc.dumps(file_format=file_format), file_format=file_format)
+
+        assert loaded_sc.actions[0] is NothingAction.create()
+        assert loaded_sc.actions[2] is NothingAction.create()
+        assert loaded_sc.actions[3] is Base64DecodeAction.create()
+        assert loaded_sc.dumps(file_format=file_format) == sc.dumps(file_format=file_format)
+
+    def test_lazy_action(self):
+        sc = Shortcut(name='test', actions=[NothingAction()])
+
+        action = Shortcut.loads(sc.dumps(), file_format='plist', lazy=True).actions[0]
+
+        assert action.action is NothingAction.create()
+        assert action.dump() is action.raw
+
+
+def _get_actions_data(actions):
+    return [(type(a), a.data) for a in actions]
+
+
+class TestIterActions:
+    @pytest.mark.parametrize('filepath', sorted(glob.glob('./examples/*.toml')))
+    def test_toml(self, filepath):
+        with open(filepath, 'rb') as f:
+            exp_actions = Shortcut.load(f, file_format='toml').actions
+
+        with open(filepath, 'rb') as f:
+            actions = list(Shortcut.iter_actions(f, file_format='toml'))
+
+        assert _get_actions_data(actions) == _get_actions_data(exp_actions)
+
+    @pytest.mark.parametrize('filepath', sorted(glob.glob('./examples/*.toml')))
+    @pytest.mark.parametrize('file_format', ['plist', 'bplist'])
+    def test_plist(self, filepath, file_format):
+        with open(filepath, 'rb') as f:
+            plist = Shortcut.load(f, file_format='toml').dumps(file_format=file_format)
+        if isinstance(plist, str):
+            plist = plist.encode('utf-8')
+        exp_actions = Shortcut.loads(plist, file_format='plist').actions
+
+        actions = list(Shortcut.iter_actions(io.BytesIO(plist), file_format='plist'))
+
+        assert _get_actions_data(actions) == _get_actions_data(exp_actions)
+
+    def test_plist_from_text_file(self):
+        plist = Shortcut(actions=[TextAction(data={'text': 'Hello'})]).dumps(file_format='plist')
+
+        actions = list(Shortcut.iter_actions(io.StringIO(plist), file_format='plist'))
+
+        assert _get_actions_data(actions) == [(TextAction, {'text': 'Hello'})]
+
+    def test_toml_is_read_incrementally(self):
+        toml = b''.join(b'[[action]]\ntype = "text"\ntext = "%d"\n\n' % i for i in range(100))
+        file_obj = io.BytesIO(toml)
+
+        action = next(Shortcut.iter_actions(file_obj, file_format='toml'))
+
+        assert action.data == {'text': '0'}
+        assert file_obj.tell() < len(toml)
+
+    def test_plist_is_read_incrementally(self):
+        sc = Shortcut(actions=[TextAction(data={'text': str(i)}) for i in range(100)])
+        plist = sc.dumps(file_format='plist').encode('utf-8')
+        file_obj = io.BytesIO(plist)
+
+        with mock.patch.object(PListLoader, 'CHUNK_SIZE', 1024):
+            action = next(Shortcut.iter_actions(file_obj, file_format='plist'))
+
+        assert action.data == {'text': '0'}
+        assert file_obj.tell() < len(plist)
+
+    def test_toml_with_inline_array_of_actions(self):
+        toml = b'name = "test"\naction = [{type = "text", text = "first"}, {type = "text", text = "second"}]\n'
+
+        actions = list(Shortcut.iter_actions(io.BytesIO(toml), file_format='toml'))
+
+        assert _get_actions_data(actions) == [(TextAction, {'text': 'first'}), (TextAction, {'text': 'second'})]
+
+    @pytest.mark.parametrize('quote', ['"""', "'''"])
+    def test_toml_with_header_in_multiline_string(self, quote):
+        toml = (
+            '[[action]]\n'
+            f'type = "text"\ntext = {quote}first\n[[action]]\n# "second" {quote}\n'
+            '[[action]]  # comment\n'
+            'type = "text"\ntext = "[[action]] \\" \\"\\"\\" "\n'
+        ).encode('utf-8')
+
+        actions = list(Shortcut.iter_actions(io.BytesIO(toml), file_format='toml'))
+
+        assert _get_actions_data(actions) == [
+            (TextAction, {'text': 'first\n[[action]]\n# "second" '}),
+            (TextAction, {'text': '[[action]] " """ '}),
+        ]
+
+    def test_toml_without_actions(self):
+        with pytest.raises(ValueError):
+            list(Shortcut.iter_actions(io.BytesIO(b'name = "test"\n'), file_format='toml'))
+
+
+class TestGetPListValue:
+    def test_types(self):
+        value = {
+            'string': 'text',
+            'empty string': '',
+            'integer': -10,
+            'real': 1.5,
+            'true': True,
+            'false': False,
+            'data': b'data',
+            'date': datetime.datetime(2018, 10, 2, 12, 30),
+            'array': ['a', {'key': 1}, []],
+            'dict': {},
+        }
+        element = ElementTree.fromstring(plistlib.dumps(value))
+
+        assert _get_plist_value(element[0]) == value
+
+
+class TestGetActionClass:
+    @pytest.mark.parametrize('itype, parameters, exp_class', [
+        ('is.workflow.actions.gettext', {}, TextAction),
+        ('is.workflow.actions.conditional', {'WFControlFlowMode': 0}, IfAction),
+        ('is.workflow.actions.conditional', {'WFControlFlowMode': 1}, ElseAction),
+        ('is.workflow.actions.conditional', {'WFControlFlowMode': 2}, EndIfAction),
+        ('is.workflow.actions.choosefrommenu', {'WFControlFlowMode': 1}, MenuItemAction),
+        ('is.workflow.actions.repeat.count', {'WFControlFlowMode': 2}, RepeatEndAction),
+        ('is.workflow.actions.base64encode', {'WFEncodeMode': 'Decode'}, Base64DecodeAction),
+        # Shortcuts app encodes if the mode is missing
+        ('is.workflow.actions.base64encode', {}, Base64EncodeAction),
+        ('is.workflow.actions.unknown', {}, None),
+    ])
+    def test_get_action_class(self, itype, parameters, exp_class):
+        action_dict = {'WFWorkflowActionIdentifier': itype, 'WFWorkflowActionParameters': parameters}
+        assert PListLoader._get_action_class(action_dict) is exp_class
+
+    @pytest.mark.parametrize('itype, parameters', [
+        ('is.workflow.actions.conditional', {}),
+        ('is.workflow.actions.conditional', {'WFControlFlowMode': 3}),
+        ('is.workflow.actions.base64encode', {'WFEncodeMode': 'Unknown'}),
+        ('is.workflow.actions.base64encode', {'WFEncodeMode': []}),
+    ])
+    def test_unknown_discriminator_value(self, itype, parameters):
+        action_dict = {'WFWorkflowActionIdentifier': itype, 'WFWorkflowActionParameters': parameters}
+        with pytest.raises(RuntimeError):
+            PListLoader._get_action_class(action_dict)
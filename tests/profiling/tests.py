@@ -0,0 +1,145 @@
+import io
+import json
+import pstats
+
+import pytest
+
+from shortcuts import Shortcut
+from shortcuts.actions import NothingAction, TextAction
+from shortcuts.actions.base import BaseAction
+from shortcuts.loader import PListLoader, TomlLoader, deserialize
+from shortcuts.profiling import COUNTERS, PHASES, Profiler
+
+
+TOML = '''
+[[action]]
+type = "text"
+text = "hello {{name}}"
+
+[[action]]
+type = "if"
+condition = "Equals"
+compare_with = "test"
+
+[[action]]
+type = "endif"
+'''
+
+
+def _get_originals():
+    return [obj.__dict__[name] for obj, name, _ in PHASES + COUNTERS]
+
+
+class TestProfiler:
+    def test_phases(self):
+        plist = Shortcut.loads(TOML).dumps(file_format='plist')
+
+        with Profiler() as profiler:
+            sc = Shortcut.load(io.BytesIO(plist.encode('utf-8')), file_format='plist')
+            sc.dumps(file_format='toml')
+
+        stats = profiler.get_stats()
+        assert set(stats) == {
+            'read',
+            'parse',
+            'create_action',
+            'resolve_action_class',
+            'deserialize',
+            'encode',
+            'dump:is.workflow.actions.gettext',
+            'dump:is.workflow.actions.conditional',
+        }
+        assert stats['create_action']['calls'] == 3
+        assert stats['dump:is.workflow.actions.conditional']['calls'] == 2
+        assert stats['encode']['calls'] == 1
+        assert all(s['seconds'] >= 0 for s in stats.values())
+        # nested phases are not counted twice
+        assert sum(s['seconds'] for s in stats.values()) <= profiler.seconds
+
+    def test_dump_to_plist(self):
+        sc = Shortcut.loads(TOML)
+
+        with Profiler() as profiler:
+            sc.dumps(file_format='plist')
+
+        stats = profiler.get_stats()
+        assert stats['control_flow']['calls'] == 1
+        assert stats['dump:is.workflow.actions.gettext']['calls'] == 1
+        assert stats['encode']['calls'] == 1
+
+    @pytest.mark.parametrize('file_format', ['plist', 'bplist'])
+    def test_dump_actions_without_fields(self, file_format):
+        sc = Shortcut(actions=[NothingAction(), TextAction(data={'text': 'text'}), NothingAction(), NothingAction()])
+
+        with Profiler() as profiler:
+            sc.dumps(file_format=file_format)
+
+        # the dump of the class is reused, but every action is counted
+        stats = profiler.get_stats()
+        assert stats['dump:is.workflow.actions.nothing']['calls'] == 3
+        assert stats['dump:is.workflow.actions.gettext']['calls'] == 1
+
+    def test_hooks_are_removed(self):
+        originals = _get_originals()
+
+        with Profiler():
+            assert _get_originals() != originals
+
+        assert _get_originals() == originals
+        assert TomlLoader.__dict__['loads'] is originals[2]
+
+    def test_hooks_are_removed_after_exception(self):
+        originals = _get_originals()
+
+        with pytest.raises(ValueError):
+            with Profiler():
+                TomlLoader.loads('name = "test"')
+
+        assert _get_originals() == originals
+
+    def test_disabled(self):
+        sc = Shortcut.loads(TOML)
+
+        with Profiler() as profiler:
+            pass
+        sc.dumps()
+        PListLoader.loads(sc.dumps())
+
+        assert profiler.get_stats() == {}
+        assert BaseAction.dump.__qualname__ == 'BaseAction.dump'
+        assert deserialize.__module__ == 'shortcuts.loader'
+
+    def test_only_one_profiler(self):
+        with Profiler():
+            with pytest.raises(RuntimeError):
+                with Profiler():
+                    pass
+
+    def test_save_json(self, tmpdir):
+        filepath = str(tmpdir.join('profile.json'))
+        with Profiler() as profiler:
+            TextAction(data={'text': 'hello'}).dump()
+
+        profiler.save(filepath)
+
+        with open(filepath) as f:
+            data = json.load(f)
+        assert data['seconds'] > 0
+        assert data['phases']['dump:is.workflow.actions.gettext']['calls'] == 1
+        assert set(data['phases']['dump:is.workflow.actions.gettext']) == {'calls', 'seconds', 'net_allocated_blocks'}
+
+    def test_save_cprofile(self, tmpdir):
+        filepath = str(tmpdir.join('profile.prof'))
+        with Profiler(cprofile=True) as profiler:
+            Shortcut.loads(TOML)
+
+        profiler.save(filepath, output_format='cprofile')
+
+        assert pstats.Stats(filepath).total_calls > 0
+
+    def test_save_cprofile_without_cprofile(self, tmpdir):
+        with Profiler() as profiler:
+            pass
+
+        with pytest.raises(RuntimeError):
+            profiler.save(str(tmpdir.join('profile.prof')), output_format='cprofile')
@@ -1,10 +1,23 @@
+import io
+import plistlib
+
+import mock
+import pytest
+
 from shortcuts import Shortcut
+from shortcuts.dump import PListDumper, TomlDumper
 from shortcuts.actions import (
+    Base64DecodeAction,
+    NothingAction,
     TextAction,
     SetVariableAction,
     IfAction,
     ElseAction,
     EndIfAction,
+    MenuStartAction,
+    MenuItemAction,
+    MenuEndAction,
+    ShowResultAction,
 )
 
 
@@ -18,13 +31,108 @@ class TestShortcutDumps:
             TextAction(data={'text': 'another text: {{var1}}'}),
         ]
 
-        for action in sc.actions:
-            action.id = 'id'
-
         exp_dump = '<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">\n<plist version="1.0">\n<dict>\n\t<key>WFWorkflowActions</key>\n\t<array>\n\t\t<dict>\n\t\t\t<key>WFWorkflowActionIdentifier</key>\n\t\t\t<string>is.workflow.actions.setvariable</string>\n\t\t\t<key>WFWorkflowActionParameters</key>\n\t\t\t<dict>\n\t\t\t\t<key>WFVariableName</key>\n\t\t\t\t<string>var2</string>\n\t\t\t</dict>\n\t\t</dict>\n\t\t<dict>\n\t\t\t<key>WFWorkflowActionIdentifier</key>\n\t\t\t<string>is.workflow.actions.gettext</string>\n\t\t\t<key>WFWorkflowActionParameters</key>\n\t\t\t<dict>\n\t\t\t\t<key>WFTextActionText</key>\n\t\t\t\t<dict>\n\t\t\t\t\t<key>Value</key>\n\t\t\t\t\t<dict>\n\t\t\t\t\t\t<key>attachmentsByRange</key>\n\t\t\t\t\t\t<dict>\n\t\t\t\t\t\t\t<key>{13, 1}</key>\n\t\t\t\t\t\t\t<dict>\n\t\t\t\t\t\t\t\t<key>Type</key>\n\t\t\t\t\t\t\t\t<string>Variable</string>\n\t\t\t\t\t\t\t\t<key>VariableName</key>\n\t\t\t\t\t\t\t\t<string>var1</string>\n\t\t\t\t\t\t\t</dict>\n\t\t\t\t\t\t</dict>\n\t\t\t\t\t\t<key>string</key>\n\t\t\t\t\t\t<string>simple text: ￼</string>\n\t\t\t\t\t</dict>\n\t\t\t\t\t<key>WFSerializationType</key>\n\t\t\t\t\t<string>WFTextTokenString</string>\n\t\t\t\t</dict>\n\t\t\t</dict>\n\t\t</dict>\n\t\t<dict>\n\t\t\t<key>WFWorkflowActionIdentifier</key>\n\t\t\t<string>is.workflow.actions.gettext</string>\n\t\t\t<key>WFWorkflowActionParameters</key>\n\t\t\t<dict>\n\t\t\t\t<key>WFTextActionText</key>\n\t\t\t\t<dict>\n\t\t\t\t\t<key>Value</key>\n\t\t\t\t\t<dict>\n\t\t\t\t\t\t<key>attachmentsByRange</key>\n\t\t\t\t\t\t<dict>\n\t\t\t\t\t\t\t<key>{14, 1}</key>\n\t\t\t\t\t\t\t<dict>\n\t\t\t\t\t\t\t\t<key>Type</key>\n\t\t\t\t\t\t\t\t<string>Variable</string>\n\t\t\t\t\t\t\t\t<key>VariableName</key>\n\t\t\t\t\t\t\t\t<string>var1</string>\n\t\t\t\t\t\t\t</dict>\n\t\t\t\t\t\t</dict>\n\t\t\t\t\t\t<key>string</key>\n\t\t\t\t\t\t<string>another text: ￼</string>\n\t\t\t\t\t</dict>\n\t\t\t\t\t<key>WFSerializationType</key>\n\t\t\t\t\t<string>WFTextTokenString</string>\n\t\t\t\t</dict>\n\t\t\t</dict>\n\t\t</dict>\n\t</array>\n\t<key>WFWorkflowClientRelease</key>\n\t<string>2.0</string>\n\t<key>WFWorkflowClientVersion</key>\n\t<string>700</string>\n\t<key>WFWorkflowIcon</key>\n\t<dict>\n\t\t<key>WFWorkflowIconGlyphNumber</key>\n\t\t<integer>59511</integer>\n\t\t<key>WFWorkflowIconImageData</key>\n\t\t<data>\n\t\t</data>\n\t\t<key>WFWorkflowIconStartColor</key>\n\t\t<integer>431817727</integer>\n\t</dict>\n\t<key>WFWorkflowImportQuestions</key>\n\t<array/>\n\t<key>WFWorkflowInputContentItemClasses</key>\n\t<array>\n\t\t<string>WFAppStoreAppContentItem</string>\n\t\t<string>WFArticleContentItem</string>\n\t\t<string>WFContactContentItem</string>\n\t\t<string>WFDateContentItem</string>\n\t\t<string>WFEmailAddressContentItem</string>\n\t\t<string>WFGenericFileContentItem</string>\n\t\t<string>WFImageContentItem</string>\n\t\t<string>WFiTunesProductContentItem</string>\n\t\t<string>WFLocationContentItem</string>\n\t\t<string>WFDCMapsLinkContentItem</string>\n\t\t<string>WFAVAssetContentItem</string>\n\t\t<string>WFPDFContentItem</string>\n\t\t<string>WFPhoneNumberContentItem</string>\n\t\t<string>WFRichTextContentItem</string>\n\t\t<string>WFSafariWebPageContentItem</string>\n\t\t<string>WFStringContentItem</string>\n\t\t<string>WFURLContentItem</string>\n\t</array>\n\t<key>WFWorkflowTypes</key>\n\t<array>\n\t\t<string>NCWidget</string>\n\t\t<string>WatchKit</string>\n\t</array>\n</dict>\n</plist>\n'
         assert sc.dumps() == exp_dump
 
 
+class TestShortcutDumpToBinaryFile:
+    def _get_plistlib_dump(self, sc):
+        data = {
+            'WFWorkflowActions': sc._get_actions(),
+            'WFWorkflowImportQuestions': sc._get_import_questions(),
+            'WFWorkflowClientRelease': sc.client_release,
+            'WFWorkflowClientVersion': sc.client_version,
+            'WFWorkflowTypes': ['NCWidget', 'WatchKit'],
+            'WFWorkflowIcon': sc._get_icon(),
+            'WFWorkflowInputContentItemClasses': sc._get_input_content_item_classes(),
+        }
+        return plistlib.dumps(data)
+
+    def test_dump(self):
+        sc = Shortcut(name='test')
+        sc.actions = [
+            SetVariableAction(data={'name': 'var2'}),
+            IfAction(data={'condition': 'equals', 'compare_with': 'test', 'group_id': 'id'}),
+            TextAction(data={'text': 'simple <text> & {{var1}}'}),
+            EndIfAction(data={'group_id': 'id'}),
+        ]
+
+        file_obj = io.BytesIO()
+        sc.dump(file_obj, file_format='plist')
+
+        assert file_obj.getvalue() == self._get_plistlib_dump(sc)
+        assert sc.dumps(file_format='plist') == file_obj.getvalue().decode('utf-8')
+
+    def test_dump_actions_without_fields(self):
+        changed_action = NothingAction()
+        changed_action._set_default_field('WFNew', 'value')
+        sc = Shortcut(name='test')
+        sc.actions = [
+            NothingAction.create(),
+            TextAction(data={'text': 'text'}),
+            NothingAction.create(),
+            Base64DecodeAction(),
+            changed_action,
+        ]
+
+        file_obj = io.BytesIO()
+        sc.dump(file_obj, file_format='plist')
+
+        assert file_obj.getvalue() == self._get_plistlib_dump(sc)
+
+    @pytest.mark.parametrize('actions_count', [0, 2])
+    def test_dump_without_plistlib_writer(self, actions_count):
+        sc = Shortcut(name='test')
+        sc.actions = [TextAction(data={'text': 'text'}), NothingAction()][:actions_count]
+
+        file_obj = io.BytesIO()
+        with mock.patch('shortcuts.dump._get_plist_writer_class', return_value=None):
+            sc.dump(file_obj, file_format='plist')
+
+        assert file_obj.getvalue() == self._get_plistlib_dump(sc)
+
+    def test_dump_empty_shortcut(self):
+        sc = Shortcut(name='test')
+
+        file_obj = io.BytesIO()
+        sc.dump(file_obj, file_format='plist')
+
+        assert file_obj.getvalue() == self._get_plistlib_dump(sc)
+
+    def test_dump_to_text_file(self):
+        sc = Shortcut(name='test')
+        sc.actions = [SetVariableAction(data={'name': 'var'})]
+
+        file_obj = io.StringIO()
+        sc.dump(file_obj, file_format='plist')
+
+        assert file_obj.getvalue() == sc.dumps(file_format='plist')
+
+
+class TestShortcutDumpToBinaryPList:
+    def test_dumps(self):
+        sc = Shortcut(name='test')
+        sc.actions = [
+            SetVariableAction(data={'name': 'var2'}),
+            TextAction(data={'text': 'simple text: {{var1}}'}),
+            TextAction(data={'text': 'another text: {{var1}}'}),
+        ]
+
+        dump = sc.dumps(file_format='bplist')
+
+        assert dump.startswith(b'bplist00')
+        assert plistlib.loads(dump) == plistlib.loads(sc.dumps(file_format='plist').encode('utf-8'))
+
+    def test_dump(self):
+        sc = Shortcut(name='test')
+        sc.actions = [SetVariableAction(data={'name': 'var'})]
+
+        file_obj = io.BytesIO()
+        sc.dump(file_obj, file_format='bplist')
+
+        assert file_obj.getvalue() == sc.dumps(file_format='bplist')
+
+
 class TestShortcutLoads:
     def test_loads(self):
         toml_string = '''
@@ -57,6 +165,45 @@ class TestShortcutLoads:
         assert sc.actions[2].itype == 'is.workflow.actions.showresult'
 
 
+class TestShortcutLoadsFromPList:
+    def _get_shortcut(self):
+        sc = Shortcut(name='test')
+        sc.actions = [
+            SetVariableAction(data={'name': 'var'}),
+            TextAction(data={'text': 'simple text'}),
+        ]
+        return sc
+
+    def _assert_actions(self, sc):
+        assert [type(a) for a in sc.actions] == [SetVariableAction, TextAction]
+        assert sc.actions[0].data == {'name': 'var'}
+        assert sc.actions[1].data == {'text': 'simple text'}
+
+    def test_loads_binary_plist(self):
+        dump = self._get_shortcut().dumps(file_format='bplist')
+
+        self._assert_actions(Shortcut.loads(dump, file_format='plist'))
+
+    def test_loads_xml_plist(self):
+        dump = self._get_shortcut().dumps(file_format='plist')
+
+        self._assert_actions(Shortcut.loads(dump, file_format='plist'))
+        self._assert_actions(Shortcut.loads(dump.encode('utf-8'), file_format='plist'))
+
+    def test_load_from_binary_file(self, tmpdir):
+        filepath = str(tmpdir.join('test.shortcut'))
+        with open(filepath, 'wb') as f:
+            self._get_shortcut().dump(f, file_format='bplist')
+
+        with open(filepath, 'rb') as f:
+            self._assert_actions(Shortcut.load(f, file_format='plist'))
+
+    def test_load_from_bytes_io(self):
+        file_obj = io.BytesIO(self._get_shortcut().dumps(file_format='bplist'))
+
+        self._assert_actions(Shortcut.load(file_obj, file_format='plist'))
+
+
 class TestShortcutLoadsAndDumps:
     def test_loads_and_dumps_with_not_all_params(self):
         question = 'What is your name?'
@@ -84,17 +231,31 @@ class TestShortcutLoadsAndDumps:
 
         assert dump == exp_dump
 
+    @pytest.mark.parametrize('text', [
+        'Hello {{a}}, {{b}} and {{c}}!',
+        '{{a}}{{b}}{{c}}',
+        '{{a}} and {{ask_when_run}} at the end: {{b}}',
+    ])
+    @pytest.mark.parametrize('file_format', ['plist', 'bplist'])
+    def test_text_with_several_variables(self, text, file_format):
+        toml_string = Shortcut(actions=[ShowResultAction(data={'text': text})]).dumps('toml')
+
+        plist = Shortcut.loads(toml_string).dumps(file_format=file_format)
+        sc = Shortcut.loads(Shortcut.loads(plist, file_format=file_format).dumps('toml'))
+
+        assert [a.data for a in sc.actions] == [{'text': text}]
+
 
 class TestShortcut:
-    def test_set_group_ids_for_empty_shortcut(self):
+    def test_control_flow_for_empty_shortcut(self):
         sc = Shortcut()
 
-        assert len(sc.actions) == 0
-        sc._set_group_ids()
-        assert len(sc.actions) == 0
+        control_flow = sc._get_control_flow()
 
-    def test_set_group_ids(self):
-        # test that _set_group_ids sets group_ids correctly
+        assert control_flow.group_ids == {}
+        assert control_flow.blocks == []
+
+    def test_control_flow_group_ids(self):
         sc = Shortcut()
         sc.actions = [
             IfAction(data={'condition': 'equals', 'compare_with': 'test'}),
@@ -107,19 +268,165 @@ class TestShortcut:
             EndIfAction(data={}),
         ]
 
-        # all actions are without group_id info
-        assert any([a.data.get('group_id') for a in sc.actions]) is False
-
-        sc._set_group_ids()
+        group_ids = sc._get_control_flow().group_ids
 
-        # now all actions are with group_id info
-        assert all([a.data.get('group_id') for a in sc.actions]) is True
+        # all actions have group ids
+        assert sorted(group_ids) == [0, 1, 2, 3, 4]
 
         # first cycle check
-        assert sc.actions[0].data['group_id'] == sc.actions[3].data['group_id'] == sc.actions[4].data['group_id']
+        assert group_ids[0] == group_ids[3] == group_ids[4]
 
         # second cycle
-        assert sc.actions[1].data['group_id'] == sc.actions[2].data['group_id']
+        assert group_ids[1] == group_ids[2]
 
         # ids are different
-        assert sc.actions[0].data['group_id'] != sc.actions[1].data['group_id']
+        assert group_ids[0] != group_ids[1]
+
+        # actions are not modified
+        assert any([a.data.get('group_id') for a in sc.actions]) is False
+
+    def test_control_flow_blocks(self):
+        sc = Shortcut()
+        sc.actions = [
+            MenuStartAction(),
+            MenuItemAction(data={'title': 'first'}),
+            IfAction(data={'condition': 'equals', 'compare_with': 'test'}),
+            ElseAction(),
+            EndIfAction(),
+            MenuItemAction(data={'title': 'second'}),
+            MenuEndAction(),
+            TextAction(data={'text': 'text'}),
+        ]
+
+        control_flow = sc._get_control_flow()
+
+        assert len(control_flow.blocks) == 1
+        menu_block = control_flow.blocks[0]
+        assert (menu_block.start, menu_block.branches, menu_block.end) == (0, [1, 5], 6)
+
+        assert len(menu_block.children) == 1
+        if_block = menu_block.children[0]
+        assert (if_block.start, if_block.branches, if_block.end) == (2, [3], 4)
+
+        assert control_flow.menu_items == {0: ['first', 'second']}
+        assert control_flow.get_action_data(0) == {'group_id': menu_block.group_id, 'menu_items': ['first', 'second']}
+        assert control_flow.get_action_data(3) == {'group_id': if_block.group_id}
+        assert control_flow.get_action_data(7) is None
+
+    def test_control_flow_is_cached(self):
+        sc = Shortcut()
+        sc.actions = [
+            MenuStartAction(),
+            MenuItemAction(data={'title': 'first'}),
+            MenuEndAction(),
+        ]
+
+        control_flow = sc._get_control_flow()
+        sc.dumps(file_format='plist')
+        sc.dumps(file_format='bplist')
+        assert sc._get_control_flow() is control_flow
+
+        # new title of the menu item
+        sc.actions[1].data['title'] = 'new title'
+        assert sc._get_control_flow() is not control_flow
+        assert sc._get_control_flow().menu_items == {0: ['new title']}
+
+        # new action
+        control_flow = sc._get_control_flow()
+        sc.actions.insert(0, IfAction(data={'condition': 'equals', 'compare_with': 'test'}))
+        sc.actions.append(EndIfAction())
+        assert sc._get_control_flow() is not control_flow
+        assert sorted(sc._get_control_flow().group_ids) == [0, 1, 2, 3, 4]
+
+        # another action in place of a garbage collected one
+        control_flow = sc._get_control_flow()
+        sc.actions[-1] = EndIfAction()
+        assert sc._get_control_flow() is not control_flow
+
+    def test_control_flow_depends_on_group_ids_options(self):
+        sc = Shortcut(name='test', deterministic_group_ids=True)
+        sc.actions = [IfAction(data={'condition': 'equals', 'compare_with': 'test'}), EndIfAction()]
+        group_id = sc._get_control_flow().group_ids[0]
+
+        sc.name = 'another name'
+        assert sc._get_control_flow().group_ids[0] != group_id
+
+        sc.name = 'test'
+        assert sc._get_control_flow().group_ids[0] == group_id
+
+        sc.deterministic_group_ids = False
+        assert sc._get_control_flow().group_ids[0] != group_id
+
+    def test_incomplete_cycle(self):
+        sc = Shortcut()
+        sc.actions = [EndIfAction()]
+
+        with pytest.raises(RuntimeError):
+            sc.dumps()
+
+    def test_deterministic_group_ids(self):
+        def _get_shortcut():
+            sc = Shortcut(name='test', deterministic_group_ids=True)
+            sc.actions = [
+                IfAction(data={'condition': 'equals', 'compare_with': 'test'}),
+                IfAction(data={'condition': 'equals', 'compare_with': 'test', 'group_id': 'defined'}),
+                EndIfAction(data={}),
+                EndIfAction(data={}),
+                IfAction(data={'condition': 'equals', 'compare_with': 'test'}),
+                EndIfAction(data={}),
+            ]
+            return sc
+
+        sc = _get_shortcut()
+        with mock.patch('uuid.uuid4') as uuid4_mock:
+            dump = sc.dumps()
+
+        assert uuid4_mock.called is False
+        assert dump == _get_shortcut().dumps()
+
+        group_ids = sc._get_control_flow().group_ids
+        assert group_ids[0] == group_ids[3]
+        assert group_ids[1] == group_ids[2] == 'defined'
+        assert group_ids[4] == group_ids[5]
+        assert group_ids[0] != group_ids[4]
+
+        # group ids depend on the name of the shortcut
+        another_sc = _get_shortcut()
+        another_sc.name = 'another name'
+        assert another_sc._get_control_flow().group_ids[0] != group_ids[0]
+
+
+class TestDumpActions:
+    def _get_shortcut(self):
+        sc = Shortcut(name='test')
+        sc.actions = [
+            SetVariableAction(data={'name': 'var'}),
+            NothingAction.create(),
+            TextAction(data={'text': 'text: {{var}}'}),
+            NothingAction.create(),
+            Base64DecodeAction(),
+        ]
+        return sc
+
+    def test_toml(self):
+        sc = self._get_shortcut()
+        f = io.StringIO()
+
+        TomlDumper(Shortcut()).dump_actions(f, iter(sc.actions))
+
+        assert f.getvalue() == sc.dumps(file_format='toml')
+
+    def test_plist(self):
+        sc = self._get_shortcut()
+        f = io.BytesIO()
+
+        PListDumper(Shortcut(name='test')).dump_actions(f, (action.dump() for action in sc.actions))
+
+        assert f.getvalue().decode('utf-8') == sc.dumps()
+
+    def test_plist_without_actions(self):
+        f = io.BytesIO()
+
+        PListDumper(Shortcut()).dump_actions(f, iter([]))
+
+        assert plistlib.loads(f.getvalue())['WFWorkflowActions'] == []
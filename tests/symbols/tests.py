@@ -0,0 +1,77 @@
+import pytest
+
+from shortcuts import Shortcut
+from shortcuts.actions import IfAction, NothingAction, TextAction
+from shortcuts.symbols import SYMBOLS, add_symbols, intern_symbol
+
+
+def _copy(string):
+    """Returns an equal string which is a different object"""
+    return ''.join(list(string))
+
+
+class TestSymbols:
+    def test_intern_symbol(self):
+        add_symbols(['WFTestSymbol'])
+        string = _copy('WFTestSymbol')
+
+        assert string is not SYMBOLS['WFTestSymbol']
+        assert intern_symbol(string) is SYMBOLS['WFTestSymbol']
+
+    def test_unknown_string(self):
+        string = _copy('some text')
+
+        assert intern_symbol(string) is string
+
+    def test_table_is_seeded(self):
+        assert 'is.workflow.actions.gettext' in SYMBOLS  # itype from the manifest
+        assert 'text' in SYMBOLS  # keyword
+        assert 'WFTextTokenString' in SYMBOLS  # serialization type
+        # names of fields and default fields are added when classes are created
+        assert SYMBOLS['WFCondition'] is IfAction._fields_by_attr['condition'].name
+        assert 'WFControlFlowMode' in SYMBOLS
+        assert SYMBOLS['compare_with'] is IfAction._fields_by_attr['compare_with']._attr
+
+
+def _get_shortcut():
+    sc = Shortcut(name='test')
+    sc.actions = [
+        TextAction(data={'text': 'Hello, {{name}}!'}),
+        TextAction(data={'text': 'text'}),
+        IfAction(data={'condition': 'equals', 'compare_with': 'text'}),
+    ]
+    return sc
+
+
+class TestLoadersShareSymbols:
+    @pytest.mark.parametrize('file_format', ['plist', 'shortcut'])
+    def test_plist(self, file_format):
+        dump = _get_shortcut().dumps(file_format=file_format)
+
+        actions = [a.raw for a in Shortcut.loads(dump, file_format=file_format, lazy=True).actions]
+
+        for action in actions:
+            (key, ) = [k for k in action if k == 'WFWorkflowActionIdentifier']
+            assert key is SYMBOLS['WFWorkflowActionIdentifier']
+            assert action['WFWorkflowActionIdentifier'] is SYMBOLS[action['WFWorkflowActionIdentifier']]
+
+        (key, ) = actions[0]['WFWorkflowActionParameters']
+        assert key is SYMBOLS['WFTextActionText']
+        # texts are not symbols
+        assert 'Hello, \ufffc!' not in SYMBOLS
+
+    def test_shared_dictionaries_of_binary_plist(self):
+        sc = Shortcut(name='test')
+        sc.actions = [NothingAction(), NothingAction()]
+
+        first, second = Shortcut.loads(sc.dumps(file_format='bplist'), file_format='bplist', lazy=True).actions
+
+        assert first.raw is second.raw
+        assert first.raw['WFWorkflowActionIdentifier'] is SYMBOLS['is.workflow.actions.nothing']
+
+    def test_toml(self):
+        sc = Shortcut.loads(_get_shortcut().dumps(file_format='toml'), file_format='toml')
+
+        (key, ) = sc.actions[0].data
+        assert key is SYMBOLS['text']
+        assert sc.actions[2].data == {'condition': 'equals', 'compare_with': 'text'}
@@ -0,0 +1,161 @@
+import io
+
+import pytest
+
+from shortcuts import Shortcut
+from shortcuts.actions import (
+    DictionaryAction,
+    ElseAction,
+    EndIfAction,
+    IfAction,
+    NothingAction,
+    SetVariableAction,
+    TextAction,
+)
+from shortcuts.generator import ShortcutGenerator
+from shortcuts.table import ActionTable
+
+
+def _get_actions():
+    return [
+        SetVariableAction(data={'name': 'var'}),
+        IfAction(data={'condition': 'equals', 'compare_with': 'text'}),
+        TextAction(data={'text': 'text'}),
+        ElseAction(),
+        NothingAction(),
+        EndIfAction(),
+        DictionaryAction(data={'items': [{'key': 'k', 'value': 'v'}]}),
+        TextAction(data={'text': 'text'}),
+    ]
+
+
+def _get_actions_data(actions):
+    return [(type(a), a.data) for a in actions]
+
+
+class TestActionTable:
+    def test_actions(self):
+        actions = _get_actions()
+        table = ActionTable(actions)
+
+        assert len(table) == len(actions)
+        assert _get_actions_data(table) == _get_actions_data(actions)
+        assert _get_actions_data([table[-1]]) == _get_actions_data(actions[-1:])
+        assert table[4] is NothingAction.create()
+        assert [table.get_class(i) for i in range(len(table))] == [type(a) for a in actions]
+        assert list(table.iter_classes()) == [type(a) for a in actions]
+
+        with pytest.raises(IndexError):
+            table[len(actions)]
+
+    def test_append(self):
+        table = ActionTable()
+        table.append(TextAction(data={'text': 'text'}))
+        table.extend([NothingAction(), TextAction(data={'text': 'text'})])
+
+        assert [a.data for a in table] == [{'text': 'text'}, {}, {'text': 'text'}]
+
+    def test_values_are_stored_once(self):
+        table = ActionTable([TextAction(data={'text': 'text'}) for _ in range(10)])
+        table.append(SetVariableAction(data={'name': 'text'}))
+
+        assert table._pool == ['text']
+        assert table._key_names == ['text', 'name']
+
+    def test_equal_values_of_different_types(self):
+        table = ActionTable([TextAction(data={'text': 1}), TextAction(data={'text': True})])
+
+        assert [type(a.data['text']) for a in table] == [int, bool]
+
+    def test_changes_of_actions_are_not_saved(self):
+        table = ActionTable([DictionaryAction(data={'items': [{'key': 'k', 'value': 'v'}]})])
+
+        table[0].data['items'][0]['value'] = 'changed'
+
+        assert table[0].data == {'items': [{'key': 'k', 'value': 'v'}]}
+
+    def test_lazy_actions(self):
+        sc = Shortcut(name='test', actions=_get_actions())
+        lazy_sc = Shortcut.loads(sc.dumps(), file_format='plist', lazy=True)
+
+        table = ActionTable(lazy_sc.actions)
+
+        exp_actions = Shortcut.loads(sc.dumps(), file_format='plist').actions
+        assert _get_actions_data(table) == _get_actions_data(exp_actions)
+
+    def test_slice(self):
+        actions = _get_actions()
+
+        table = ActionTable(actions)[2:5]
+
+        assert isinstance(table, ActionTable)
+        assert _get_actions_data(table) == _get_actions_data(actions[2:5])
+
+    def test_count_itype(self):
+        table = ActionTable(_get_actions())
+
+        assert table.count_itype('is.workflow.actions.gettext') == 2
+        # if, else and end if have the same itype
+        assert table.count_itype('is.workflow.actions.conditional') == 3
+        assert table.count_itype('unknown') == 0
+        assert table.itype_counts() == {
+            'is.workflow.actions.setvariable': 1,
+            'is.workflow.actions.conditional': 3,
+            'is.workflow.actions.gettext': 2,
+            'is.workflow.actions.nothing': 1,
+            'is.workflow.actions.dictionary': 1,
+        }
+
+    def test_filter_itype(self):
+        actions = _get_actions()
+        table = ActionTable(actions)
+
+        filtered_table = table.filter_itype('is.workflow.actions.gettext')
+
+        assert _get_actions_data(filtered_table) == _get_actions_data([actions[2], actions[7]])
+        # registries are shared, both tables can grow
+        filtered_table.append(SetVariableAction(data={'name': 'new'}))
+        table.append(TextAction(data={'text': 'new text'}))
+        assert filtered_table[-1].data == {'name': 'new'}
+        assert table[-1].data == {'text': 'new text'}
+
+
+class TestShortcutWithActionTable:
+    @pytest.mark.parametrize('file_format', ['plist', 'bplist', 'toml'])
+    def test_dumps(self, file_format):
+        sc = Shortcut(name='test', actions=_get_actions(), deterministic_group_ids=True)
+        table_sc = Shortcut(name='test', actions=ActionTable(_get_actions()), deterministic_group_ids=True)
+
+        assert table_sc.dumps(file_format=file_format) == sc.dumps(file_format=file_format)
+
+    def test_empty_table(self):
+        table = ActionTable()
+        sc = Shortcut(name='test', actions=table)
+
+        assert sc.actions is table
+
+    def test_control_flow_is_cached(self):
+        table = ActionTable(_get_actions())
+        sc = Shortcut(name='test', actions=table)
+
+        control_flow = sc._get_control_flow()
+        assert sc._get_control_flow() is control_flow
+
+        table.append(IfAction(data={'condition': 'equals', 'compare_with': 'text'}))
+        table.append(EndIfAction())
+        assert sc._get_control_flow() is not control_flow
+        assert len(sc._get_control_flow().group_ids) == 5
+
+    @pytest.mark.parametrize('file_format', ['plist', 'bplist', 'toml'])
+    def test_load_table(self, file_format):
+        sc = Shortcut(name='test')
+        sc.actions = list(ShortcutGenerator(actions_count=300, seed=1).iter_actions())
+        dump = sc.dumps(file_format=file_format)
+        if isinstance(dump, str):
+            dump = dump.encode('utf-8')
+
+        table = Shortcut.load_table(io.BytesIO(dump), file_format=file_format)
+
+        exp_actions = Shortcut.loads(dump, file_format=file_format).actions
+        assert isinstance(table, ActionTable)
+        assert _get_actions_data(table) == _get_actions_data(exp_actions)
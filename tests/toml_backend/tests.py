@@ -0,0 +1,88 @@
+import glob
+
+import mock
+import pytest
+
+from shortcuts import Shortcut, toml_backend
+
+
+EXAMPLES = sorted(glob.glob('./examples/*.toml'))
+
+
+def _get_backends(backends):
+    installed = []
+    for name, get_function in backends.items():
+        try:
+            get_function()
+        except ImportError:
+            continue
+        installed.append(name)
+    return installed
+
+
+@pytest.fixture(autouse=True)
+def clear_backends_cache():
+    toml_backend.get_loads.cache_clear()
+    toml_backend.get_dumps.cache_clear()
+    yield
+    toml_backend.get_loads.cache_clear()
+    toml_backend.get_dumps.cache_clear()
+
+
+class TestGetBackend:
+    def test_fallback(self):
+        def not_installed():
+            raise ImportError()
+
+        backends = {'fast': not_installed, 'toml': toml_backend._get_toml_loads}
+        with mock.patch.object(toml_backend, 'LOADS_BACKENDS', backends):
+            import toml
+            assert toml_backend.get_loads() is toml.loads
+
+    def test_unknown_backend(self):
+        with pytest.raises(RuntimeError):
+            toml_backend.get_dumps('unknown')
+
+    def test_no_backends(self):
+        with mock.patch.object(toml_backend, 'DUMPS_BACKENDS', {}):
+            with pytest.raises(RuntimeError):
+                toml_backend.get_dumps()
+
+
+class TestBackends:
+    @pytest.mark.parametrize('filepath', EXAMPLES)
+    @pytest.mark.parametrize('loads_backend', _get_backends(toml_backend.LOADS_BACKENDS))
+    @pytest.mark.parametrize('dumps_backend', _get_backends(toml_backend.DUMPS_BACKENDS))
+    def test_round_trip(self, filepath, loads_backend, dumps_backend):
+        with open(filepath, encoding='utf-8') as f:
+            exp_data = toml_backend.get_loads('toml')(f.read())
+
+        string = toml_backend.get_dumps(dumps_backend)(exp_data)
+
+        assert toml_backend.get_loads(loads_backend)(string) == exp_data
+
+    @pytest.mark.parametrize('filepath', EXAMPLES)
+    @pytest.mark.parametrize('loads_backend', _get_backends(toml_backend.LOADS_BACKENDS))
+    def test_loads(self, filepath, loads_backend):
+        with open(filepath, encoding='utf-8') as f:
+            string = f.read()
+
+        assert toml_backend.get_loads(loads_backend)(string) == toml_backend.get_loads('toml')(string)
+
+    def test_multiline_string(self):
+        pytest.importorskip('tomli_w')
+
+        string = toml_backend.get_dumps('tomli_w')({'text': 'Hi!\nThis is an example'})
+
+        assert '"""' in string
+
+
+class TestShortcutRoundTrip:
+    @pytest.mark.parametrize('filepath', EXAMPLES)
+    def test_dumps_and_loads(self, filepath):
+        with open(filepath, 'rb') as f:
+            sc = Shortcut.load(f, file_format='toml')
+
+        new_sc = Shortcut.loads(sc.dumps(file_format='toml'), file_format='toml')
+
+        assert [(type(a), a.data) for a in new_sc.actions] == [(type(a), a.data) for a in sc.actions]
@@ -0,0 +1,16 @@
+import mock
+import pytest
+
+from shortcuts.utils import convert_plist_to_binary, convert_plist_to_xml
+
+
+class TestPlutilFunctions:
+    @pytest.mark.parametrize('func, exp_format', [
+        (convert_plist_to_binary, 'binary1'),
+        (convert_plist_to_xml, 'xml1'),
+    ])
+    def test_deprecated(self, func, exp_format):
+        with mock.patch('shortcuts.utils.call') as call_mock, pytest.warns(DeprecationWarning):
+            func('file.shortcut')
+
+        call_mock.assert_called_once_with(['plutil', '-convert', exp_format, 'file.shortcut'])